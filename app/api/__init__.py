@@ -1,7 +1,6 @@
 """
 API package initialization
-"""
-
-from app.api.deps import get_db, get_current_user
 
-__all__ = ["get_db", "get_current_user"] 
\ No newline at end of file
+Submodules are imported where they are used (from app.api import deps),
+so importing app.api.lazy does not load the dependencies and services.
+"""
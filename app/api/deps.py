@@ -1,5 +1,5 @@
 from typing import Generator, Any
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
 from sqlalchemy.orm import Session
@@ -7,18 +7,34 @@ from datetime import datetime
 
 from app.core.config import settings
 from app.db.session import SessionLocal
+from app.db.replicas import LSN_COOKIE, parse_lsn, replica_router, write_position
 from app.db.models.user import User
 from app.services.user_service import UserService
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/v1/auth/login")
 
-def get_db() -> Generator:
+def get_db(request: Request) -> Generator:
     try:
         db = SessionLocal()
         yield db
+        request.state.write_lsn = write_position(db)
     finally:
         db.close()
 
+def get_read_db(request: Request, db: Session = Depends(get_db)) -> Generator:
+    """
+    Session for endpoints that only read: a replica that has caught up with
+    the client's last write, or the primary session if there is none.
+    """
+    replica_session = replica_router.session(parse_lsn(request.cookies.get(LSN_COOKIE)))
+    if replica_session is None:
+        yield db
+        return
+    try:
+        yield replica_session
+    finally:
+        replica_session.close()
+
 def get_current_user(
     db: Session = Depends(get_db),
     token: str = Depends(oauth2_scheme)
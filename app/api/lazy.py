@@ -0,0 +1,83 @@
+"""
+Routers imported on first use.
+
+Importing every endpoint module pulls in every service, schema and model,
+which is most of the cost of importing app.main. A LazyRouter stands in
+the app's route table for one endpoint module under its prefix and
+imports it the first time a request path falls under that prefix. The
+routes it loads are ordinary APIRoutes, bound to the app's dependency
+overrides, and it hands the request to the one that matched.
+
+load_routers() imports every module at once and puts the real routes in
+place of the stand-ins; the OpenAPI schema and the startup pre-warm use it.
+"""
+import importlib
+import threading
+from typing import Any, List, Sequence, Tuple
+
+from fastapi import APIRouter, FastAPI
+from starlette.routing import BaseRoute, Match, NoMatchFound
+from starlette.types import Receive, Scope, Send
+
+
+class LazyRouter(BaseRoute):
+    def __init__(self, app: FastAPI, prefix: str, module: str, tags: Sequence[str]):
+        self.app = app
+        self.prefix = prefix
+        self.module = module
+        self.tags = list(tags)
+        self._routes = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._routes is not None
+
+    @property
+    def routes(self) -> List[BaseRoute]:
+        if self._routes is None:
+            with self._lock:
+                if self._routes is None:
+                    router = APIRouter(dependency_overrides_provider=self.app)
+                    router.include_router(importlib.import_module(self.module).router, prefix=self.prefix, tags=self.tags)
+                    self._routes = router.routes
+        return self._routes
+
+    def matches(self, scope: Scope) -> Tuple[Match, Scope]:
+        path = scope["path"]
+        if path != self.prefix and not path.startswith(self.prefix + "/"):
+            return Match.NONE, {}
+        partial = None
+        for route in self.routes:
+            match, child_scope = route.matches(scope)
+            if match == Match.FULL:
+                return match, {**child_scope, "route": route}
+            if match == Match.PARTIAL and partial is None:
+                partial = (match, {**child_scope, "route": route})
+        return partial or (Match.NONE, {})
+
+    async def handle(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await scope["route"].handle(scope, receive, send)
+
+    def url_path_for(self, name: str, /, **path_params: Any):
+        for route in self.routes:
+            try:
+                return route.url_path_for(name, **path_params)
+            except NoMatchFound:
+                pass
+        raise NoMatchFound(name, path_params)
+
+
+def include_lazily(app: FastAPI, prefix: str, routers: Sequence[Tuple[str, str, Sequence[str]]]) -> None:
+    """Add a LazyRouter for each (path, module, tags) under prefix."""
+    for path, module, tags in routers:
+        app.router.routes.append(LazyRouter(app, prefix + path, module, tags))
+
+
+def load_routers(app: FastAPI) -> None:
+    """Import every lazily included module and route to its routes directly."""
+    routes = []
+    for route in app.router.routes:
+        routes.extend(route.routes if isinstance(route, LazyRouter) else [route])
+    # A new list, so requests being routed keep iterating the one they started with
+    app.router.routes = routes
@@ -1,20 +1,31 @@
-from fastapi import APIRouter
+"""
+API v1 routers: (path, endpoint module, tags). Each module is imported on
+the first request under its path, see app.api.lazy.
+"""
+from fastapi import FastAPI
 
-from app.api.v1.endpoints import (
-    auth,
-    users,
-    doctors,
-    patients,
-    appointments,
-    medical_records,
-    doctor_patient_assignments
-)
+from app.api.lazy import include_lazily
 
-api_router = APIRouter()
-api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
-api_router.include_router(users.router, prefix="/users", tags=["users"])
-api_router.include_router(doctors.router, prefix="/doctors", tags=["doctors"])
-api_router.include_router(patients.router, prefix="/patients", tags=["patients"])
-api_router.include_router(appointments.router, prefix="/appointments", tags=["appointments"])
-api_router.include_router(medical_records.router, prefix="/medical-records", tags=["medical-records"])
-api_router.include_router(doctor_patient_assignments.router, prefix="/doctor-patient-assignments", tags=["doctor-patient-assignments"]) 
\ No newline at end of file
+ROUTERS = [
+    ("/auth", "app.api.v1.endpoints.auth", ["auth"]),
+    ("/users", "app.api.v1.endpoints.users", ["users"]),
+    ("/doctors", "app.api.v1.endpoints.doctors", ["doctors"]),
+    ("/patients", "app.api.v1.endpoints.patients", ["patients"]),
+    ("/staff", "app.api.v1.endpoints.staff", ["staff"]),
+    ("/profiles", "app.api.v1.endpoints.profiles", ["profiles"]),
+    ("/doctor-schedules", "app.api.v1.endpoints.doctor_schedules", ["doctor-schedules"]),
+    ("/appointments", "app.api.v1.endpoints.appointments", ["appointments"]),
+    ("/medical-records", "app.api.v1.endpoints.medical_records", ["medical-records"]),
+    ("/doctor-patient-assignments", "app.api.v1.endpoints.doctor_patient_assignments", ["doctor-patient-assignments"]),
+    ("/notifications", "app.api.v1.endpoints.notifications", ["notifications"]),
+    ("/events", "app.api.v1.endpoints.events", ["events"]),
+    ("/audit-logs", "app.api.v1.endpoints.audit_logs", ["audit-logs"]),
+    ("/directory", "app.api.v1.endpoints.directory", ["directory"]),
+    ("/waitlist", "app.api.v1.endpoints.waitlist", ["waitlist"]),
+    ("/resources", "app.api.v1.endpoints.resources", ["resources"]),
+    ("/locations", "app.api.v1.endpoints.locations", ["locations"]),
+]
+
+
+def include_api_routers(app: FastAPI, prefix: str) -> None:
+    include_lazily(app, prefix, ROUTERS)
@@ -1,14 +1,8 @@
 """
 API v1 endpoints package initialization
-"""
 
-from . import auth
-from . import users
-from . import appointments
-from . import patients
-from . import doctors
-from . import staff
-from . import profiles
-from . import doctor_schedules
+Endpoint modules are not imported here: app.api.v1.api loads each one on
+the first request under its prefix (see app.api.lazy).
+"""
 
-__all__ = ["auth", "users", "appointments", "patients", "doctors", "staff", "profiles", "doctor_schedules"] 
\ No newline at end of file
+__all__ = ["auth", "users", "appointments", "patients", "doctors", "staff", "profiles", "doctor_schedules"]
@@ -1,10 +1,16 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from datetime import datetime
+from datetime import date, datetime, timedelta, timezone
 
 from app.api import deps
-from app.schemas.appointment import AppointmentCreate, AppointmentUpdate, AppointmentResponse
+from app.core.concurrency import parse_if_match, set_etag
+from app.core.http_cache import HISTORICAL, REVALIDATE, ConditionalGet, HTTPCache, row_validators
+from app.schemas.appointment import (
+    AppointmentBulkTransition, AppointmentBulkTransitionResponse, AppointmentCreate, AppointmentResponse,
+    AppointmentUpdate, DoctorCalendarResponse
+)
 from app.services.appointment_service import AppointmentService
 from app.services.doctor_schedule_service import DoctorScheduleService
 
@@ -12,6 +18,17 @@ from app.services.doctor_schedule_service import DoctorScheduleService
 router = APIRouter()
 
 
+def _with_validators(appointments: List[dict]):
+    return appointments, row_validators(appointments, "id", "version")
+
+
+def _list_cache_control(end: Optional[datetime]) -> str:
+    """Lists of appointments that ended over a day ago (in any time zone) rarely change."""
+    if end is not None and end.replace(tzinfo=end.tzinfo or timezone.utc) < datetime.now(timezone.utc) - timedelta(days=1):
+        return HISTORICAL
+    return REVALIDATE
+
+
 @router.post("/", response_model=AppointmentResponse)
 def create_appointment(
     *,
@@ -32,14 +49,88 @@ def create_appointment(
         )
 
 
+@router.post("/bulk-transition", response_model=AppointmentBulkTransitionResponse)
+def bulk_transition_appointments(
+    *,
+    db: Session = Depends(deps.get_db),
+    current_user = Depends(deps.get_current_user),
+    transition_in: AppointmentBulkTransition,
+):
+    """
+    Confirm, complete or cancel many appointments in one statement, chosen by
+    id or by doctor and time range. Doctors can only move their own.
+    """
+    if current_user.role not in ["doctor", "admin", "staff"] or (
+        current_user.role == "doctor" and not current_user.doctor_id
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only doctors and clinic staff can change appointments in bulk"
+        )
+    appointment_service = AppointmentService(db, DoctorScheduleService(db))
+    try:
+        results = appointment_service.bulk_transition(
+            transition_in.status,
+            appointment_ids=transition_in.appointment_ids,
+            doctor_id=transition_in.doctor_id,
+            start=transition_in.start,
+            end=transition_in.end,
+            only_doctor_id=current_user.doctor_id if current_user.role == "doctor" else None
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    return {
+        "updated": sum(result["outcome"] == "updated" for result in results),
+        "results": results
+    }
+
+
+@router.get("/export", response_model=List[AppointmentResponse])
+def export_appointments(
+    *,
+    db: Session = Depends(deps.get_read_db),
+    current_user = Depends(deps.get_current_user),
+    doctor_id: Optional[str] = None,
+    patient_id: Optional[str] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+):
+    """
+    Export appointments as a JSON array streamed in start time order. Doctors
+    and patients only get their own.
+    """
+    if current_user.role == "doctor" and current_user.doctor_id:
+        doctor_id = str(current_user.doctor_id)
+    elif current_user.role == "patient" and current_user.patient_id:
+        patient_id = str(current_user.patient_id)
+    elif current_user.role not in ["admin", "staff"]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You don't have permission to export appointments"
+        )
+    appointment_service = AppointmentService(db, DoctorScheduleService(db))
+    try:
+        rows = appointment_service.export(doctor_id, patient_id, start_date, end_date)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    return StreamingResponse(rows, media_type="application/json")
+
+
 @router.get("/{appointment_id}", response_model=AppointmentResponse)
 def get_appointment(
     *,
     db: Session = Depends(deps.get_db),
     current_user = Depends(deps.get_current_user),
     appointment_id: str,
+    response: Response,
 ):
-    """Get appointment by ID."""
+    """Get appointment by ID. The ETag header is the version to send back in If-Match."""
     doctor_schedule_service = DoctorScheduleService(db)
     appointment_service = AppointmentService(db, doctor_schedule_service)
     appointment = appointment_service.get(appointment_id)
@@ -48,19 +139,24 @@ def get_appointment(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Appointment not found"
         )
+    set_etag(response, appointment["version"])
     return appointment
 
 
 @router.get("/doctor/{doctor_id}", response_model=List[AppointmentResponse])
 def get_doctor_appointments(
     *,
-    db: Session = Depends(deps.get_db),
+    db: Session = Depends(deps.get_read_db),
     current_user = Depends(deps.get_current_user),
     doctor_id: str,
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
+    conditional: ConditionalGet = Depends(HTTPCache()),
 ):
-    """Get all appointments for a doctor, optionally filtered by date range."""
+    """
+    Get all appointments for a doctor, optionally filtered by date range.
+    Supports If-None-Match; ranges that ended over a day ago may be cached by the client.
+    """
     doctor_schedule_service = DoctorScheduleService(db)
     appointment_service = AppointmentService(db, doctor_schedule_service)
     
@@ -96,8 +192,31 @@ def get_doctor_appointments(
                     detail="Invalid end_date format. Use ISO format (YYYY-MM-DDTHH:MM:SS)"
                 )
         
-        appointments = appointment_service.get_by_doctor(doctor_id, start_datetime, end_datetime)
-        return appointments
+        return conditional.respond(
+            f"user:{current_user.id}", [f"doctor:{doctor_id}"],
+            lambda: _with_validators(appointment_service.get_by_doctor(doctor_id, start_datetime, end_datetime)),
+            _list_cache_control(end_datetime)
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
+@router.get("/doctor/{doctor_id}/calendar", response_model=DoctorCalendarResponse)
+def get_doctor_calendar(
+    *,
+    db: Session = Depends(deps.get_db),
+    current_user = Depends(deps.get_current_user),
+    doctor_id: str,
+    start_date: date,
+    days: int = Query(1, ge=1, le=7),
+):
+    """Day or week view of a doctor: working hours, booked blocks and free gaps per local day."""
+    appointment_service = AppointmentService(db, DoctorScheduleService(db))
+    try:
+        return appointment_service.get_doctor_calendar(doctor_id, start_date, days)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -108,13 +227,17 @@ def get_doctor_appointments(
 @router.get("/patient/{patient_id}", response_model=List[AppointmentResponse])
 def get_patient_appointments(
     *,
-    db: Session = Depends(deps.get_db),
+    db: Session = Depends(deps.get_read_db),
     current_user = Depends(deps.get_current_user),
     patient_id: str,
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
+    conditional: ConditionalGet = Depends(HTTPCache()),
 ):
-    """Get all appointments for a patient, optionally filtered by date range."""
+    """
+    Get all appointments for a patient, optionally filtered by date range.
+    Supports If-None-Match; ranges that ended over a day ago may be cached by the client.
+    """
     doctor_schedule_service = DoctorScheduleService(db)
     appointment_service = AppointmentService(db, doctor_schedule_service)
     
@@ -150,8 +273,11 @@ def get_patient_appointments(
                     detail="Invalid end_date format. Use ISO format (YYYY-MM-DDTHH:MM:SS)"
                 )
                 
-        appointments = appointment_service.get_by_patient(patient_id, start_datetime, end_datetime)
-        return appointments
+        return conditional.respond(
+            f"user:{current_user.id}", [f"patient:{patient_id}"],
+            lambda: _with_validators(appointment_service.get_by_patient(patient_id, start_datetime, end_datetime)),
+            _list_cache_control(end_datetime)
+        )
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -166,19 +292,106 @@ def update_appointment(
     current_user = Depends(deps.get_current_user),
     appointment_id: str,
     appointment_in: AppointmentUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None),
 ):
-    """Update appointment."""
+    """
+    Update appointment. Send the ETag from the last read as If-Match and the
+    update fails with 412 instead of overwriting a change made in between.
+    """
     doctor_schedule_service = DoctorScheduleService(db)
     appointment_service = AppointmentService(db, doctor_schedule_service)
-    appointment = appointment_service.update(appointment_id, appointment_in)
+    appointment = appointment_service.update(
+        appointment_id,
+        appointment_in.dict(exclude_unset=True),
+        expected_version=parse_if_match(if_match)
+    )
+    if not appointment:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Appointment not found"
+        )
+    set_etag(response, appointment["version"])
+    return appointment
+
+
+def _transition(db: Session, current_user, appointment_id: str, new_status: str,
+                response: Response, if_match: Optional[str]) -> dict:
+    """
+    Doctors can only move their own appointments and patients can only cancel
+    theirs; as for bulk changes, anyone else's appointment is not found.
+    """
+    owner = {}
+    if current_user.role == "doctor" and current_user.doctor_id:
+        owner["only_doctor_id"] = current_user.doctor_id
+    elif current_user.role == "patient" and current_user.patient_id and new_status == "cancelled":
+        owner["only_patient_id"] = current_user.patient_id
+    elif current_user.role not in ["admin", "staff"]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"You don't have permission to mark appointments as {new_status}"
+        )
+    appointment_service = AppointmentService(db, DoctorScheduleService(db))
+    try:
+        appointment = appointment_service.transition(
+            appointment_id, new_status, expected_version=parse_if_match(if_match), **owner
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     if not appointment:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Appointment not found"
         )
+    set_etag(response, appointment["version"])
     return appointment
 
 
+@router.post("/{appointment_id}/confirm", response_model=AppointmentResponse)
+def confirm_appointment(
+    *,
+    db: Session = Depends(deps.get_db),
+    current_user = Depends(deps.get_current_user),
+    appointment_id: str,
+    response: Response,
+    if_match: Optional[str] = Header(None),
+):
+    """Confirm a scheduled appointment. 409 if it is no longer scheduled."""
+    return _transition(db, current_user, appointment_id, "confirmed", response, if_match)
+
+
+@router.post("/{appointment_id}/complete", response_model=AppointmentResponse)
+def complete_appointment(
+    *,
+    db: Session = Depends(deps.get_db),
+    current_user = Depends(deps.get_current_user),
+    appointment_id: str,
+    response: Response,
+    if_match: Optional[str] = Header(None),
+):
+    """Mark a scheduled or confirmed appointment as completed."""
+    return _transition(db, current_user, appointment_id, "completed", response, if_match)
+
+
+@router.post("/{appointment_id}/cancel", response_model=AppointmentResponse)
+def cancel_appointment(
+    *,
+    db: Session = Depends(deps.get_db),
+    current_user = Depends(deps.get_current_user),
+    appointment_id: str,
+    response: Response,
+    if_match: Optional[str] = Header(None),
+):
+    """
+    Cancel a scheduled or confirmed appointment and offer its slot to the
+    waitlist. Patients can cancel their own appointments.
+    """
+    return _transition(db, current_user, appointment_id, "cancelled", response, if_match)
+
+
 @router.delete("/{appointment_id}", status_code=status.HTTP_200_OK)
 def delete_appointment(
     *,
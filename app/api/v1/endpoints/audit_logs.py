@@ -0,0 +1,49 @@
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+
+from app.api import deps
+from app.schemas.audit_log import AuditLogPage
+from app.services.audit_log_service import AuditLogService
+
+router = APIRouter()
+
+@router.get("/", response_model=AuditLogPage)
+def get_audit_logs(
+    db: Session = Depends(deps.get_db),
+    current_user = Depends(deps.get_current_user),
+    resource_type: Optional[str] = None,
+    resource_id: Optional[str] = None,
+    user_id: Optional[str] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500)
+):
+    """
+    Get audit history, newest first. Defaults to the last 30 days;
+    narrow date ranges only touch the matching monthly partitions.
+    """
+    if current_user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admins can view audit logs"
+        )
+
+    audit_log_service = AuditLogService(db)
+    try:
+        return audit_log_service.get_history(
+            resource_type=resource_type,
+            resource_id=resource_id,
+            user_id=user_id,
+            start_date=start_date,
+            end_date=end_date,
+            limit=limit,
+            cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
@@ -0,0 +1,39 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+
+from app.api import deps
+from app.schemas.directory import DirectoryResults
+from app.services.directory_service import DirectoryService
+
+router = APIRouter()
+
+@router.get("/search", response_model=DirectoryResults)
+def search_directory(
+    q: str = Query(..., min_length=2, max_length=100),
+    type: Optional[str] = Query(None, pattern="^(doctor|patient)$"),
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(deps.get_db),
+    current_user = Depends(deps.get_current_user)
+):
+    """Search doctors and patients by name, email, phone, specialization or license number."""
+    directory_service = DirectoryService(db)
+    try:
+        return {"items": directory_service.search(q, current_user, kind=type, limit=limit)}
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+@router.get("/typeahead", response_model=DirectoryResults)
+def directory_typeahead(
+    q: str = Query(..., min_length=1, max_length=100),
+    type: Optional[str] = Query(None, pattern="^(doctor|patient)$"),
+    limit: int = Query(10, ge=1, le=20),
+    db: Session = Depends(deps.get_db),
+    current_user = Depends(deps.get_current_user)
+):
+    """Suggest directory entries whose name, email, phone or license starts with the typed prefix."""
+    directory_service = DirectoryService(db)
+    return {"items": directory_service.typeahead(q, current_user, kind=type, limit=limit)}
@@ -3,6 +3,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_db, get_current_user
+from app.core.http_cache import REVALIDATE, ConditionalGet, HTTPCache
 from app.schemas.doctor_schedule import (
     DoctorScheduleCreate,
     DoctorScheduleUpdate,
@@ -49,10 +50,11 @@ def create_schedule(
 @router.get("/", response_model=List[DoctorScheduleResponse])
 def get_schedules(
     current_user: Any = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    conditional: ConditionalGet = Depends(HTTPCache(REVALIDATE))
 ) -> Any:
     """
-    Get all schedules for the current doctor.
+    Get all schedules for the current doctor. Send the ETag back in If-None-Match to get 304 if they have not changed.
     """
     if current_user.role != "doctor":
         raise HTTPException(
@@ -60,17 +62,19 @@ def get_schedules(
             detail="Only doctors can view schedules"
         )
     
-    doctor_service = DoctorService(db)
-    doctor = doctor_service.get_by_user_id(user_id=str(current_user.id))
-    if not doctor:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Doctor profile not found"
-        )
-    
-    schedule_service = DoctorScheduleService(db)
-    schedules = schedule_service.get_by_doctor(doctor_id=doctor["id"])
-    return schedules
+    def load():
+        doctor_service = DoctorService(db)
+        doctor = doctor_service.get_by_user_id(user_id=str(current_user.id))
+        if not doctor:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Doctor profile not found"
+            )
+        schedules = DoctorScheduleService(db).list_by_doctor(doctor["id"])
+        # Schedules have no version column; the rows themselves are the validator
+        return schedules, [sorted(schedule.items()) for schedule in schedules]
+
+    return conditional.respond(f"user:{current_user.id}", [f"doctor:{current_user.doctor_id}"], load)
 
 @router.put("/{schedule_id}", response_model=DoctorScheduleResponse)
 def update_schedule(
@@ -105,7 +109,7 @@ def update_schedule(
         )
     
     try:
-        updated_schedule = schedule_service.update(id=schedule_id, obj_in=schedule_in)
+        updated_schedule = schedule_service.update(schedule_id, schedule_in.dict(exclude_unset=True))
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
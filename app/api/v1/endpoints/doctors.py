@@ -2,6 +2,7 @@ from typing import Any
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
+from app.core.http_cache import REVALIDATE, ConditionalGet, HTTPCache
 from app.core.security import get_current_user
 from app.db.session import get_db
 from app.schemas.doctor import DoctorCreate, DoctorInDB, DoctorUpdate, DoctorResponse
@@ -44,14 +45,15 @@ def create_doctor_profile(
     
     return doctor
 
-@router.get("/profile", response_model=DoctorInDB)
+@router.get("/profile", response_model=DoctorResponse)
 def get_doctor_profile(
     *,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    conditional: ConditionalGet = Depends(HTTPCache(REVALIDATE))
 ) -> Any:
     """
-    Get doctor profile.
+    Get doctor profile. Send the ETag back in If-None-Match to get 304 if it has not changed.
     """
     if current_user.role != "doctor":
         raise HTTPException(
@@ -59,12 +61,14 @@ def get_doctor_profile(
             detail="Only doctors can view their profiles"
         )
     
-    doctor_service = DoctorService(db)
-    doctor = doctor_service.get_by_user_id(user_id=str(current_user.id))
-    if not doctor:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Doctor profile not found"
-        )
-    
-    return doctor 
\ No newline at end of file
+    def load():
+        doctor_service = DoctorService(db)
+        doctor = doctor_service.get_by_user_id(user_id=str(current_user.id))
+        if not doctor:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Doctor profile not found"
+            )
+        return doctor, (doctor["id"], doctor["updated_at"])
+
+    return conditional.respond(f"user:{current_user.id}", [f"doctor:{current_user.doctor_id}"], load) 
\ No newline at end of file
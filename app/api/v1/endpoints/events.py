@@ -0,0 +1,66 @@
+import json
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+
+from app.api import deps
+from app.core.config import settings
+from app.core.events import event_hub
+
+router = APIRouter()
+
+def _channels_for(current_user, doctor_id: Optional[str]) -> List[str]:
+    """Channels a user may listen on: their own, plus a doctor's calendar for staff and admins."""
+    channels = [f"user:{current_user.id}"]
+    if current_user.role == "patient" and current_user.patient_id:
+        channels.append(f"patient:{current_user.patient_id}")
+    if current_user.role == "doctor" and current_user.doctor_id:
+        channels.append(f"doctor:{current_user.doctor_id}")
+    if doctor_id:
+        if current_user.role not in ["admin", "staff"] and str(current_user.doctor_id) != doctor_id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="You can only follow your own calendar"
+            )
+        channels.append(f"doctor:{doctor_id}")
+    return channels
+
+def _format_sse(event_type: str, data: dict) -> str:
+    return f"event: {event_type}\ndata: {json.dumps(data)}\n\n"
+
+@router.get("/stream")
+async def stream_events(
+    request: Request,
+    doctor_id: Optional[str] = None,
+    current_user = Depends(deps.get_current_user)
+):
+    """
+    Server-sent event stream of appointment and notification changes for the current user.
+    A `resync` event means events were dropped because the client fell behind; refetch state.
+    """
+    channels = _channels_for(current_user, doctor_id)
+
+    async def event_stream():
+        subscription = event_hub.subscribe(channels)
+        try:
+            yield _format_sse("ready", {"channels": channels})
+            while not subscription.closed and not await request.is_disconnected():
+                event = await subscription.get(timeout=settings.EVENT_STREAM_HEARTBEAT_SECONDS)
+                if subscription.closed:
+                    break
+                if subscription.lagged:
+                    subscription.lagged = False
+                    yield _format_sse("resync", {"dropped": subscription.dropped})
+                if event is None:
+                    # Comment line keeps proxies from closing an idle connection
+                    yield ": keepalive\n\n"
+                    continue
+                yield _format_sse(event["type"], event["data"])
+        finally:
+            event_hub.unsubscribe(subscription)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -0,0 +1,34 @@
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.api import deps
+from app.schemas.location import LocationCreate, LocationResponse
+from app.services.location_service import LocationService
+
+router = APIRouter()
+
+@router.post("/", response_model=LocationResponse)
+def create_location(
+    location_in: LocationCreate,
+    db: Session = Depends(deps.get_db),
+    current_user = Depends(deps.get_current_user)
+):
+    """Register a clinic location and its time zone."""
+    location_service = LocationService(db)
+    try:
+        return location_service.create(location_in, current_user)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+@router.get("/", response_model=List[LocationResponse])
+def list_locations(
+    db: Session = Depends(deps.get_db),
+    current_user = Depends(deps.get_current_user)
+):
+    """List active clinic locations."""
+    location_service = LocationService(db)
+    return location_service.list()
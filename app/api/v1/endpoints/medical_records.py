@@ -1,15 +1,25 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status
+from urllib.parse import quote
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response, StreamingResponse
 from sqlalchemy.orm import Session
 
 from app.api import deps
+from app.core.concurrency import parse_if_match, set_etag
 from app.schemas.medical_record import (
     MedicalRecordCreate,
     MedicalRecordUpdate,
     MedicalRecordResponse,
-    MedicalRecordListResponse
+    MedicalRecordListResponse,
+    MedicalRecordPage,
+    MedicalRecordSearchResults,
+    MedicalRecordVersion
 )
+from app.schemas.medical_record_attachment import MedicalRecordAttachmentResponse
 from app.services.medical_record_service import MedicalRecordService
+from app.services.medical_record_attachment_service import MedicalRecordAttachmentService
+from app.core.blob_store import BlobTooLarge, blob_store, parse_range
 
 router = APIRouter()
 
@@ -30,13 +40,33 @@ def create_medical_record(
             detail=str(e)
         )
 
+@router.get("/search", response_model=MedicalRecordSearchResults)
+def search_medical_records(
+    q: str = Query(..., min_length=1, max_length=200),
+    patient_id: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    fuzzy: bool = False,
+    db: Session = Depends(deps.get_db),
+    current_user: dict = Depends(deps.get_current_user)
+):
+    """Search the medical records visible to the current user, best match first."""
+    medical_record_service = MedicalRecordService(db)
+    try:
+        return medical_record_service.search(q, current_user, patient_id=patient_id, limit=limit, fuzzy=fuzzy)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
 @router.get("/{record_id}", response_model=MedicalRecordResponse)
 def get_medical_record(
     record_id: str,
+    response: Response,
     db: Session = Depends(deps.get_db),
     current_user: dict = Depends(deps.get_current_user)
 ):
-    """Get medical record by ID."""
+    """Get medical record by ID. The ETag header is current_version, for If-Match on updates."""
     medical_record_service = MedicalRecordService(db)
     record = medical_record_service.get(record_id, current_user)
     if not record:
@@ -44,45 +74,92 @@ def get_medical_record(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Medical record not found"
         )
+    set_etag(response, record["current_version"])
     return record
 
-@router.get("/patient/{patient_id}", response_model=List[MedicalRecordResponse])
+@router.get("/{record_id}/history", response_model=List[MedicalRecordVersion])
+def get_medical_record_history(
+    record_id: str,
+    db: Session = Depends(deps.get_read_db),
+    current_user: dict = Depends(deps.get_current_user)
+):
+    """List the versions of a medical record, newest first, streamed as they are read."""
+    medical_record_service = MedicalRecordService(db)
+    return StreamingResponse(
+        medical_record_service.stream_history(record_id, current_user),
+        media_type="application/json"
+    )
+
+@router.get("/{record_id}/versions/{version}", response_model=MedicalRecordResponse)
+def get_medical_record_version(
+    record_id: str,
+    version: int,
+    db: Session = Depends(deps.get_db),
+    current_user: dict = Depends(deps.get_current_user)
+):
+    """Get a medical record as it was at the given version."""
+    medical_record_service = MedicalRecordService(db)
+    return medical_record_service.get_version(record_id, version, current_user)
+
+@router.get("/patient/{patient_id}", response_model=MedicalRecordPage)
 def get_patient_records(
     patient_id: str,
     db: Session = Depends(deps.get_db),
-    current_user: dict = Depends(deps.get_current_user)
+    current_user: dict = Depends(deps.get_current_user),
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200)
 ):
-    """Get all medical records for a patient."""
+    """Get medical records for a patient, newest first. Pass next_cursor to fetch the next page."""
     medical_record_service = MedicalRecordService(db)
-    records = medical_record_service.get_by_patient(patient_id, current_user)
-    return records
+    try:
+        return medical_record_service.get_by_patient(patient_id, current_user, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
 
-@router.get("/doctor/{doctor_id}", response_model=List[MedicalRecordResponse])
+@router.get("/doctor/{doctor_id}", response_model=MedicalRecordPage)
 def get_doctor_records(
     doctor_id: str,
     db: Session = Depends(deps.get_db),
-    current_user: dict = Depends(deps.get_current_user)
+    current_user: dict = Depends(deps.get_current_user),
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200)
 ):
-    """Get all medical records for a doctor."""
+    """Get medical records for a doctor, newest first. Pass next_cursor to fetch the next page."""
     medical_record_service = MedicalRecordService(db)
-    records = medical_record_service.get_by_doctor(doctor_id, current_user)
-    return records
+    try:
+        return medical_record_service.get_by_doctor(doctor_id, current_user, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
 
 @router.put("/{record_id}", response_model=MedicalRecordResponse)
 def update_medical_record(
     record_id: str,
     record_in: MedicalRecordUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None),
     db: Session = Depends(deps.get_db),
     current_user: dict = Depends(deps.get_current_user)
 ):
-    """Update medical record."""
+    """
+    Update medical record. With If-Match set to the ETag of the last read,
+    the update fails with 412 if the record has changed since.
+    """
     medical_record_service = MedicalRecordService(db)
-    record = medical_record_service.update(record_id, record_in, current_user)
+    record = medical_record_service.update(
+        record_id, record_in, current_user, expected_version=parse_if_match(if_match)
+    )
     if not record:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Medical record not found"
         )
+    set_etag(response, record["current_version"])
     return record
 
 @router.delete("/{record_id}")
@@ -99,4 +176,106 @@ def delete_medical_record(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Medical record not found"
         )
-    return {"message": "Medical record deleted successfully"} 
\ No newline at end of file
+    return {"message": "Medical record deleted successfully"}
+
+@router.post(
+    "/{record_id}/attachments",
+    response_model=MedicalRecordAttachmentResponse,
+    status_code=status.HTTP_201_CREATED
+)
+async def upload_attachment(
+    record_id: str,
+    request: Request,
+    filename: str = Query(..., min_length=1, max_length=255),
+    db: Session = Depends(deps.get_db),
+    current_user: dict = Depends(deps.get_current_user)
+):
+    """
+    Attach a file to a medical record. The request body is the raw file,
+    streamed to storage in chunks as it arrives.
+    """
+    attachment_service = MedicalRecordAttachmentService(db)
+    await run_in_threadpool(attachment_service.check_can_attach, record_id, current_user)
+
+    writer = await run_in_threadpool(blob_store.writer)
+    try:
+        async for chunk in request.stream():
+            await run_in_threadpool(writer.write, chunk)
+    except BlobTooLarge as e:
+        writer.abort()
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=str(e)
+        )
+    except Exception:
+        writer.abort()
+        raise
+
+    content_type = request.headers.get("content-type", "application/octet-stream")
+    # The service moves the file into place, under the lock that keeps a concurrent delete off it
+    return await run_in_threadpool(
+        attachment_service.create, record_id, filename, content_type, writer, current_user
+    )
+
+@router.get("/{record_id}/attachments", response_model=List[MedicalRecordAttachmentResponse])
+def list_attachments(
+    record_id: str,
+    db: Session = Depends(deps.get_db),
+    current_user: dict = Depends(deps.get_current_user)
+):
+    """List a medical record's attachments (metadata only)."""
+    attachment_service = MedicalRecordAttachmentService(db)
+    return attachment_service.list(record_id, current_user)
+
+@router.get("/{record_id}/attachments/{attachment_id}/content")
+def download_attachment(
+    record_id: str,
+    attachment_id: str,
+    range_header: Optional[str] = Header(None, alias="Range"),
+    db: Session = Depends(deps.get_db),
+    current_user: dict = Depends(deps.get_current_user)
+):
+    """Stream an attachment's contents. Supports single byte-range requests."""
+    attachment_service = MedicalRecordAttachmentService(db)
+    attachment = attachment_service.get_for_download(record_id, attachment_id, current_user)
+    size = attachment["size"]
+    headers = {
+        "Accept-Ranges": "bytes",
+        "ETag": f'"{attachment["sha256"]}"',
+        "Content-Disposition": f"attachment; filename*=UTF-8''{quote(attachment['filename'])}",
+        "X-Content-Type-Options": "nosniff"
+    }
+
+    try:
+        byte_range = parse_range(range_header, size)
+    except ValueError:
+        return Response(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            headers={"Content-Range": f"bytes */{size}"}
+        )
+
+    if byte_range is None:
+        start, end, status_code = 0, size - 1, status.HTTP_200_OK
+    else:
+        (start, end), status_code = byte_range, status.HTTP_206_PARTIAL_CONTENT
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(max(end - start + 1, 0))
+
+    return StreamingResponse(
+        blob_store.iter_range(attachment["sha256"], start, end),
+        status_code=status_code,
+        media_type=attachment["content_type"],
+        headers=headers
+    )
+
+@router.delete("/{record_id}/attachments/{attachment_id}")
+def delete_attachment(
+    record_id: str,
+    attachment_id: str,
+    db: Session = Depends(deps.get_db),
+    current_user: dict = Depends(deps.get_current_user)
+):
+    """Remove an attachment from a medical record."""
+    attachment_service = MedicalRecordAttachmentService(db)
+    attachment_service.delete(record_id, attachment_id, current_user)
+    return {"message": "Attachment deleted successfully"}
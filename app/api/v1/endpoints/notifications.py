@@ -0,0 +1,82 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+
+from app.api import deps
+from app.schemas.notification import (
+    NotificationPage,
+    NotificationReadRequest,
+    UnreadCountResponse
+)
+from app.services.notification_service import NotificationService
+
+router = APIRouter()
+
+@router.get("/", response_model=NotificationPage)
+def get_notifications(
+    db: Session = Depends(deps.get_read_db),
+    current_user = Depends(deps.get_current_user),
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    unread_only: bool = False
+):
+    """Get the current user's notifications, newest first. Pass next_cursor to fetch the next page."""
+    notification_service = NotificationService(db)
+    try:
+        return notification_service.get_user_notifications(
+            str(current_user.id), limit=limit, cursor=cursor, unread_only=unread_only
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+@router.get("/unread-count", response_model=UnreadCountResponse)
+def get_unread_count(
+    db: Session = Depends(deps.get_read_db),
+    current_user = Depends(deps.get_current_user)
+):
+    """Get the current user's unread notification count."""
+    notification_service = NotificationService(db)
+    return {"unread_count": notification_service.get_unread_notifications_count(str(current_user.id))}
+
+@router.put("/read", response_model=UnreadCountResponse)
+def mark_notifications_as_read(
+    read_in: NotificationReadRequest,
+    db: Session = Depends(deps.get_db),
+    current_user = Depends(deps.get_current_user)
+):
+    """Mark several notifications as read."""
+    notification_service = NotificationService(db)
+    notification_service.mark_notifications_as_read(
+        str(current_user.id), [str(id) for id in read_in.notification_ids]
+    )
+    return {"unread_count": notification_service.get_unread_notifications_count(str(current_user.id))}
+
+@router.put("/read-all", response_model=UnreadCountResponse)
+def mark_all_notifications_as_read(
+    db: Session = Depends(deps.get_db),
+    current_user = Depends(deps.get_current_user)
+):
+    """Mark all notifications as read."""
+    notification_service = NotificationService(db)
+    notification_service.mark_all_as_read(str(current_user.id))
+    return {"unread_count": 0}
+
+@router.put("/{notification_id}/read", response_model=UnreadCountResponse)
+def mark_notification_as_read(
+    notification_id: str,
+    db: Session = Depends(deps.get_db),
+    current_user = Depends(deps.get_current_user)
+):
+    """Mark a notification as read."""
+    notification_service = NotificationService(db)
+    try:
+        notification_service.mark_notification_as_read(notification_id, str(current_user.id))
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    return {"unread_count": notification_service.get_unread_notifications_count(str(current_user.id))}
@@ -1,10 +1,10 @@
-from typing import Any
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Any, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 
 from app.core.security import get_current_user
 from app.db.session import get_db
-from app.schemas.patient import PatientCreate, PatientInDB, PatientUpdate, PatientResponse
+from app.schemas.patient import PatientCreate, PatientInDB, PatientUpdate, PatientResponse, PatientPage
 from app.services.patient_service import PatientService
 from app.db.models.user import User
 
@@ -42,4 +42,30 @@ def create_patient_profile(
     db.commit()
     db.refresh(current_user)
     
-    return patient 
\ No newline at end of file
+    return patient
+
+@router.get("/", response_model=PatientPage)
+def list_patients(
+    *,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500)
+) -> Any:
+    """
+    List patients in registration order. Pass next_cursor to fetch the next page.
+    """
+    if current_user.role not in ("admin", "staff"):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admin and staff can list patients"
+        )
+
+    patient_service = PatientService(db)
+    try:
+        return patient_service.get_multi(limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
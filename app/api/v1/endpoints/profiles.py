@@ -3,6 +3,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_db, get_current_user
+from app.core.http_cache import REVALIDATE, ConditionalGet, HTTPCache
 from app.schemas.patient import PatientUpdate, PatientResponse
 from app.schemas.doctor import DoctorUpdate, DoctorResponse
 from app.schemas.staff import StaffUpdate, StaffResponse
@@ -38,10 +39,11 @@ def get_patient_profile(
 @router.get("/doctor", response_model=DoctorResponse)
 def get_doctor_profile(
     current_user: Any = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    conditional: ConditionalGet = Depends(HTTPCache(REVALIDATE))
 ) -> Any:
     """
-    Get doctor profile.
+    Get doctor profile. Send the ETag back in If-None-Match to get 304 if it has not changed.
     """
     if current_user.role != "doctor":
         raise HTTPException(
@@ -49,14 +51,17 @@ def get_doctor_profile(
             detail="Only doctors can view their profile"
         )
     
-    doctor_service = DoctorService(db)
-    doctor = doctor_service.get_by_user_id(user_id=str(current_user.id))
-    if not doctor:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Doctor profile not found"
-        )
-    return doctor
+    def load():
+        doctor_service = DoctorService(db)
+        doctor = doctor_service.get_by_user_id(user_id=str(current_user.id))
+        if not doctor:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Doctor profile not found"
+            )
+        return doctor, (doctor["id"], doctor["updated_at"])
+
+    return conditional.respond(f"user:{current_user.id}", [f"doctor:{current_user.doctor_id}"], load)
 
 @router.put("/patient", response_model=PatientResponse)
 def update_patient_profile(
@@ -0,0 +1,73 @@
+from datetime import date, datetime
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+
+from app.api import deps
+from app.schemas.resource import AvailableSlot, ResourceBookingResponse, ResourceCreate, ResourceResponse
+from app.services.resource_service import ResourceService
+
+router = APIRouter()
+
+@router.post("/", response_model=ResourceResponse)
+def create_resource(
+    resource_in: ResourceCreate,
+    db: Session = Depends(deps.get_db),
+    current_user = Depends(deps.get_current_user)
+):
+    """Register an exam room or piece of equipment."""
+    resource_service = ResourceService(db)
+    try:
+        return resource_service.create(resource_in, current_user)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+@router.get("/", response_model=List[ResourceResponse])
+def list_resources(
+    kind: Optional[str] = None,
+    db: Session = Depends(deps.get_db),
+    current_user = Depends(deps.get_current_user)
+):
+    """List active rooms and equipment."""
+    resource_service = ResourceService(db)
+    return resource_service.list(kind)
+
+@router.get("/availability", response_model=List[AvailableSlot])
+def find_available_slots(
+    doctor_id: str,
+    start_date: date,
+    end_date: date,
+    resource_ids: List[str] = Query([]),
+    duration_minutes: int = Query(30, ge=5, le=480),
+    step_minutes: int = Query(15, ge=5, le=120),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(deps.get_db),
+    current_user = Depends(deps.get_current_user)
+):
+    """Find slots where the doctor and all the given rooms and equipment are free."""
+    resource_service = ResourceService(db)
+    try:
+        return resource_service.find_slots(
+            doctor_id, resource_ids, start_date, end_date,
+            duration_minutes, step_minutes=step_minutes, limit=limit
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+@router.get("/{resource_id}/calendar", response_model=List[ResourceBookingResponse])
+def get_resource_calendar(
+    resource_id: str,
+    start: datetime,
+    end: datetime,
+    db: Session = Depends(deps.get_db),
+    current_user = Depends(deps.get_current_user)
+):
+    """Get a resource's bookings between start and end."""
+    resource_service = ResourceService(db)
+    return resource_service.get_calendar(resource_id, start, end)
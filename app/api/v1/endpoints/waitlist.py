@@ -0,0 +1,58 @@
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.api import deps
+from app.schemas.waitlist import WaitlistEntryCreate, WaitlistEntryResponse
+from app.services.waitlist_service import WaitlistService
+
+router = APIRouter()
+
+@router.post("/", response_model=WaitlistEntryResponse)
+def join_waitlist(
+    entry_in: WaitlistEntryCreate,
+    db: Session = Depends(deps.get_db),
+    current_user = Depends(deps.get_current_user)
+):
+    """Wait for a slot with a doctor; the patient is booked automatically when one frees up."""
+    waitlist_service = WaitlistService(db)
+    try:
+        return waitlist_service.create(entry_in, current_user)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+@router.get("/", response_model=List[WaitlistEntryResponse])
+def get_waitlist(
+    doctor_id: Optional[str] = None,
+    patient_id: Optional[str] = None,
+    entry_status: str = "waiting",
+    db: Session = Depends(deps.get_db),
+    current_user = Depends(deps.get_current_user)
+):
+    """List waitlist entries in the order they will be served."""
+    waitlist_service = WaitlistService(db)
+    return waitlist_service.list(current_user, doctor_id=doctor_id, patient_id=patient_id, entry_status=entry_status)
+
+@router.delete("/{entry_id}")
+def leave_waitlist(
+    entry_id: str,
+    db: Session = Depends(deps.get_db),
+    current_user = Depends(deps.get_current_user)
+):
+    """Remove a waiting entry."""
+    waitlist_service = WaitlistService(db)
+    try:
+        if not waitlist_service.cancel(entry_id, current_user):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Waitlist entry not found"
+            )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    return {"message": "Waitlist entry cancelled successfully"}
@@ -1,9 +1,144 @@
-from datetime import datetime
-from typing import Optional, Dict, Any
+from datetime import datetime, timezone
+from typing import Optional, Dict, Any, Callable, List
+from uuid import uuid4
+import logging
+import queue
+import threading
+import time
+
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.db.models.audit_log import AuditLog
 from app.db.models.user import User
+from app.db.session import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+OVERFLOW_POLICIES = ("drop_oldest", "drop_newest", "write_through")
+
+
+class AuditWriter:
+    """
+    Buffers audit entries in a bounded queue and writes them in multi-row
+    INSERTs from a background thread, flushing when a batch fills up or the
+    flush interval elapses, whichever comes first.
+    """
+
+    def __init__(
+        self,
+        max_queue_size: int = settings.AUDIT_QUEUE_SIZE,
+        batch_size: int = settings.AUDIT_BATCH_SIZE,
+        flush_interval: float = settings.AUDIT_FLUSH_INTERVAL_SECONDS,
+        overflow_policy: str = settings.AUDIT_OVERFLOW_POLICY,
+        session_factory: Callable[[], Session] = SessionLocal
+    ):
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Invalid audit overflow policy: {overflow_policy}")
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.overflow_policy = overflow_policy
+        self._session_factory = session_factory
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue_size)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._metrics = {"enqueued": 0, "written": 0, "dropped": 0, "failed": 0, "flushes": 0}
+
+    def _count(self, metric: str, amount: int = 1) -> None:
+        with self._lock:
+            self._metrics[metric] += amount
+
+    def metrics(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self._metrics, "queued": self._queue.qsize()}
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+            self._thread.start()
+
+    def submit(self, entry: Dict[str, Any]) -> None:
+        """Queue an entry without waiting on the database."""
+        self.start()
+        try:
+            self._queue.put_nowait(entry)
+            self._count("enqueued")
+            return
+        except queue.Full:
+            pass
+
+        if self.overflow_policy == "write_through":
+            self._write([entry])
+            return
+        if self.overflow_policy == "drop_oldest":
+            try:
+                self._queue.get_nowait()
+                self._count("dropped")
+                self._queue.put_nowait(entry)
+                self._count("enqueued")
+                return
+            except (queue.Empty, queue.Full):
+                pass
+        self._count("dropped")
+
+    def _drain(self, timeout: float) -> List[Dict[str, Any]]:
+        batch = []
+        deadline = time.monotonic() + timeout
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    batch.append(self._queue.get(timeout=remaining))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch: List[Dict[str, Any]]) -> None:
+        db = self._session_factory()
+        try:
+            db.execute(insert(AuditLog), batch)
+            db.commit()
+            self._count("written", len(batch))
+            self._count("flushes")
+        except Exception as e:
+            db.rollback()
+            self._count("failed", len(batch))
+            logger.error(f"Error writing {len(batch)} audit log entries: {str(e)}")
+        finally:
+            db.close()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            batch = self._drain(self.flush_interval)
+            if batch:
+                self._write(batch)
+
+    def flush(self) -> None:
+        """Write everything queued so far from the calling thread."""
+        while True:
+            batch = self._drain(0)
+            if not batch:
+                return
+            self._write(batch)
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Stop the background thread and write out whatever is still queued."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self.flush()
+
+
+audit_writer = AuditWriter()
+
 
 class AuditLogger:
     @staticmethod
@@ -14,20 +149,31 @@ class AuditLogger:
         resource_type: str,
         resource_id: str,
         details: Optional[Dict[str, Any]] = None,
-        ip_address: Optional[str] = None
+        ip_address: Optional[str] = None,
+        durable: bool = False
     ) -> None:
-        """Log an action to the audit log."""
-        audit_log = AuditLog(
-            user_id=user.id,
-            action=action,
-            resource_type=resource_type,
-            resource_id=resource_id,
-            details=details or {},
-            ip_address=ip_address,
-            created_at=datetime.utcnow()
-        )
-        db.add(audit_log)
-        db.commit()
+        """
+        Log an action to the audit log.
+
+        By default the entry is handed to the background writer and the caller
+        never waits on an audit commit. With durable=True the entry is added to
+        the caller's session instead, so it commits or rolls back together with
+        the change it describes; the caller is responsible for committing.
+        """
+        entry = {
+            "id": uuid4(),
+            "user_id": user.id,
+            "action": action,
+            "resource_type": resource_type,
+            "resource_id": resource_id,
+            "details": details or {},
+            "ip_address": ip_address,
+            "created_at": datetime.now(timezone.utc)
+        }
+        if durable:
+            db.add(AuditLog(**entry))
+        else:
+            audit_writer.submit(entry)
 
     @staticmethod
     def log_medical_record_access(
@@ -35,7 +181,8 @@ class AuditLogger:
         user: User,
         action: str,
         record_id: str,
-        ip_address: Optional[str] = None
+        ip_address: Optional[str] = None,
+        durable: bool = False
     ) -> None:
         """Log medical record access."""
         AuditLogger.log_action(
@@ -48,5 +195,6 @@ class AuditLogger:
                 "user_role": user.role,
                 "user_id": str(user.id)
             },
-            ip_address=ip_address
-        ) 
\ No newline at end of file
+            ip_address=ip_address,
+            durable=durable
+        )
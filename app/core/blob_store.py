@@ -0,0 +1,124 @@
+from pathlib import Path
+from typing import Iterator, Optional
+import hashlib
+import os
+import re
+import tempfile
+
+from app.core.config import settings
+
+SHA256_HEX = re.compile(r"^[0-9a-f]{64}$")
+
+
+class BlobTooLarge(ValueError):
+    pass
+
+
+class BlobWriter:
+    """
+    Streams an upload into a temporary file while hashing it, then moves it
+    to its content address. Identical content is only ever stored once.
+    """
+
+    def __init__(self, store: "BlobStore", max_bytes: int):
+        self._store = store
+        self._max_bytes = max_bytes
+        self._hash = hashlib.sha256()
+        self.size = 0
+        store.root.mkdir(parents=True, exist_ok=True)
+        fd, self._temp_path = tempfile.mkstemp(dir=store.root, prefix=".upload-")
+        self._file = os.fdopen(fd, "wb")
+
+    def write(self, chunk: bytes) -> None:
+        self.size += len(chunk)
+        if self.size > self._max_bytes:
+            raise BlobTooLarge(f"Attachment exceeds {self._max_bytes} bytes")
+        self._hash.update(chunk)
+        self._file.write(chunk)
+
+    def finish(self) -> str:
+        """Close the upload and return its SHA-256; commit() then puts it in place."""
+        self._file.close()
+        return self._hash.hexdigest()
+
+    def commit(self) -> str:
+        """Finish the upload and return its SHA-256, reusing an existing copy if there is one."""
+        digest = self.finish()
+        path = self._store.path(digest)
+        if path.exists():
+            os.unlink(self._temp_path)
+        else:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(self._temp_path, path)
+        return digest
+
+    def abort(self) -> None:
+        self._file.close()
+        if os.path.exists(self._temp_path):
+            os.unlink(self._temp_path)
+
+
+class BlobStore:
+    """Content-addressed files on the local filesystem, laid out as <root>/ab/cd/<sha256>."""
+
+    def __init__(self, root: str = settings.ATTACHMENT_STORAGE_DIR,
+                 chunk_size: int = settings.ATTACHMENT_CHUNK_SIZE):
+        self.root = Path(root)
+        self.chunk_size = chunk_size
+
+    def path(self, digest: str) -> Path:
+        if not SHA256_HEX.match(digest):
+            raise ValueError("Invalid blob digest")
+        return self.root / digest[:2] / digest[2:4] / digest
+
+    def writer(self, max_bytes: int = settings.ATTACHMENT_MAX_BYTES) -> BlobWriter:
+        return BlobWriter(self, max_bytes)
+
+    def iter_range(self, digest: str, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+        """Yield the bytes from start to end inclusive, chunk_size at a time."""
+        with open(self.path(digest), "rb") as blob:
+            blob.seek(start)
+            remaining = None if end is None else end - start + 1
+            while remaining is None or remaining > 0:
+                size = self.chunk_size if remaining is None else min(self.chunk_size, remaining)
+                chunk = blob.read(size)
+                if not chunk:
+                    return
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+
+    def delete(self, digest: str) -> None:
+        try:
+            os.unlink(self.path(digest))
+        except FileNotFoundError:
+            pass
+
+
+blob_store = BlobStore()
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[tuple]:
+    """
+    Parse a single-range "bytes=start-end" header into inclusive offsets.
+    Returns None when the whole file should be sent, raises ValueError when
+    the range cannot be satisfied.
+    """
+    if not header:
+        return None
+    match = re.fullmatch(r"\s*bytes=(\d*)-(\d*)\s*", header)
+    if not match or match.group(1) == match.group(2) == "":
+        # Multiple or malformed ranges: fall back to the full response
+        return None
+    first, last = match.groups()
+    if first == "":
+        length = int(last)
+        if length == 0:
+            raise ValueError("Unsatisfiable range")
+        start, end = max(size - length, 0), size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError("Unsatisfiable range")
+    return start, end
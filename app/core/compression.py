@@ -0,0 +1,52 @@
+"""
+Response compression limited to compressible content types.
+
+Starlette's GZipMiddleware compresses every response over a size threshold.
+That is wrong for two of ours: the server-sent event stream, where gzip's
+buffering would hold events back, and attachment downloads, which are
+mostly compressed already and answer byte ranges of the stored file. Only
+the content types in COMPRESSION_CONTENT_TYPES are compressed here;
+streamed JSON lists are compressed as they are written.
+"""
+from typing import Iterable
+
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipMiddleware, GZipResponder
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+
+class _SelectiveGZipResponder(GZipResponder):
+    def __init__(self, app: ASGIApp, minimum_size: int, compresslevel: int, content_types: frozenset):
+        super().__init__(app, minimum_size, compresslevel=compresslevel)
+        self.content_types = content_types
+
+    async def send_with_gzip(self, message: Message) -> None:
+        await super().send_with_gzip(message)
+        if message["type"] == "http.response.start":
+            content_type = Headers(raw=message["headers"]).get("content-type", "")
+            if content_type.split(";")[0].strip().lower() not in self.content_types:
+                # The responder passes bodies through untouched when the response is already encoded
+                self.content_encoding_set = True
+
+
+class CompressionMiddleware(GZipMiddleware):
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = settings.COMPRESSION_MINIMUM_SIZE,
+        compresslevel: int = settings.COMPRESSION_LEVEL,
+        content_types: Iterable[str] = tuple(settings.COMPRESSION_CONTENT_TYPES)
+    ) -> None:
+        super().__init__(app, minimum_size=minimum_size, compresslevel=compresslevel)
+        self.content_types = frozenset(content_type.lower() for content_type in content_types)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and "gzip" in Headers(scope=scope).get("Accept-Encoding", ""):
+            responder = _SelectiveGZipResponder(
+                self.app, self.minimum_size, self.compresslevel, self.content_types
+            )
+            await responder(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
@@ -0,0 +1,49 @@
+"""
+Optimistic concurrency for rows with a version counter.
+
+Responses carry the version as a strong ETag; clients send it back in
+If-Match and the write becomes a compare-and-swap, a single
+UPDATE ... WHERE id = :id AND version = :version. No row locks are held
+between the read and the write, and a lost race costs the client a 412
+instead of silently overwriting someone else's change.
+"""
+import re
+from typing import Optional
+
+from fastapi import HTTPException, Response, status
+
+ENTITY_TAG = re.compile(r'^"(\d+)"$')
+
+
+def etag(version: int) -> str:
+    return f'"{version}"'
+
+
+def set_etag(response: Response, version: int) -> None:
+    response.headers["ETag"] = etag(version)
+
+
+def parse_if_match(header: Optional[str]) -> Optional[int]:
+    """
+    The version an If-Match header asks for. None means the write is
+    unconditional (no header, or "*" for any current version).
+    """
+    if header is None or header.strip() == "*":
+        return None
+    match = ENTITY_TAG.match(header.strip())
+    if not match:
+        # Weak tags and tag lists never match our single strong version
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail="If-Match must be a single ETag from a previous response"
+        )
+    return int(match.group(1))
+
+
+def precondition_failed(current_version: Optional[int] = None) -> HTTPException:
+    headers = {"ETag": etag(current_version)} if current_version is not None else None
+    return HTTPException(
+        status_code=status.HTTP_412_PRECONDITION_FAILED,
+        detail="The resource was changed by someone else, reload it and try again",
+        headers=headers
+    )
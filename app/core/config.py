@@ -21,6 +21,10 @@ class Settings(BaseSettings):
     POSTGRES_DB: str
     POSTGRES_PORT: str
     DATABASE_URL: Optional[PostgresDsn] = None
+    DATABASE_REPLICA_URLS: List[str] = []  # Read-only endpoints are spread over these when set
+    REPLICA_SELECTION: str = "round_robin"  # round_robin or least_latency
+    REPLICA_HEALTH_CHECK_SECONDS: int = 5
+    REPLICA_STICKY_SECONDS: int = 60  # After a write, a client reads only from replicas that have replayed it
     
     # CORS Origins
     BACKEND_CORS_ORIGINS: List[str] = ["http://localhost:3000", "http://localhost:3001", "http://localhost:3002"]
@@ -32,6 +36,80 @@ class Settings(BaseSettings):
     RABBITMQ_PASSWORD: str = "guest"
     RABBITMQ_VHOST: str = "/"
     
+    # Startup and shutdown
+    PREWARM_ON_STARTUP: bool = True  # Load routers, open connections and fill caches before taking traffic
+    PREWARM_DB_CONNECTIONS: int = 5
+    STARTUP_TIMEOUT_SECONDS: float = 30  # Longest wait for the database or broker before starting without them
+    SHUTDOWN_GRACE_SECONDS: float = 5  # After SIGTERM, keep serving while /health/ready reports draining
+    
+    # Appointment reminders
+    REMINDER_SCHEDULER_ENABLED: bool = True
+    REMINDER_LEAD_MINUTES: int = 60 * 24  # Remind one day ahead
+    REMINDER_INTERVAL_SECONDS: int = 300
+    REMINDER_BATCH_SIZE: int = 1000
+    
+    # Server-sent event stream
+    EVENT_STREAM_QUEUE_SIZE: int = 100  # Buffered events per connection before the oldest are dropped
+    EVENT_STREAM_HEARTBEAT_SECONDS: int = 15
+    
+    # Audit logging
+    AUDIT_QUEUE_SIZE: int = 10000
+    AUDIT_BATCH_SIZE: int = 500
+    AUDIT_FLUSH_INTERVAL_SECONDS: float = 1.0
+    AUDIT_OVERFLOW_POLICY: str = "drop_oldest"  # drop_oldest, drop_newest or write_through
+    AUDIT_PARTITIONS_AHEAD: int = 3  # Monthly partitions created in advance
+    AUDIT_RETENTION_MONTHS: int = 84  # Partitions older than this are archived and dropped
+    AUDIT_ARCHIVE_DIR: str = "archive/audit_logs"
+    AUDIT_MAINTENANCE_INTERVAL_SECONDS: int = 60 * 60 * 24
+    
+    # Authorization
+    PERMISSION_CACHE_TTL_SECONDS: int = 60  # Bounds staleness of assignment sets cached by other instances
+    
+    # Directory search
+    DIRECTORY_CACHE_TTL_SECONDS: int = 300  # Typeahead tries are rebuilt at least this often
+    
+    # Scheduling
+    DEFAULT_TIME_ZONE: str = "UTC"  # Time zone of schedules that have no location
+    
+    # Response compression and streaming
+    COMPRESSION_MINIMUM_SIZE: int = 1024  # Smaller bodies are sent as they are
+    COMPRESSION_LEVEL: int = 6
+    COMPRESSION_CONTENT_TYPES: List[str] = ["application/json", "text/plain", "text/csv", "text/html"]
+    STREAM_BATCH_SIZE: int = 1000  # Rows fetched per server-side cursor round trip
+    STREAM_ITEMS_PER_CHUNK: int = 500  # List items per chunk written to the client
+    
+    # HTTP caching
+    RESPONSE_CACHE_ENABLED: bool = False  # Keep GET response data in process, see app.core.http_cache
+    RESPONSE_CACHE_TTL_SECONDS: int = 30  # Bounds staleness of entries changed through other instances
+    
+    # Rate limiting and load shedding
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: str = "memory"  # memory, or redis to share buckets between instances
+    RATE_LIMIT_AUTH_PER_MINUTE: int = 20  # Login and registration attempts per client
+    RATE_LIMIT_AVAILABILITY_PER_MINUTE: int = 60
+    RATE_LIMIT_DEFAULT_PER_MINUTE: int = 600
+    RATE_LIMIT_TRUST_FORWARDED_FOR: bool = False  # Key anonymous clients by X-Forwarded-For behind a proxy
+    LOAD_SHEDDING_ENABLED: bool = True
+    LOAD_SHEDDING_MAX_IN_FLIGHT: int = 200
+    LOAD_SHEDDING_MIN_IN_FLIGHT: int = 10
+    LOAD_SHEDDING_POOL_WAIT_MS: int = 100  # Average connection pool wait above which the limit is lowered
+    LOAD_SHEDDING_RETRY_AFTER_SECONDS: int = 1
+    
+    # Idempotency keys
+    IDEMPOTENCY_TTL_SECONDS: int = 60 * 60 * 24  # Retries are answered from the stored response this long
+    IDEMPOTENCY_LOCK_SECONDS: int = 60  # An attempt unfinished after this can be taken over by a retry
+    IDEMPOTENCY_WAIT_SECONDS: float = 10.0  # Retries wait this long for the first attempt before a 409
+    IDEMPOTENCY_MAX_BODY_BYTES: int = 1024 * 1024
+    IDEMPOTENCY_PURGE_INTERVAL_SECONDS: int = 300
+    
+    # Waitlist
+    WAITLIST_MATCH_LIMIT: int = 200  # Waiting entries considered per freed slot
+    
+    # Attachments
+    ATTACHMENT_STORAGE_DIR: str = "storage/attachments"
+    ATTACHMENT_MAX_BYTES: int = 50 * 1024 * 1024
+    ATTACHMENT_CHUNK_SIZE: int = 64 * 1024
+    
     # Email
     SMTP_TLS: bool = True
     SMTP_PORT: Optional[int] = None
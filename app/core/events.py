@@ -0,0 +1,180 @@
+import asyncio
+import json
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from app.core.config import settings
+from app.core.http_cache import response_cache
+from app.core.rabbitmq import RabbitMQ
+
+logger = logging.getLogger(__name__)
+
+EVENTS_EXCHANGE = "events"
+
+
+class Subscription:
+    """A single client connection's view of the hub, with a bounded event buffer."""
+
+    def __init__(self, channels: Iterable[str], max_queue_size: int):
+        self.channels: Set[str] = set(channels)
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size)
+        self.lagged = False
+        self.dropped = 0
+        self.closed = False
+
+    def put(self, event: Dict[str, Any]) -> None:
+        """
+        Buffer an event without ever blocking the publisher.
+        When the client falls behind, the oldest event is dropped and the
+        subscription is marked as lagged so the client can refetch its state.
+        """
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+            self.lagged = True
+        self.queue.put_nowait(event)
+
+    def close(self) -> None:
+        """Mark the stream as ended and wake a pending get(), which returns None."""
+        self.closed = True
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class EventHub:
+    """In-process fan-out of events to subscriptions keyed by channel (user:<id>, doctor:<id>, ...)."""
+
+    def __init__(self, max_queue_size: int = settings.EVENT_STREAM_QUEUE_SIZE):
+        self.max_queue_size = max_queue_size
+        self._subscriptions: Dict[str, Set[Subscription]] = {}
+        self.closed = False
+
+    def subscribe(self, channels: Iterable[str]) -> Subscription:
+        subscription = Subscription(channels, self.max_queue_size)
+        if self.closed:
+            subscription.close()
+        for channel in subscription.channels:
+            self._subscriptions.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        for channel in subscription.channels:
+            subscribers = self._subscriptions.get(channel)
+            if subscribers is None:
+                continue
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscriptions[channel]
+
+    def dispatch(self, event: Dict[str, Any]) -> int:
+        """Deliver an event to every subscription on any of its channels, once each."""
+        targets: Set[Subscription] = set()
+        for channel in event.get("channels", []):
+            targets.update(self._subscriptions.get(channel, ()))
+        for subscription in targets:
+            subscription.put(event)
+        return len(targets)
+
+    def close(self) -> None:
+        """
+        End every stream, and any opened later, so a draining server is not held
+        open by them. Clients reconnect to another instance.
+        """
+        self.closed = True
+        for subscription in {sub for subs in self._subscriptions.values() for sub in subs}:
+            subscription.close()
+
+    @property
+    def connection_count(self) -> int:
+        return len({sub for subs in self._subscriptions.values() for sub in subs})
+
+
+event_hub = EventHub()
+_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def bind_event_loop(loop: asyncio.AbstractEventLoop) -> None:
+    """Remember the application's event loop so sync endpoints can publish events."""
+    global _loop
+    _loop = loop
+
+
+def build_event(event_type: str, channels: List[str], data: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "type": event_type,
+        "channels": channels,
+        "data": data,
+        "sent_at": datetime.now(timezone.utc).isoformat()
+    }
+
+
+async def _publish(event: Dict[str, Any]) -> None:
+    try:
+        await RabbitMQ.publish_to_exchange(EVENTS_EXCHANGE, json.dumps(event))
+    except Exception as e:
+        # Without the broker, at least the clients connected to this instance get the event
+        logger.error(f"Error publishing event {event['type']}: {str(e)}")
+        event_hub.dispatch(event)
+
+
+def publish_event(event_type: str, channels: List[str], data: Dict[str, Any]) -> None:
+    """
+    Publish an event to every instance's hub through the broker.
+    Safe to call from sync code running in the threadpool; never blocks the caller.
+    """
+    publish_events([build_event(event_type, channels, data)])
+
+
+async def _publish_all(events: List[Dict[str, Any]]) -> None:
+    for event in events:
+        await _publish(event)
+
+
+def publish_events(events: List[Dict[str, Any]]) -> None:
+    """
+    Publish built events in order with a single hand-off to the event loop,
+    for writes that change many rows at once.
+    """
+    if not events:
+        return
+    # Drop cached responses here at once, so the writer reads its own change;
+    # other instances drop theirs when the event reaches them
+    response_cache.invalidate({channel for event in events for channel in event["channels"]})
+    if _loop is None or _loop.is_closed():
+        for event in events:
+            event_hub.dispatch(event)
+        return
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is _loop:
+        _loop.create_task(_publish_all(events))
+    else:
+        asyncio.run_coroutine_threadsafe(_publish_all(events), _loop)
+
+
+async def _on_broker_event(body: str) -> None:
+    event = json.loads(body)
+    response_cache.invalidate(event.get("channels", []))
+    event_hub.dispatch(event)
+
+
+async def consume_events(retry_seconds: int = 5) -> None:
+    """Feed the local hub from the broker, reconnecting if the broker goes away."""
+    while True:
+        try:
+            await RabbitMQ.consume_exchange(EVENTS_EXCHANGE, _on_broker_event)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Event consumer disconnected: {str(e)}")
+        await asyncio.sleep(retry_seconds)
@@ -0,0 +1,180 @@
+"""
+Conditional GET for read-heavy endpoints.
+
+The ETag of a response is a hash of its validators: the updated_at or
+version of the rows it is built from, or the row values where the table
+has neither. Endpoints compute it right after loading the rows; if it
+matches the client's If-None-Match the endpoint returns 304 at once,
+skipping response-model validation, JSON encoding and the transfer.
+
+With RESPONSE_CACHE_ENABLED the loaded data is also kept in process,
+keyed by route, principal and query parameters and tagged with event
+channels (doctor:<id>, patient:<id>). Publishing an event on a channel
+drops the entries tagged with it on every instance (see app.core.events);
+writes that publish no event invalidate locally, and the TTL bounds how
+stale other instances can be.
+"""
+import hashlib
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from fastapi import Request, Response, status
+
+from app.core.config import settings
+
+# Cache-Control policies. no-cache means "store, but revalidate every time",
+# which costs one cheap 304 round trip instead of the whole body.
+REVALIDATE = "private, no-cache"
+SHORT_LIVED = "private, max-age=60"
+HISTORICAL = "private, max-age=300"
+
+
+def weak_etag(*validators: Any) -> str:
+    digest = hashlib.blake2b(repr(validators).encode(), digest_size=12).hexdigest()
+    return f'W/"{digest}"'
+
+
+def if_none_match(header: Optional[str], tag: str) -> bool:
+    """Weak comparison, as RFC 9110 requires for If-None-Match."""
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = tag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in header.split(","))
+
+
+class ResponseCache:
+    """
+    Process-local TTL cache of endpoint data, invalidated by tag.
+
+    Invalidating a tag bumps its generation, so data loaded before the
+    invalidation is not stored afterwards (see generation()).
+    """
+
+    def __init__(self, ttl_seconds: int = settings.RESPONSE_CACHE_TTL_SECONDS, max_entries: int = 10000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: Dict[Tuple, Tuple[float, str, Any, Tuple[str, ...]]] = {}
+        self._tagged: Dict[str, set] = {}
+        self._generations: Dict[str, int] = {}
+        self._cleared = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Tuple) -> Optional[Tuple[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() >= entry[0]:
+                self._discard(key)
+                return None
+            return entry[1], entry[2]
+
+    def generation(self, tags: Sequence[str]) -> Tuple[int, ...]:
+        """Take before loading; set() skips the data if any of the tags is invalidated meanwhile."""
+        with self._lock:
+            return self._generation(tags)
+
+    def _generation(self, tags: Sequence[str]) -> Tuple[int, ...]:
+        return (self._cleared, *(self._generations.get(name, 0) for name in tags))
+
+    def set(self, key: Tuple, tag: str, data: Any, tags: Sequence[str],
+            generation: Optional[Tuple[int, ...]] = None) -> None:
+        with self._lock:
+            if generation is not None and generation != self._generation(tags):
+                return
+            if key not in self._entries and len(self._entries) >= self.max_entries:
+                # Insertion order approximates age; evicting the oldest keeps the bound cheap
+                self._discard(next(iter(self._entries)))
+            self._discard(key)
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, tag, data, tuple(tags))
+            for name in tags:
+                self._tagged.setdefault(name, set()).add(key)
+
+    def invalidate(self, tags: Iterable[str]) -> None:
+        with self._lock:
+            for name in tags:
+                self._generations[name] = self._generations.get(name, 0) + 1
+                for key in self._tagged.pop(name, ()):
+                    self._discard(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cleared += 1
+            self._entries.clear()
+            self._tagged.clear()
+
+    def _discard(self, key: Tuple) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for name in entry[3]:
+            keys = self._tagged.get(name)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tagged[name]
+
+
+response_cache = ResponseCache()
+
+
+class ConditionalGet:
+    """Per-request helper handed to endpoints by the HTTPCache dependency."""
+
+    def __init__(self, request: Request, response: Response, cache_control: str, cache: Optional[ResponseCache]):
+        self.request = request
+        self.response = response
+        self.cache_control = cache_control
+        self.cache = cache
+
+    def _key(self, scope: str) -> Tuple:
+        return (self.request.url.path, scope, tuple(sorted(self.request.query_params.multi_items())))
+
+    def respond(self, scope: str, tags: Sequence[str], load: Callable[[], Tuple[Any, Sequence[Any]]],
+                cache_control: Optional[str] = None) -> Any:
+        """
+        load() returns (data, validators). The result is the data with ETag
+        and Cache-Control set, or a bare 304 if the client's copy is current.
+        scope names whose view this is (e.g. "user:<id>"), so cached data is
+        never served to a different principal.
+        """
+        cache_control = cache_control or self.cache_control
+        hit = self.cache.get(self._key(scope)) if self.cache is not None else None
+        if hit is not None:
+            tag, data = hit
+        else:
+            generation = self.cache.generation(tags) if self.cache is not None else None
+            data, validators = load()
+            tag = weak_etag(*validators)
+            if self.cache is not None:
+                self.cache.set(self._key(scope), tag, data, tags, generation)
+
+        headers = {"ETag": tag, "Cache-Control": cache_control}
+        if if_none_match(self.request.headers.get("if-none-match"), tag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        self.response.headers.update(headers)
+        return data
+
+
+class HTTPCache:
+    """
+    Dependency giving an endpoint a ConditionalGet with the route's
+    Cache-Control policy, e.g. Depends(HTTPCache(SHORT_LIVED)).
+    """
+
+    def __init__(self, cache_control: str = REVALIDATE):
+        self.cache_control = cache_control
+
+    def __call__(self, request: Request, response: Response) -> ConditionalGet:
+        cache = response_cache if settings.RESPONSE_CACHE_ENABLED else None
+        return ConditionalGet(request, response, self.cache_control, cache)
+
+
+def row_validators(rows: Iterable[Dict[str, Any]], *fields: str) -> List[Tuple]:
+    return [tuple(row.get(field) for field in fields) for row in rows]
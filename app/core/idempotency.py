@@ -0,0 +1,327 @@
+"""
+Idempotency keys for POST requests.
+
+A client that sends Idempotency-Key: <unique value> with a POST can retry
+it after a dropped connection without the request running twice. The
+first attempt claims the key in the idempotency_keys table and its
+response is stored there; a retry with the same key is answered from the
+stored response, headers included (with Idempotent-Replayed: true),
+without reaching the endpoint. A retry that arrives while the first attempt is still running
+waits for it, up to IDEMPOTENCY_WAIT_SECONDS, and then gets 409 with
+Retry-After.
+
+Keys are scoped to the principal (the bearer token's subject, or the
+client address when anonymous) and bound to a fingerprint of the method,
+path, query and body: reusing a key for a different request is a 422.
+Server errors are not stored, so a retry after a 5xx runs again. An
+attempt that dies without finishing holds its key for
+IDEMPOTENCY_LOCK_SECONDS, after which a retry takes it over. Stored
+responses expire after IDEMPOTENCY_TTL_SECONDS.
+"""
+import asyncio
+import hashlib
+import logging
+import time
+from datetime import timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import and_, delete, func, or_, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse, Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.rate_limit import bearer_subject, client_address
+from app.db.models.idempotency_key import IdempotencyKey
+from app.db.session import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+POLL_INTERVAL_SECONDS = 0.1
+
+# Set per response by the server and the outer middleware, so not stored for replay
+UNSTORED_HEADERS = frozenset({"content-length", "transfer-encoding", "connection", "keep-alive", "date", "server"})
+
+
+class IdempotencyStore:
+    """Claims, completes and releases keys in the idempotency_keys table."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        ttl_seconds: int = settings.IDEMPOTENCY_TTL_SECONDS,
+        lock_seconds: int = settings.IDEMPOTENCY_LOCK_SECONDS
+    ):
+        self.session_factory = session_factory
+        self.ttl_seconds = ttl_seconds
+        self.lock_seconds = lock_seconds
+
+    def claim(self, owner: str, key: str, fingerprint: str) -> Tuple[bool, Optional[Any]]:
+        """
+        Returns (True, None) if the caller now holds the key. Otherwise
+        (False, row) with the row's fingerprint, status_code, headers and
+        body; status_code is None while its attempt is in progress, and
+        the row itself is None if it was released in the meantime.
+        """
+        # Database time throughout, so instances with skewed clocks agree on expiry
+        values = dict(
+            fingerprint=fingerprint,
+            status_code=None,
+            headers=None,
+            body=None,
+            locked_until=func.now() + timedelta(seconds=self.lock_seconds),
+            expires_at=func.now() + timedelta(seconds=self.ttl_seconds),
+        )
+        stmt = insert(IdempotencyKey).values(owner=owner, key=key, **values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[IdempotencyKey.owner, IdempotencyKey.key],
+            set_=values,
+            where=or_(
+                IdempotencyKey.expires_at < func.now(),
+                and_(IdempotencyKey.status_code.is_(None), IdempotencyKey.locked_until < func.now()),
+            )
+        ).returning(IdempotencyKey.key)
+        db = self.session_factory()
+        try:
+            if db.execute(stmt).first() is not None:
+                db.commit()
+                return True, None
+            row = db.execute(
+                select(
+                    IdempotencyKey.fingerprint, IdempotencyKey.status_code,
+                    IdempotencyKey.headers, IdempotencyKey.body
+                ).where(IdempotencyKey.owner == owner, IdempotencyKey.key == key)
+            ).first()
+            db.commit()
+            return False, row
+        finally:
+            db.close()
+
+    def complete(self, owner: str, key: str, fingerprint: str, status_code: int,
+                 headers: List[List[str]], body: bytes) -> None:
+        db = self.session_factory()
+        try:
+            db.execute(
+                update(IdempotencyKey)
+                .where(
+                    IdempotencyKey.owner == owner,
+                    IdempotencyKey.key == key,
+                    IdempotencyKey.fingerprint == fingerprint,
+                    IdempotencyKey.status_code.is_(None),
+                )
+                .values(status_code=status_code, headers=headers, body=body, locked_until=None)
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    def release(self, owner: str, key: str, fingerprint: str) -> None:
+        db = self.session_factory()
+        try:
+            db.execute(
+                delete(IdempotencyKey).where(
+                    IdempotencyKey.owner == owner,
+                    IdempotencyKey.key == key,
+                    IdempotencyKey.fingerprint == fingerprint,
+                    IdempotencyKey.status_code.is_(None),
+                )
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    def purge_expired(self, batch_size: int = 1000) -> int:
+        db = self.session_factory()
+        try:
+            expired = (
+                select(IdempotencyKey.owner, IdempotencyKey.key)
+                .where(IdempotencyKey.expires_at < func.now())
+                .limit(batch_size)
+            )
+            result = db.execute(
+                delete(IdempotencyKey).where(
+                    tuple_(IdempotencyKey.owner, IdempotencyKey.key).in_(expired)
+                )
+            )
+            db.commit()
+            return result.rowcount
+        finally:
+            db.close()
+
+
+def request_fingerprint(method: str, path: str, query_string: bytes, body: bytes) -> str:
+    digest = hashlib.sha256()
+    for part in (method.encode(), path.encode(), query_string, body):
+        digest.update(len(part).to_bytes(8, "big"))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+class IdempotencyMiddleware:
+    """Applies Idempotency-Key to every POST except the exempt paths."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        store: Optional[IdempotencyStore] = None,
+        exempt_paths: Iterable[str] = (f"{settings.API_V1_STR}/auth/login", f"{settings.API_V1_STR}/auth/register"),
+        wait_seconds: float = settings.IDEMPOTENCY_WAIT_SECONDS,
+        max_body_bytes: int = settings.IDEMPOTENCY_MAX_BODY_BYTES,
+        purge_interval_seconds: int = settings.IDEMPOTENCY_PURGE_INTERVAL_SECONDS
+    ) -> None:
+        self.app = app
+        self.store = store or IdempotencyStore()
+        # Login answers with tokens, which have no business sitting in a table
+        self.exempt_paths = frozenset(exempt_paths)
+        self.wait_seconds = wait_seconds
+        self.max_body_bytes = max_body_bytes
+        self.purge_interval_seconds = purge_interval_seconds
+        self._next_purge = 0.0
+        # Attempts running in this process, so local duplicates are woken without polling
+        self._in_flight: Dict[Tuple[str, str], asyncio.Event] = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] in self.exempt_paths:
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        key = headers.get("idempotency-key")
+        if key is None:
+            await self.app(scope, receive, send)
+            return
+        if not key or len(key) > 255:
+            await self._error(scope, receive, send, 400, "Idempotency-Key must be 1 to 255 characters")
+            return
+
+        body = await self._read_body(receive)
+        if body is None:
+            await self._error(
+                scope, receive, send, 413,
+                f"Requests with an Idempotency-Key are limited to {self.max_body_bytes} bytes"
+            )
+            return
+        subject = bearer_subject(headers)
+        owner = f"user:{subject}" if subject else f"ip:{client_address(scope, headers)}"
+        fingerprint = request_fingerprint(scope["method"], scope["path"], scope.get("query_string", b""), body)
+
+        deadline = time.monotonic() + self.wait_seconds
+        while True:
+            claimed, row = await run_in_threadpool(self.store.claim, owner, key, fingerprint)
+            if claimed:
+                break
+            if row is not None and row.fingerprint != fingerprint:
+                await self._error(scope, receive, send, 422, "Idempotency-Key was already used for a different request")
+                return
+            if row is not None and row.status_code is not None:
+                await self._replay(scope, receive, send, row)
+                return
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                await self._error(
+                    scope, receive, send, 409, "A request with this Idempotency-Key is still in progress",
+                    headers={"Retry-After": "1"}
+                )
+                return
+            await self._wait(owner, key, min(remaining, POLL_INTERVAL_SECONDS))
+
+        await self._run(scope, receive, send, body, owner, key, fingerprint)
+
+    async def _run(self, scope: Scope, receive: Receive, send: Send, body: bytes,
+                   owner: str, key: str, fingerprint: str) -> None:
+        done = self._in_flight[(owner, key)] = asyncio.Event()
+        started: Dict[str, Any] = {}
+        chunks = []
+
+        async def replay_body() -> Message:
+            nonlocal body
+            if body is None:
+                return await receive()
+            message, body = {"type": "http.request", "body": body, "more_body": False}, None
+            return message
+
+        async def capture(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                started.update(message)
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+            await send(message)
+
+        stored = False
+        try:
+            await self.app(scope, replay_body, capture)
+            status_code = started.get("status")
+            if status_code is not None and status_code < 500:
+                headers = [
+                    [name.decode("latin-1"), value.decode("latin-1")]
+                    for name, value in started.get("headers", [])
+                    if name.decode("latin-1").lower() not in UNSTORED_HEADERS
+                ]
+                await run_in_threadpool(
+                    self.store.complete, owner, key, fingerprint, status_code, headers, b"".join(chunks)
+                )
+                stored = True
+        finally:
+            if not stored:
+                try:
+                    await run_in_threadpool(self.store.release, owner, key, fingerprint)
+                except Exception as e:
+                    # The key stays locked until IDEMPOTENCY_LOCK_SECONDS pass
+                    logger.error(f"Error releasing idempotency key: {str(e)}")
+            # A takeover in this process may have replaced the entry with its own
+            if self._in_flight.get((owner, key)) is done:
+                del self._in_flight[(owner, key)]
+            done.set()
+        await self._maybe_purge()
+
+    async def _replay(self, scope: Scope, receive: Receive, send: Send, row: Any) -> None:
+        headers = [
+            (name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in row.headers or []
+        ]
+        headers.append((b"idempotent-replayed", b"true"))
+        response = Response(row.body, status_code=row.status_code)
+        # Response computed content-length from the body; the stored headers supply the rest
+        response.raw_headers = [header for header in response.raw_headers if header[0] == b"content-length"] + headers
+        await response(scope, receive, send)
+
+    async def _wait(self, owner: str, key: str, timeout: float) -> None:
+        event = self._in_flight.get((owner, key))
+        if event is None:
+            # Running on another instance; poll
+            await asyncio.sleep(timeout)
+            return
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _read_body(self, receive: Receive) -> Optional[bytes]:
+        chunks, size = [], 0
+        while True:
+            message = await receive()
+            if message["type"] != "http.request":
+                break
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if size > self.max_body_bytes:
+                return None
+            chunks.append(chunk)
+            if not message.get("more_body", False):
+                break
+        return b"".join(chunks)
+
+    async def _maybe_purge(self) -> None:
+        if time.monotonic() < self._next_purge:
+            return
+        self._next_purge = time.monotonic() + self.purge_interval_seconds
+        try:
+            await run_in_threadpool(self.store.purge_expired)
+        except Exception as e:
+            logger.error(f"Error purging expired idempotency keys: {str(e)}")
+
+    async def _error(self, scope: Scope, receive: Receive, send: Send, status_code: int, detail: str,
+                     headers: Optional[Dict[str, str]] = None) -> None:
+        response = JSONResponse({"detail": detail}, status_code=status_code, headers=headers)
+        await response(scope, receive, send)
@@ -0,0 +1,97 @@
+"""
+Interval arithmetic on sorted lists of half-open [start, end) intervals of
+UTC epoch seconds.
+
+Appointment conflicts are inclusive (see AppointmentService._check_availability:
+an existing booking conflicts when it starts at or before the requested end
+and ends at or after the requested start). On whole seconds that is the same
+as half-open overlap once both intervals are extended by one second, which is
+what conflict_interval does, so everything here can stay half-open.
+"""
+from datetime import datetime, timezone
+from typing import Iterable, List, Sequence, Tuple
+
+Interval = Tuple[int, int]
+
+
+def to_epoch(value: datetime) -> int:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp())
+
+
+def from_epoch(value: int) -> datetime:
+    return datetime.fromtimestamp(value, tz=timezone.utc)
+
+
+def conflict_interval(start: datetime, end: datetime) -> Interval:
+    """The half-open interval an inclusive [start, end] booking occupies."""
+    return to_epoch(start), to_epoch(end) + 1
+
+
+def merge(intervals: Iterable[Interval]) -> List[Interval]:
+    """Sort and coalesce overlapping or touching intervals."""
+    merged: List[Interval] = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def complement(busy: Sequence[Interval], window: Interval) -> List[Interval]:
+    """Free intervals inside window, given merged busy intervals."""
+    free: List[Interval] = []
+    cursor, window_end = window
+    for start, end in busy:
+        if end <= cursor:
+            continue
+        if start >= window_end:
+            break
+        if start > cursor:
+            free.append((cursor, start))
+        cursor = max(cursor, end)
+    if cursor < window_end:
+        free.append((cursor, window_end))
+    return free
+
+
+def intersect(a: Sequence[Interval], b: Sequence[Interval]) -> List[Interval]:
+    """Intersection of two sorted, disjoint interval lists with a two-pointer sweep."""
+    result: List[Interval] = []
+    i = j = 0
+    while i < len(a) and j < len(b):
+        start = max(a[i][0], b[j][0])
+        end = min(a[i][1], b[j][1])
+        if start < end:
+            result.append((start, end))
+        if a[i][1] < b[j][1]:
+            i += 1
+        else:
+            j += 1
+    return result
+
+
+def intersect_all(lists: Sequence[Sequence[Interval]]) -> List[Interval]:
+    if not lists:
+        return []
+    result = list(lists[0])
+    for other in lists[1:]:
+        result = intersect(result, other)
+        if not result:
+            break
+    return result
+
+
+def slot_starts(free: Sequence[Interval], length: int, step: int, origin: int) -> List[int]:
+    """
+    Start times on the origin + k * step grid where an interval of length
+    seconds fits entirely inside one of the free intervals.
+    """
+    starts = []
+    for start, end in free:
+        first = origin + -(-(start - origin) // step) * step
+        starts.extend(range(first, end - length + 1, step))
+    return starts
@@ -0,0 +1,175 @@
+"""
+Startup and shutdown.
+
+Startup pre-warms (see app.core.prewarm), declares the broker's exchanges
+and queues, and starts the background tasks; only then does /health/ready
+report ready. A database or broker that is down, or slower than
+STARTUP_TIMEOUT_SECONDS, is logged and the app starts without it: both
+reconnect on demand. /health stays the liveness check throughout.
+
+On SIGTERM, readiness turns to draining and the event streams are ended
+while the server keeps serving for SHUTDOWN_GRACE_SECONDS, long enough for
+load balancers to stop sending new requests. Where the server's SIGTERM
+handler cannot be wrapped this is logged at startup, and a preStop hook
+that waits as long should take its place. The server then stops
+accepting connections and waits for in-flight requests to finish (uvicorn's
+--timeout-graceful-shutdown bounds the wait) before the shutdown below
+stops the background tasks, flushes the audit log and closes the broker
+connection and database pools.
+"""
+import asyncio
+import logging
+import signal
+from contextlib import asynccontextmanager
+from types import FrameType
+from typing import AsyncIterator, Callable, Dict, Optional
+
+from fastapi import FastAPI
+
+from app.api.lazy import load_routers
+from app.core.audit import audit_writer
+from app.core.config import settings
+from app.core.events import EVENTS_EXCHANGE, bind_event_loop, consume_events, event_hub
+from app.core.prewarm import prewarm_database
+from app.core.rabbitmq import RabbitMQ
+from app.db.replicas import replica_router
+from app.db.session import dispose_engine
+from app.services.audit_log_service import AuditMaintenanceScheduler
+from app.services.reminder_service import ReminderScheduler
+
+logger = logging.getLogger(__name__)
+
+NOTIFICATIONS_QUEUE = "notifications"
+
+
+class Readiness:
+    """Whether the app should be sent traffic: not until startup finishes, and not once draining."""
+
+    def __init__(self):
+        self.ready = False
+        self.draining = False
+
+    @property
+    def status(self) -> str:
+        if self.draining:
+            return "draining"
+        return "ready" if self.ready else "starting"
+
+    def mark_ready(self) -> None:
+        self.ready, self.draining = True, False
+        event_hub.closed = False
+
+    def start_draining(self) -> None:
+        if not self.draining:
+            logger.info("Draining: reporting not ready and ending event streams")
+        self.draining = True
+        event_hub.close()
+
+
+readiness = Readiness()
+
+
+def _drain_then(loop: asyncio.AbstractEventLoop, grace_seconds: float, stop: Callable[[], None]) -> None:
+    if readiness.draining:
+        # A second SIGTERM stops waiting
+        stop()
+        return
+    readiness.start_draining()
+    loop.call_later(grace_seconds, stop)
+
+
+def install_drain_on_sigterm(loop: asyncio.AbstractEventLoop, grace_seconds: float = settings.SHUTDOWN_GRACE_SECONDS) -> bool:
+    """
+    Wrap the server's SIGTERM handler so it runs grace_seconds after draining starts.
+    Returns False, leaving the handler alone, where there is none to wrap.
+    """
+    if grace_seconds <= 0:
+        return False
+    # uvicorn before 0.29 adds its handler to the loop, which asyncio offers no public way to read back
+    loop_handler = getattr(loop, "_signal_handlers", {}).get(signal.SIGTERM)
+    if loop_handler is not None:
+        loop.add_signal_handler(signal.SIGTERM, _drain_then, loop, grace_seconds, loop_handler._run)
+        return True
+    # uvicorn 0.29 and later use signal.signal
+    previous = signal.getsignal(signal.SIGTERM)
+    if callable(previous):
+        def handle_sigterm(sig: int, frame: Optional[FrameType]) -> None:
+            loop.call_soon_threadsafe(_drain_then, loop, grace_seconds, lambda: previous(sig, frame))
+
+        signal.signal(signal.SIGTERM, handle_sigterm)
+        return True
+    return False
+
+
+async def _startup_step(name: str, step) -> None:
+    try:
+        await asyncio.wait_for(step, timeout=settings.STARTUP_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        logger.error(f"{name} did not finish within {settings.STARTUP_TIMEOUT_SECONDS}s; starting without it")
+    except Exception as e:
+        logger.error(f"Error during startup ({name}): {str(e)}")
+
+
+def _start_background_tasks() -> Dict[str, asyncio.Task]:
+    tasks = {"event_consumer": asyncio.create_task(consume_events())}
+    if settings.REMINDER_SCHEDULER_ENABLED:
+        tasks["reminders"] = asyncio.create_task(ReminderScheduler().run_forever())
+    if replica_router.replicas:
+        tasks["replica_checks"] = asyncio.create_task(replica_router.run_forever())
+    tasks["audit_maintenance"] = asyncio.create_task(AuditMaintenanceScheduler().run_forever())
+    return tasks
+
+
+async def _stop_background_tasks(tasks: Dict[str, asyncio.Task]) -> None:
+    for task in tasks.values():
+        task.cancel()
+    for name, result in zip(tasks, await asyncio.gather(*tasks.values(), return_exceptions=True)):
+        if isinstance(result, Exception):
+            logger.error(f"Background task {name} failed: {str(result)}")
+
+
+async def _close_resources() -> None:
+    try:
+        await asyncio.to_thread(audit_writer.close)
+    except Exception as e:
+        logger.error(f"Error flushing the audit log: {str(e)}")
+    try:
+        await RabbitMQ.close()
+    except Exception as e:
+        logger.error(f"Error closing RabbitMQ connection: {str(e)}")
+    await asyncio.to_thread(dispose_engine)
+    await asyncio.to_thread(replica_router.dispose)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    loop = asyncio.get_running_loop()
+    bind_event_loop(loop)
+    if settings.PREWARM_ON_STARTUP:
+        load_routers(app)
+        await _startup_step("database pre-warm", asyncio.to_thread(prewarm_database))
+    await _startup_step(
+        "broker topology",
+        RabbitMQ.declare_topology(exchanges=[EVENTS_EXCHANGE], queues=[NOTIFICATIONS_QUEUE])
+    )
+    tasks = _start_background_tasks()
+    try:
+        installed = install_drain_on_sigterm(loop)
+    except (NotImplementedError, RuntimeError, ValueError):
+        # No signal handling here (Windows, or not the main thread)
+        installed = False
+    if not installed and settings.SHUTDOWN_GRACE_SECONDS > 0:
+        logger.warning(
+            "Could not wrap the server's SIGTERM handler: draining starts only when the server shuts down. "
+            "Use a preStop hook that waits SHUTDOWN_GRACE_SECONDS instead"
+        )
+    readiness.mark_ready()
+    logger.info("Application ready")
+    try:
+        yield
+    finally:
+        readiness.start_draining()
+        readiness.ready = False
+        await _stop_background_tasks(tasks)
+        await _close_resources()
+        logger.info("Application shut down")
@@ -0,0 +1,111 @@
+"""
+Adaptive concurrency limiting.
+
+When the database falls behind, requests queue for a pooled connection,
+hold their worker thread while they wait, and every client sees the same
+growing latency until requests time out. Refusing the excess early with
+503 and Retry-After keeps the requests that are admitted fast.
+
+The limit on requests in flight starts at LOAD_SHEDDING_MAX_IN_FLIGHT.
+The database pool reports how long each checkout waited (see
+app.db.session); while the moving average is above
+LOAD_SHEDDING_POOL_WAIT_MS the limit is cut by a quarter, at most once a
+second, down to LOAD_SHEDDING_MIN_IN_FLIGHT. While it is below, each
+completed request raises the limit by 1/limit, about one per round of
+requests, back up to the maximum.
+"""
+import threading
+import time
+from typing import Callable, Iterable
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.config import settings
+
+
+class AdaptiveConcurrencyLimiter:
+    def __init__(
+        self,
+        max_limit: int = settings.LOAD_SHEDDING_MAX_IN_FLIGHT,
+        min_limit: int = settings.LOAD_SHEDDING_MIN_IN_FLIGHT,
+        pool_wait_threshold: float = settings.LOAD_SHEDDING_POOL_WAIT_MS / 1000,
+        smoothing: float = 0.2,
+        decrease_factor: float = 0.75,
+        decrease_interval: float = 1.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.max_limit = max_limit
+        self.min_limit = min_limit
+        self.pool_wait_threshold = pool_wait_threshold
+        self.smoothing = smoothing
+        self.decrease_factor = decrease_factor
+        self.decrease_interval = decrease_interval
+        self.clock = clock
+        self.limit = float(max_limit)
+        self.in_flight = 0
+        self.pool_wait = 0.0  # Moving average, seconds
+        self._last_decrease = float("-inf")
+        self._lock = threading.Lock()
+
+    def observe_pool_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.pool_wait += self.smoothing * (seconds - self.pool_wait)
+
+    def overloaded(self) -> bool:
+        return self.pool_wait > self.pool_wait_threshold
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            if self.in_flight >= int(self.limit):
+                return False
+            self.in_flight += 1
+            return True
+
+    def release(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            if self.overloaded():
+                now = self.clock()
+                if now - self._last_decrease >= self.decrease_interval:
+                    self.limit = max(self.min_limit, self.limit * self.decrease_factor)
+                    self._last_decrease = now
+            else:
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+
+concurrency_limiter = AdaptiveConcurrencyLimiter()
+
+
+class LoadSheddingMiddleware:
+    """Answers 503 with Retry-After while the in-flight limit is reached."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        limiter: AdaptiveConcurrencyLimiter = concurrency_limiter,
+        exempt_paths: Iterable[str] = ("/", "/health", "/health/ready", f"{settings.API_V1_STR}/events/stream"),
+        retry_after: int = settings.LOAD_SHEDDING_RETRY_AFTER_SECONDS
+    ) -> None:
+        self.app = app
+        self.limiter = limiter
+        # Health checks must answer under load; the event stream is open for as long as a client is
+        self.exempt_paths = frozenset(exempt_paths)
+        self.retry_after = retry_after
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not settings.LOAD_SHEDDING_ENABLED or scope["path"] in self.exempt_paths:
+            await self.app(scope, receive, send)
+            return
+        if not self.limiter.try_acquire():
+            response = JSONResponse(
+                {"detail": "Server is overloaded, try again shortly"},
+                status_code=503,
+                headers={"Retry-After": str(self.retry_after)}
+            )
+            await response(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.limiter.release()
@@ -0,0 +1,21 @@
+import base64
+from datetime import datetime
+from typing import Optional, Tuple
+
+
+def encode_cursor(sort_value: datetime, id: str) -> str:
+    """Encode a (timestamp, id) keyset position as an opaque cursor string."""
+    raw = f"{sort_value.isoformat()}|{id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Tuple[datetime, str]]:
+    """Decode a cursor produced by encode_cursor, raising ValueError if it is malformed."""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        sort_value, id = raw.split("|", 1)
+        return datetime.fromisoformat(sort_value), id
+    except Exception:
+        raise ValueError("Invalid pagination cursor")
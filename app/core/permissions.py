@@ -1,52 +1,227 @@
-from typing import Optional
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+import threading
+import time
+
 from fastapi import HTTPException, status
+from sqlalchemy import and_, exists, false, or_, true
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
+from app.db.models.doctor_patient_assignment import DoctorPatientAssignment
 from app.db.models.medical_record import MedicalRecord
 from app.db.models.user import User
 
-class MedicalRecordPermissions:
-    @staticmethod
-    def can_view_record(user: User, record: MedicalRecord) -> bool:
-        """Check if user can view a medical record."""
-        if user.role == "admin":
+# Access scopes a role can be granted for an action
+ALL = "all"              # Any resource of this type
+OWN = "own"              # Resources that belong to the user's own doctor/patient profile
+ASSIGNED = "assigned"    # Resources of patients actively assigned to the user's doctor profile
+
+# (resource type, action) -> role -> scopes, any of which grants access
+ROLE_RULES: Dict[str, Dict[str, Dict[str, Tuple[str, ...]]]] = {
+    "medical_record": {
+        "view": {"admin": (ALL,), "staff": (ALL,), "doctor": (OWN, ASSIGNED), "patient": (OWN,)},
+        "create": {"admin": (ALL,), "doctor": (ASSIGNED,)},
+        "update": {"admin": (ALL,), "doctor": (OWN,)},
+        "delete": {"admin": (ALL,), "doctor": (OWN,)},
+    },
+    "doctor_patient_assignment": {
+        "view": {"admin": (ALL,), "doctor": (OWN,)},
+        "create": {"admin": (ALL,), "doctor": (ALL,)},
+        "update": {"admin": (ALL,), "doctor": (OWN,)},
+        "delete": {"admin": (ALL,), "doctor": (OWN,)},
+    },
+}
+
+
+def _compile_rules(rules) -> Dict[Tuple[str, str, str], FrozenSet[str]]:
+    """Flatten the rule table into one dict lookup per check."""
+    return {
+        (resource_type, action, role): frozenset(scopes)
+        for resource_type, actions in rules.items()
+        for action, roles in actions.items()
+        for role, scopes in roles.items()
+    }
+
+
+class AssignmentCache:
+    """
+    Per-process cache of each doctor's actively assigned patient IDs.
+
+    A doctor's set is loaded with one query the first time it is needed and
+    dropped when DoctorPatientAssignmentService changes one of their
+    assignments. Entries also expire after a TTL, counted from when the load
+    started, so changes made through other instances are picked up.
+    Invalidation bumps a generation counter (per doctor, or global for all),
+    and a load that started before it is discarded instead of stored.
+    """
+
+    def __init__(self, ttl_seconds: int = settings.PERMISSION_CACHE_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._sets: Dict[str, Tuple[float, FrozenSet[str]]] = {}
+        self._generation = 0
+        self._doctor_generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, db: Session, doctor_id) -> FrozenSet[str]:
+        doctor_id = str(doctor_id)
+        with self._lock:
+            cached = self._sets.get(doctor_id)
+            generations = (self._generation, self._doctor_generations.get(doctor_id, 0))
+        loaded_at = time.monotonic()
+        if cached and loaded_at - cached[0] < self.ttl_seconds:
+            return cached[1]
+
+        rows = db.query(DoctorPatientAssignment.patient_id).filter(
+            DoctorPatientAssignment.doctor_id == doctor_id,
+            DoctorPatientAssignment.is_active == True
+        ).all()
+        patient_ids = frozenset(str(row.patient_id) for row in rows)
+        with self._lock:
+            if generations == (self._generation, self._doctor_generations.get(doctor_id, 0)):
+                self._sets[doctor_id] = (loaded_at, patient_ids)
+        return patient_ids
+
+    def warm(self, db: Session) -> int:
+        """Load every doctor's active assignment set in a single query."""
+        with self._lock:
+            generation, doctor_generations = self._generation, dict(self._doctor_generations)
+        loaded_at = time.monotonic()
+        grouped: Dict[str, set] = {}
+        for row in db.query(DoctorPatientAssignment.doctor_id, DoctorPatientAssignment.patient_id).filter(
+            DoctorPatientAssignment.is_active == True
+        ):
+            grouped.setdefault(str(row.doctor_id), set()).add(str(row.patient_id))
+        with self._lock:
+            if generation != self._generation:
+                return 0
+            # Doctors invalidated while the query ran are left to load on demand
+            self._sets = {
+                doctor_id: (loaded_at, frozenset(ids)) for doctor_id, ids in grouped.items()
+                if self._doctor_generations.get(doctor_id, 0) == doctor_generations.get(doctor_id, 0)
+            }
+            return len(self._sets)
+
+    def invalidate(self, doctor_id=None) -> None:
+        with self._lock:
+            if doctor_id is None:
+                self._generation += 1
+                self._sets.clear()
+            else:
+                doctor_id = str(doctor_id)
+                self._doctor_generations[doctor_id] = self._doctor_generations.get(doctor_id, 0) + 1
+                self._sets.pop(doctor_id, None)
+
+
+class AuthorizationEngine:
+    """Central role/ownership/assignment checks shared by the services."""
+
+    def __init__(self, rules=ROLE_RULES, assignments: Optional[AssignmentCache] = None):
+        self._rules = _compile_rules(rules)
+        self.assignments = assignments or AssignmentCache()
+
+    def scopes(self, user: User, resource_type: str, action: str) -> FrozenSet[str]:
+        return self._rules.get((resource_type, action, user.role), frozenset())
+
+    def has_role_access(self, user: User, resource_type: str, action: str) -> bool:
+        """Whether the user's role can perform the action on at least some resources."""
+        return bool(self.scopes(user, resource_type, action))
+
+    def require_role_access(self, user: User, resource_type: str, action: str, detail: str) -> FrozenSet[str]:
+        scopes = self.scopes(user, resource_type, action)
+        if not scopes:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=detail
+            )
+        return scopes
+
+    def assigned_patient_ids(self, db: Session, user: User) -> FrozenSet[str]:
+        if user.role != "doctor" or not user.doctor_id:
+            return frozenset()
+        return self.assignments.get(db, user.doctor_id)
+
+    def _owns(self, user: User, doctor_id, patient_id) -> bool:
+        if user.role == "doctor":
+            return user.doctor_id is not None and str(doctor_id) == str(user.doctor_id)
+        if user.role == "patient":
+            return user.patient_id is not None and str(patient_id) == str(user.patient_id)
+        return False
+
+    def _allowed(self, scopes: FrozenSet[str], user: User, doctor_id, patient_id,
+                 assigned: Optional[FrozenSet[str]]) -> bool:
+        if ALL in scopes:
             return True
-        if user.role == "doctor" and record.doctor_id == user.doctor_id:
+        if OWN in scopes and self._owns(user, doctor_id, patient_id):
             return True
-        if user.role == "patient" and record.patient_id == user.patient_id:
+        if ASSIGNED in scopes and assigned is not None and str(patient_id) in assigned:
             return True
-        if user.role == "staff":
-            # Staff can view records if they're in the same department as the doctor
-            return True  # TODO: Implement department-based access in future version 
         return False
 
+    def can(self, db: Session, user: User, resource_type: str, action: str,
+            doctor_id=None, patient_id=None) -> bool:
+        """Check one resource, identified by the doctor and patient it belongs to."""
+        scopes = self.scopes(user, resource_type, action)
+        assigned = self.assigned_patient_ids(db, user) if ASSIGNED in scopes else None
+        return self._allowed(scopes, user, doctor_id, patient_id, assigned)
+
+    def filter_records(self, db: Session, user: User, records: Iterable[MedicalRecord],
+                       action: str = "view") -> List[MedicalRecord]:
+        """Keep the records the user may act on, with at most one assignment lookup for the batch."""
+        scopes = self.scopes(user, "medical_record", action)
+        if not scopes:
+            return []
+        assigned = self.assigned_patient_ids(db, user) if ASSIGNED in scopes else None
+        return [
+            record for record in records
+            if self._allowed(scopes, user, record.doctor_id, record.patient_id, assigned)
+        ]
+
+    def record_filter(self, user: User, action: str = "view"):
+        """
+        Compile the user's medical record access into a SQL predicate, so list
+        queries only ever load rows the user is allowed to see.
+        """
+        scopes = self.scopes(user, "medical_record", action)
+        if ALL in scopes:
+            return true()
+        clauses = []
+        if OWN in scopes:
+            if user.role == "doctor" and user.doctor_id:
+                clauses.append(MedicalRecord.doctor_id == user.doctor_id)
+            elif user.role == "patient" and user.patient_id:
+                clauses.append(MedicalRecord.patient_id == user.patient_id)
+        if ASSIGNED in scopes and user.role == "doctor" and user.doctor_id:
+            clauses.append(exists().where(and_(
+                DoctorPatientAssignment.doctor_id == user.doctor_id,
+                DoctorPatientAssignment.patient_id == MedicalRecord.patient_id,
+                DoctorPatientAssignment.is_active == True
+            )))
+        return or_(*clauses) if clauses else false()
+
+
+authorization = AuthorizationEngine()
+
+
+class MedicalRecordPermissions:
+    @staticmethod
+    def can_view_record(user: User, record: MedicalRecord, db: Optional[Session] = None) -> bool:
+        """Check if user can view a medical record."""
+        return authorization.can(db, user, "medical_record", "view", record.doctor_id, record.patient_id)
+
     @staticmethod
-    def can_create_record(user: User, patient_id: str) -> bool:
+    def can_create_record(user: User, patient_id: str, db: Optional[Session] = None) -> bool:
         """Check if user can create a medical record."""
-        if user.role == "admin":
-            return True
-        if user.role == "doctor":
-            # TODO: Check if doctor is assigned to the patient, future version
-            return True
-        return False
+        return authorization.can(db, user, "medical_record", "create", user.doctor_id, patient_id)
 
     @staticmethod
     def can_update_record(user: User, record: MedicalRecord) -> bool:
         """Check if user can update a medical record."""
-        if user.role == "admin":
-            return True
-        if user.role == "doctor" and record.doctor_id == user.doctor_id:
-            return True
-        return False
+        return authorization.can(None, user, "medical_record", "update", record.doctor_id, record.patient_id)
 
     @staticmethod
     def can_delete_record(user: User, record: MedicalRecord) -> bool:
         """Check if user can delete a medical record."""
-        if user.role == "admin":
-            return True
-        if user.role == "doctor" and record.doctor_id == user.doctor_id:
-            return True
-        return False
+        return authorization.can(None, user, "medical_record", "delete", record.doctor_id, record.patient_id)
 
 def check_medical_record_permission(
     db: Session,
@@ -58,27 +233,17 @@ def check_medical_record_permission(
     """Check if user has permission to perform action on medical record."""
     if not record and record_id:
         record = db.query(MedicalRecord).filter(MedicalRecord.id == record_id).first()
-    
+
     if not record:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Medical record not found"
         )
 
-    has_permission = False
-    if action == "view":
-        has_permission = MedicalRecordPermissions.can_view_record(user, record)
-    elif action == "create":
-        has_permission = MedicalRecordPermissions.can_create_record(user, record.patient_id)
-    elif action == "update":
-        has_permission = MedicalRecordPermissions.can_update_record(user, record)
-    elif action == "delete":
-        has_permission = MedicalRecordPermissions.can_delete_record(user, record)
-
-    if not has_permission:
+    if not authorization.can(db, user, "medical_record", action, record.doctor_id, record.patient_id):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You don't have permission to perform this action"
         )
 
-    return record 
\ No newline at end of file
+    return record
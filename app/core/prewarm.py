@@ -0,0 +1,50 @@
+"""
+Pre-warming before the app takes traffic.
+
+The first requests after a cold start would otherwise pay for opening
+database connections and filling the per-process caches. prewarm_database
+opens PREWARM_DB_CONNECTIONS pooled connections, loads the assignment
+sets and typeahead tries, and resolves the time zones of every location's
+schedules while the app is still starting. A database that
+is not reachable yet is logged, not fatal: the pool and caches then fill
+on demand.
+"""
+import logging
+import time
+
+from app.core.config import settings
+from app.core.permissions import authorization
+from app.core.timezones import get_zone
+from app.core.typeahead import typeahead
+from app.db.models.location import Location
+from app.db.session import SessionLocal, get_engine
+
+logger = logging.getLogger(__name__)
+
+
+def prewarm_database(connections: int = settings.PREWARM_DB_CONNECTIONS) -> None:
+    started = time.perf_counter()
+    engine = get_engine()
+    opened = []
+    try:
+        # Connections return to the pool when closed; the pool keeps up to its size open
+        for _ in range(min(connections, engine.pool.size())):
+            opened.append(engine.connect())
+    except Exception as e:
+        logger.error(f"Error opening database connections during pre-warm: {str(e)}")
+        return
+    finally:
+        for connection in opened:
+            connection.close()
+
+    db = SessionLocal()
+    try:
+        authorization.assignments.warm(db)
+        typeahead.warm(db)
+        for (time_zone,) in db.query(Location.time_zone).distinct():
+            get_zone(time_zone)
+    except Exception as e:
+        logger.error(f"Error warming caches: {str(e)}")
+    finally:
+        db.close()
+    logger.info(f"Pre-warmed {len(opened)} database connections and caches in {time.perf_counter() - started:.2f}s")
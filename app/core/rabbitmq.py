@@ -1,14 +1,18 @@
+import asyncio
 import aio_pika
-from aio_pika.abc import AbstractConnection, AbstractChannel
+from aio_pika.abc import AbstractConnection, AbstractChannel, AbstractExchange, AbstractQueue
 from app.core.config import settings
 import logging
-from typing import Optional
+from typing import Dict, Iterable, List, Optional
 
 logger = logging.getLogger(__name__)
 
 class RabbitMQ:
     _connection: Optional[AbstractConnection] = None
     _channel: Optional[AbstractChannel] = None
+    # Declared on the current channel, so publishing does not redeclare per message
+    _queues: Dict[str, AbstractQueue] = {}
+    _exchanges: Dict[str, AbstractExchange] = {}
 
     @classmethod
     async def get_connection(cls) -> AbstractConnection:
@@ -25,6 +29,7 @@ class RabbitMQ:
         if cls._channel is None or cls._channel.is_closed:
             connection = await cls.get_connection()
             cls._channel = await connection.channel()
+            cls._queues, cls._exchanges = {}, {}
             logger.info("RabbitMQ channel established")
         return cls._channel
 
@@ -40,6 +45,8 @@ class RabbitMQ:
     @classmethod
     async def declare_queue(cls, queue_name: str, durable: bool = True):
         channel = await cls.get_channel()
+        if queue_name in cls._queues:
+            return cls._queues[queue_name]
         queue = await channel.declare_queue(
             queue_name,
             durable=durable,
@@ -49,6 +56,7 @@ class RabbitMQ:
                 "x-dead-letter-routing-key": queue_name,
             }
         )
+        cls._queues[queue_name] = queue
         return queue
 
     @classmethod
@@ -64,6 +72,25 @@ class RabbitMQ:
         )
         logger.info(f"Message published to queue {queue_name}")
 
+    @classmethod
+    async def publish_messages(cls, queue_name: str, messages: List[str]):
+        """Publish a batch of messages, declaring the queue only once."""
+        if not messages:
+            return
+        channel = await cls.get_channel()
+        await cls.declare_queue(queue_name)
+        await asyncio.gather(*(
+            channel.default_exchange.publish(
+                aio_pika.Message(
+                    body=message.encode(),
+                    delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
+                ),
+                routing_key=queue_name,
+            )
+            for message in messages
+        ))
+        logger.info(f"{len(messages)} messages published to queue {queue_name}")
+
     @classmethod
     async def consume_messages(cls, queue_name: str, callback):
         channel = await cls.get_channel()
@@ -77,4 +104,51 @@ class RabbitMQ:
                     except Exception as e:
                         logger.error(f"Error processing message: {str(e)}")
                         # Message will be requeued if not acknowledged
-                        await message.nack(requeue=True) 
\ No newline at end of file
+                        await message.nack(requeue=True)
+
+    @classmethod
+    async def declare_fanout_exchange(cls, exchange_name: str):
+        channel = await cls.get_channel()
+        if exchange_name not in cls._exchanges:
+            cls._exchanges[exchange_name] = await channel.declare_exchange(
+                exchange_name,
+                aio_pika.ExchangeType.FANOUT,
+                durable=True,
+            )
+        return cls._exchanges[exchange_name]
+
+    @classmethod
+    async def declare_topology(cls, exchanges: Iterable[str] = (), queues: Iterable[str] = ()):
+        """Declare the fanout exchanges and queues the app uses, e.g. at startup before any publish."""
+        for exchange_name in exchanges:
+            await cls.declare_fanout_exchange(exchange_name)
+        for queue_name in queues:
+            await cls.declare_queue(queue_name)
+        logger.info("RabbitMQ topology declared")
+
+    @classmethod
+    async def publish_to_exchange(cls, exchange_name: str, message: str):
+        exchange = await cls.declare_fanout_exchange(exchange_name)
+        await exchange.publish(
+            aio_pika.Message(body=message.encode()),
+            routing_key="",
+        )
+
+    @classmethod
+    async def consume_exchange(cls, exchange_name: str, callback):
+        """
+        Consume every message published to a fanout exchange through an exclusive,
+        auto-deleted queue, so each application instance receives its own copy.
+        """
+        channel = await cls.get_channel()
+        exchange = await cls.declare_fanout_exchange(exchange_name)
+        queue = await channel.declare_queue(exclusive=True, auto_delete=True)
+        await queue.bind(exchange)
+
+        async with queue.iterator() as queue_iter:
+            async for message in queue_iter:
+                async with message.process():
+                    try:
+                        await callback(message.body.decode())
+                    except Exception as e:
+                        logger.error(f"Error processing message from {exchange_name}: {str(e)}")
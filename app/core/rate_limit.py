@@ -0,0 +1,241 @@
+"""
+Token-bucket rate limiting per client and route class.
+
+Each request is put in a route class: "auth" for login and registration
+(every attempt costs a bcrypt hash), "availability" for the slot searches
+that scan schedules and appointments, and "default" for the rest of the
+API. A class has its own bucket of RATE_LIMIT_<CLASS>_PER_MINUTE tokens,
+refilled continuously, so a client can burst up to a minute's allowance
+and is then held to the average rate.
+
+Buckets are keyed by the principal (the subject of a valid bearer token)
+and, for anonymous requests, by the client address. Kiosks behind one
+clinic NAT sign in as different users and so do not share a bucket; one
+kiosk stuck in a retry loop runs out of tokens on its own.
+
+Buckets are kept in process by default. RATE_LIMIT_BACKEND=redis shares
+them between instances: the refill and take run in one Lua script, so
+concurrent requests on different instances cannot both spend the last
+token. If Redis is unreachable requests are let through rather than
+locking everyone out of login.
+"""
+import logging
+import math
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, NamedTuple, Optional, Pattern, Sequence, Tuple
+
+from jose import jwt
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class Limit(NamedTuple):
+    rate: float  # Tokens added per second
+    capacity: float  # Largest burst
+
+    @classmethod
+    def per_minute(cls, count: int) -> "Limit":
+        return cls(rate=count / 60, capacity=count)
+
+
+def take_token(tokens: float, elapsed: float, limit: Limit, cost: float = 1) -> Tuple[float, bool, float]:
+    """
+    Refill a bucket holding tokens for elapsed seconds and take cost from it.
+    Returns (tokens left, allowed, seconds until cost tokens are available).
+    """
+    tokens = min(limit.capacity, tokens + max(elapsed, 0.0) * limit.rate)
+    if tokens >= cost:
+        return tokens - cost, True, 0.0
+    return tokens, False, (cost - tokens) / limit.rate
+
+
+class RateLimitBackend:
+    """Storage for token buckets."""
+
+    async def take(self, key: str, limit: Limit, cost: float = 1) -> Tuple[bool, float]:
+        """Take cost tokens from the bucket at key; returns (allowed, retry after seconds)."""
+        raise NotImplementedError
+
+
+class MemoryBackend(RateLimitBackend):
+    """Buckets in this process, the least recently used dropped beyond max_keys."""
+
+    def __init__(self, max_keys: int = 100000, clock: Callable[[], float] = time.monotonic):
+        self.max_keys = max_keys
+        self.clock = clock
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def take(self, key: str, limit: Limit, cost: float = 1) -> Tuple[bool, float]:
+        now = self.clock()
+        with self._lock:
+            tokens, stamp = self._buckets.pop(key, (limit.capacity, now))
+            tokens, allowed, retry_after = take_token(tokens, now - stamp, limit, cost)
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                # A dropped bucket starts full again, which only ever favours the client
+                self._buckets.popitem(last=False)
+        return allowed, retry_after
+
+
+# KEYS[1] bucket; ARGV rate, capacity, cost. Uses the server clock so
+# instances with skewed clocks agree, and expires buckets once they
+# would be full again anyway.
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'stamp')
+local tokens = tonumber(state[1]) or capacity
+local stamp = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - stamp) * rate)
+local allowed = 0
+local retry_after = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+else
+    retry_after = (cost - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'stamp', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000))
+return {allowed, tostring(retry_after)}
+"""
+
+
+class RedisBackend(RateLimitBackend):
+    """
+    Buckets shared through Redis. client is a redis.asyncio.Redis, or
+    anything with the same async eval(script, numkeys, *keys_and_args).
+    """
+
+    def __init__(self, client, prefix: str = "ratelimit:"):
+        self.client = client
+        self.prefix = prefix
+
+    async def take(self, key: str, limit: Limit, cost: float = 1) -> Tuple[bool, float]:
+        try:
+            allowed, retry_after = await self.client.eval(
+                TOKEN_BUCKET_SCRIPT, 1, self.prefix + key, limit.rate, limit.capacity, cost
+            )
+        except Exception as e:
+            logger.warning(f"Rate limit backend unavailable, allowing request: {str(e)}")
+            return True, 0.0
+        return bool(int(allowed)), float(retry_after)
+
+
+def create_backend() -> RateLimitBackend:
+    if settings.RATE_LIMIT_BACKEND == "redis" and settings.REDIS_HOST:
+        from redis.asyncio import Redis
+
+        client = Redis(
+            host=settings.REDIS_HOST,
+            port=settings.REDIS_PORT or 6379,
+            password=settings.REDIS_PASSWORD,
+            socket_timeout=0.5
+        )
+        return RedisBackend(client)
+    return MemoryBackend()
+
+
+def default_route_classes() -> List[Tuple[str, str, Pattern]]:
+    """(class, method, path pattern) in match order; unmatched API paths are "default"."""
+    api = re.escape(settings.API_V1_STR)
+    return [
+        ("auth", "POST", re.compile(rf"{api}/auth/(login|register)/?$")),
+        ("availability", "GET", re.compile(rf"{api}/appointments/(check-availability|availability)/[^/]+/?$")),
+        ("availability", "GET", re.compile(rf"{api}/resources/availability/?$")),
+    ]
+
+
+def default_limits() -> Dict[str, Limit]:
+    return {
+        "auth": Limit.per_minute(settings.RATE_LIMIT_AUTH_PER_MINUTE),
+        "availability": Limit.per_minute(settings.RATE_LIMIT_AVAILABILITY_PER_MINUTE),
+        "default": Limit.per_minute(settings.RATE_LIMIT_DEFAULT_PER_MINUTE),
+    }
+
+
+def bearer_subject(headers: Headers) -> Optional[str]:
+    """The subject of the request's bearer token, if it carries a valid one."""
+    authorization = headers.get("authorization", "")
+    if not authorization.lower().startswith("bearer "):
+        return None
+    try:
+        payload = jwt.decode(authorization[7:], settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except jwt.JWTError:
+        return None
+    return payload.get("sub")
+
+
+def client_address(scope: Scope, headers: Headers, trust_forwarded_for: bool = settings.RATE_LIMIT_TRUST_FORWARDED_FOR) -> str:
+    if trust_forwarded_for and headers.get("x-forwarded-for"):
+        # The proxy appends the address it saw; earlier entries are whatever the client sent
+        return headers["x-forwarded-for"].split(",")[-1].strip()
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+class RateLimitMiddleware:
+    """Answers 429 with Retry-After once a client's bucket for the route class is empty."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        backend: Optional[RateLimitBackend] = None,
+        limits: Optional[Dict[str, Limit]] = None,
+        route_classes: Optional[Sequence[Tuple[str, str, Pattern]]] = None,
+        trust_forwarded_for: bool = settings.RATE_LIMIT_TRUST_FORWARDED_FOR
+    ) -> None:
+        self.app = app
+        self.backend = backend or create_backend()
+        self.limits = limits or default_limits()
+        self.route_classes = route_classes or default_route_classes()
+        self.trust_forwarded_for = trust_forwarded_for
+
+    def route_class(self, method: str, path: str) -> Optional[str]:
+        for name, route_method, pattern in self.route_classes:
+            if method == route_method and pattern.match(path):
+                return name
+        # The event stream is one long request per client, not a request rate
+        if path.startswith(settings.API_V1_STR) and path != f"{settings.API_V1_STR}/events/stream":
+            return "default"
+        return None
+
+    def client_key(self, scope: Scope, headers: Headers) -> str:
+        subject = bearer_subject(headers)
+        if subject:
+            return f"user:{subject}"
+        return f"ip:{client_address(scope, headers, self.trust_forwarded_for)}"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not settings.RATE_LIMIT_ENABLED:
+            await self.app(scope, receive, send)
+            return
+        name = self.route_class(scope["method"], scope["path"])
+        limit = self.limits.get(name) if name else None
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        key = f"{name}:{self.client_key(scope, Headers(scope=scope))}"
+        allowed, retry_after = await self.backend.take(key, limit)
+        if allowed:
+            await self.app(scope, receive, send)
+            return
+        response = JSONResponse(
+            {"detail": "Too many requests"},
+            status_code=429,
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+        )
+        await response(scope, receive, send)
@@ -0,0 +1,50 @@
+"""
+Streaming large JSON lists.
+
+A list endpoint normally builds every item, validates the whole list and
+encodes it before the first byte leaves, so time to first byte and memory
+grow with the result. json_array_stream writes a JSON array a chunk of
+items at a time instead, reading rows from a server-side cursor
+(yield_per) so only one batch is in memory.
+
+The stream runs after the endpoint has returned, when the request's
+session from deps.get_db is already closed, so it opens its own. Check
+permissions before starting it: once the 200 is sent, an error can only
+cut the array short.
+"""
+import json
+import logging
+from typing import Any, Callable, Iterable, Iterator
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+def json_array_stream(
+    produce: Callable[[Session], Iterable[Any]],
+    items_per_chunk: int = settings.STREAM_ITEMS_PER_CHUNK,
+    session_factory: Callable[[], Session] = SessionLocal
+) -> Iterator[bytes]:
+    """Encode the items produce(db) yields as one JSON array, items_per_chunk items per chunk."""
+    db = session_factory()
+    try:
+        yield b"["
+        separator = ""
+        chunk = []
+        for item in produce(db):
+            chunk.append(json.dumps(item, default=str))
+            if len(chunk) >= items_per_chunk:
+                yield (separator + ",".join(chunk)).encode()
+                separator, chunk = ",", []
+        if chunk:
+            yield (separator + ",".join(chunk)).encode()
+        yield b"]"
+    except Exception as e:
+        logger.error(f"Error streaming JSON list: {str(e)}")
+        raise
+    finally:
+        db.close()
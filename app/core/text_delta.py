@@ -0,0 +1,72 @@
+"""
+Compact word-level deltas between two versions of a text.
+
+A delta is a list of operations applied in order to the source's tokens:
+a positive int copies that many tokens, a negative int skips that many and
+a string is inserted as-is. Whitespace runs are tokens too, so applying a
+delta reproduces the target exactly, e.g. [3, -2, "twice daily", 4].
+"""
+from difflib import SequenceMatcher
+from typing import List, Optional, Union
+import json
+import re
+
+Delta = List[Union[int, str]]
+
+TOKEN = re.compile(r"\s+|[^\s]+")
+
+
+def _tokens(value: str) -> List[str]:
+    return TOKEN.findall(value)
+
+
+def diff(source: str, target: str) -> Delta:
+    """Operations that turn source into target."""
+    source_tokens, target_tokens = _tokens(source), _tokens(target)
+    ops: Delta = []
+    matcher = SequenceMatcher(None, source_tokens, target_tokens, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            ops.append(i2 - i1)
+            continue
+        if i2 > i1:
+            ops.append(-(i2 - i1))
+        if j2 > j1:
+            ops.append("".join(target_tokens[j1:j2]))
+    return ops
+
+
+def apply(source: str, ops: Delta) -> str:
+    source_tokens = _tokens(source)
+    position = 0
+    parts = []
+    for op in ops:
+        if isinstance(op, str):
+            parts.append(op)
+        elif op > 0:
+            parts.extend(source_tokens[position:position + op])
+            position += op
+        else:
+            position -= op
+    if position != len(source_tokens):
+        raise ValueError("Delta does not match the source text")
+    return "".join(parts)
+
+
+def field_delta(source: Optional[str], target: Optional[str]) -> dict:
+    """
+    Delta for one nullable field, falling back to storing the target outright
+    when that is smaller (short fields, rewrites, or either side being NULL).
+    """
+    if source is None or target is None:
+        return {"value": target}
+    ops = diff(source, target)
+    if len(json.dumps(ops)) >= len(json.dumps(target)):
+        return {"value": target}
+    return {"ops": ops}
+
+
+def apply_field_delta(source: Optional[str], delta: dict) -> Optional[str]:
+    if "ops" in delta:
+        return apply(source or "", delta["ops"])
+    return delta["value"]
@@ -0,0 +1,73 @@
+"""
+Turning clinic wall-clock times into instants.
+
+Schedules are stored as local times of day ("09:00 to 17:00 on Mondays") at a
+location with an IANA time zone. Everything that compares times converts them
+to UTC epoch seconds first (see app.core.intervals), so DST only has to be
+handled here:
+
+* a wall time that happens twice when clocks go back resolves to the first
+  occurrence;
+* a wall time that never happens when clocks go forward resolves to the
+  instant the clocks jump, so later wall times never map to earlier instants.
+"""
+from datetime import date, datetime, time
+from functools import lru_cache
+from typing import Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from app.core.config import settings
+from app.core.intervals import Interval
+
+
+@lru_cache(maxsize=None)
+def get_zone(name: Optional[str] = None) -> ZoneInfo:
+    """Resolve an IANA zone name, falling back to DEFAULT_TIME_ZONE. Raises ValueError if unknown."""
+    name = name or settings.DEFAULT_TIME_ZONE
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ValueError(f"Unknown time zone: {name}")
+
+
+def validate_time_zone(name: str) -> str:
+    get_zone(name)
+    return name
+
+
+def local_to_epoch(day: date, at: time, zone: ZoneInfo) -> int:
+    """The UTC epoch second at which the wall clock in zone shows day at."""
+    # fold=0 picks the first occurrence of an ambiguous time
+    naive = datetime.combine(day, at).replace(fold=0)
+    epoch = int(naive.replace(tzinfo=zone).timestamp())
+    if datetime.fromtimestamp(epoch, zone).replace(tzinfo=None) == naive:
+        return epoch
+
+    # The time falls in a spring-forward gap. The offsets on either side of the
+    # gap bound the transition; find the first second with the later offset.
+    after = datetime.fromtimestamp(epoch, zone).utcoffset()
+    low, high = int(naive.replace(tzinfo=zone, fold=1).timestamp()), epoch
+    while low < high:
+        middle = (low + high) // 2
+        if datetime.fromtimestamp(middle, zone).utcoffset() == after:
+            high = middle
+        else:
+            low = middle + 1
+    return low
+
+
+def to_local(value: datetime, zone: ZoneInfo) -> datetime:
+    """Give a naive datetime the zone's wall-clock meaning; aware datetimes are just converted."""
+    if value.tzinfo is not None:
+        return value.astimezone(zone)
+    return datetime.fromtimestamp(local_to_epoch(value.date(), value.time(), zone), zone)
+
+
+def local_date(epoch: int, zone: ZoneInfo) -> date:
+    return datetime.fromtimestamp(epoch, zone).date()
+
+
+def schedule_window(day: date, start: time, end: time, zone: ZoneInfo) -> Interval:
+    """The [start, end) working hours of one local day as epoch seconds."""
+    window_start = local_to_epoch(day, start, zone)
+    return window_start, max(window_start, local_to_epoch(day, end, zone))
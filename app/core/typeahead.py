@@ -0,0 +1,142 @@
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+import re
+import threading
+import time
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+TOKEN_SPLIT = re.compile(r"[\s@._\-+()]+")
+
+
+def tokenize(*values: Optional[str]) -> List[str]:
+    """Lower-cased words a typeahead prefix may start with, e.g. 'jane', 'doe', 'jane doe'."""
+    tokens = []
+    for value in values:
+        if not value:
+            continue
+        value = value.lower().strip()
+        tokens.append(value)
+        tokens.extend(token for token in TOKEN_SPLIT.split(value) if token and token != value)
+    return tokens
+
+
+class _Node:
+    __slots__ = ("children", "entries")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.entries: List[str] = []
+
+
+class PrefixTrie:
+    """
+    Character trie mapping every prefix of the indexed tokens to entry keys.
+
+    Each node keeps up to max_per_node keys in insertion order, so a lookup
+    costs one step per prefix character and never walks the subtree. Insert
+    entries in the order they should be suggested.
+    """
+
+    def __init__(self, max_per_node: int = 20):
+        self.max_per_node = max_per_node
+        self._root = _Node()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def insert(self, key: str, tokens: Iterable[str], entry: Dict[str, Any]) -> None:
+        self._entries[key] = entry
+        for token in set(tokens):
+            node = self._root
+            for char in token:
+                node = node.children.setdefault(char, _Node())
+                if len(node.entries) < self.max_per_node and key not in node.entries:
+                    node.entries.append(key)
+
+    def search(self, prefix: str, limit: int = 10) -> List[Dict[str, Any]]:
+        node = self._root
+        for char in prefix.lower().strip():
+            node = node.children.get(char)
+            if node is None:
+                return []
+        return [self._entries[key] for key in node.entries[:limit]]
+
+
+class TypeaheadCache:
+    """
+    Per-process tries for the patient and doctor directories.
+
+    A directory's trie is built with one streamed query the first time it is
+    needed, swapped in atomically, and rebuilt after the TTL or when the
+    services invalidate it after a write. Only one request rebuilds a stale
+    trie at a time; the others keep answering from the previous one.
+    Invalidation bumps a generation counter, so a build that started before
+    it is never taken for current.
+    """
+
+    def __init__(self, ttl_seconds: int = settings.DIRECTORY_CACHE_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._loaders: Dict[str, Callable[[Session], Iterable[Tuple[str, List[str], Dict[str, Any]]]]] = {}
+        # kind -> (built at, generation it was built from, trie)
+        self._tries: Dict[str, Tuple[float, int, PrefixTrie]] = {}
+        self._generations: Dict[str, int] = {}
+        self._build_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def register(self, kind: str, loader) -> None:
+        """loader(db) yields (key, tokens, entry) in suggestion order."""
+        self._loaders[kind] = loader
+        self._generations.setdefault(kind, 0)
+        self._build_locks.setdefault(kind, threading.Lock())
+
+    def _current(self, kind: str) -> Tuple[Optional[PrefixTrie], bool]:
+        """The cached trie, if any, and whether it is fresh."""
+        with self._lock:
+            cached = self._tries.get(kind)
+            generation = self._generations[kind]
+        if cached is None:
+            return None, False
+        built_at, built_generation, trie = cached
+        return trie, built_generation == generation and time.monotonic() - built_at < self.ttl_seconds
+
+    def _build(self, db: Session, kind: str) -> PrefixTrie:
+        with self._lock:
+            generation = self._generations[kind]
+        trie = PrefixTrie()
+        for key, tokens, entry in self._loaders[kind](db):
+            trie.insert(key, tokens, entry)
+        with self._lock:
+            # Stored even if invalidated meanwhile, but under the old generation, so it stays stale
+            self._tries[kind] = (time.monotonic(), generation, trie)
+        return trie
+
+    def search(self, db: Session, kind: str, prefix: str, limit: int = 10) -> List[Dict[str, Any]]:
+        trie, fresh = self._current(kind)
+        if not fresh:
+            build_lock = self._build_locks[kind]
+            # With a previous trie to fall back on, leave the rebuild to whoever is already at it
+            if build_lock.acquire(blocking=trie is None):
+                try:
+                    trie, fresh = self._current(kind)
+                    if not fresh:
+                        trie = self._build(db, kind)
+                finally:
+                    build_lock.release()
+        return trie.search(prefix, limit)
+
+    def warm(self, db: Session) -> None:
+        for kind in self._loaders:
+            with self._build_locks[kind]:
+                self._build(db, kind)
+
+    def invalidate(self, kind: Optional[str] = None) -> None:
+        with self._lock:
+            for name in (self._generations if kind is None else [kind]):
+                if name in self._generations:
+                    self._generations[name] += 1
+
+
+typeahead = TypeaheadCache()
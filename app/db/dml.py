@@ -0,0 +1,34 @@
+from typing import Any, Dict, Optional, Type
+
+from sqlalchemy import select, update
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+
+from app.db.base_class import Base
+
+
+def update_returning(db: Session, model: Type[Base], id: Any, values: Dict[str, Any], *conditions,
+                     returning=()) -> Optional[Row]:
+    """
+    Write values to one row with a single UPDATE ... RETURNING instead of
+    SELECT, setattr, commit and refresh. Returns the updated row (columns
+    read like model attributes) or None when no row with that id matched the
+    conditions, so the existence check costs nothing extra. Keys that are not
+    columns of the table are ignored, as setattr on the model ignored them.
+
+    The row is plain data: it stays readable after commit, whereas an ORM
+    object would be expired and reloaded.
+    """
+    table = model.__table__
+    values = {key: value for key, value in values.items() if key in table.c}
+    if not values:
+        # Nothing to write; an UPDATE without SET would bump updated_at for no change
+        return db.execute(
+            select(*table.c, *returning).where(table.c.id == id, *conditions)
+        ).first()
+    return db.execute(
+        update(table)
+        .where(table.c.id == id, *conditions)
+        .values(**values)
+        .returning(*table.c, *returning)
+    ).first()
@@ -8,7 +8,16 @@ from app.db.models.doctor import Doctor
 from app.db.models.staff import Staff
 from app.db.models.appointment import Appointment
 from app.db.models.medical_record import MedicalRecord
+from app.db.models.medical_record_revision import MedicalRecordRevision
+from app.db.models.medical_record_attachment import MedicalRecordAttachment
 from app.db.models.doctor_schedule import DoctorSchedule
+from app.db.models.location import Location
+from app.db.models.notification import Notification
+from app.db.models.notification_counter import NotificationCounter
+from app.db.models.audit_log import AuditLog
+from app.db.models.waitlist_entry import WaitlistEntry
+from app.db.models.resource import Resource, ResourceBooking
+from app.db.models.idempotency_key import IdempotencyKey
 
 __all__ = [
     'User',
@@ -17,5 +26,15 @@ __all__ = [
     'Staff',
     'Appointment',
     'MedicalRecord',
-    'DoctorSchedule'
+    'MedicalRecordRevision',
+    'MedicalRecordAttachment',
+    'DoctorSchedule',
+    'Location',
+    'Notification',
+    'NotificationCounter',
+    'AuditLog',
+    'WaitlistEntry',
+    'Resource',
+    'ResourceBooking',
+    'IdempotencyKey'
 ] 
\ No newline at end of file
@@ -1,7 +1,7 @@
 from datetime import datetime
 from uuid import uuid4
 
-from sqlalchemy import Column, ForeignKey, String, Text, Boolean, DateTime, CheckConstraint, text
+from sqlalchemy import Column, ForeignKey, Integer, String, Text, Boolean, DateTime, CheckConstraint, Index, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
@@ -19,6 +19,8 @@ class Appointment(Base):
     status = Column(String(20), nullable=False, default="scheduled")
     reason = Column(Text, nullable=False)
     notes = Column(Text)
+    reminder_sent_at = Column(DateTime(timezone=True))  # Set once the reminder has been dispatched
+    version = Column(Integer, nullable=False, default=1, server_default=text("1"))  # Bumped by every API write, served as the ETag
     created_at = Column(DateTime(timezone=True), nullable=False, server_default=text("now()"))
     updated_at = Column(DateTime(timezone=True), nullable=False, server_default=text("now()"), onupdate=text("now()"))
 
@@ -26,11 +28,24 @@ class Appointment(Base):
     doctor = relationship("Doctor", back_populates="appointments")
     patient = relationship("Patient", back_populates="appointments")
     medical_records = relationship("MedicalRecord", back_populates="appointment", cascade="all, delete-orphan")
+    resource_bookings = relationship("ResourceBooking", back_populates="appointment", passive_deletes=True)
 
     # Add check constraints using proper SQLAlchemy syntax
     __table_args__ = (
         CheckConstraint("end_time > start_time", name="check_end_time_after_start_time"),
         CheckConstraint("status IN ('scheduled', 'confirmed', 'completed', 'cancelled')", name="check_valid_status"),
+        # Calendar views read only these columns, so they are answered by an index-only scan
+        Index(
+            "idx_appointments_doctor_start",
+            "doctor_id", "start_time",
+            postgresql_include=["end_time", "status"]
+        ),
+        Index(
+            "idx_appointments_reminder_due",
+            "start_time",
+            "id",
+            postgresql_where=text("reminder_sent_at IS NULL AND status IN ('scheduled', 'confirmed')"),
+        ),
     )
 
     def __repr__(self):
@@ -0,0 +1,45 @@
+from datetime import datetime
+from uuid import uuid4
+
+from sqlalchemy import DDL, Column, ForeignKey, String, DateTime, Index, event, text
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+
+from app.db.base_class import Base
+
+
+DEFAULT_PARTITION = "audit_logs_default"
+
+
+class AuditLog(Base):
+    """
+    Audit trail, range-partitioned by month on created_at (see AuditLogService).
+    Rows outside every monthly partition land in the default partition, so
+    inserts never fail for want of one.
+    """
+    __tablename__ = "audit_logs"
+
+    id = Column(UUID, primary_key=True, default=uuid4)
+    user_id = Column(UUID, ForeignKey("users.id", ondelete="SET NULL"))
+    action = Column(String(50), nullable=False)
+    resource_type = Column(String(50), nullable=False)
+    resource_id = Column(UUID)
+    details = Column(JSONB)
+    ip_address = Column(String(45))
+    # Part of the primary key because Postgres requires the partition key in it
+    created_at = Column(DateTime(timezone=True), primary_key=True, server_default=text("now()"))
+
+    __table_args__ = (
+        Index("idx_audit_logs_resource_created", "resource_type", "resource_id", text("created_at DESC")),
+        Index("idx_audit_logs_user_created", "user_id", text("created_at DESC")),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+
+    def __repr__(self):
+        return f"<AuditLog {self.id}: {self.action} {self.resource_type} {self.resource_id}>"
+
+
+event.listen(
+    AuditLog.__table__,
+    "after_create",
+    DDL(f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF audit_logs DEFAULT").execute_if(dialect="postgresql")
+)
@@ -1,15 +1,25 @@
 from datetime import datetime
 from uuid import uuid4
 
-from sqlalchemy import Column, String, Text, Boolean, DateTime, text
+from sqlalchemy import Column, String, Text, Boolean, DateTime, Index, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
 from app.db.base_class import Base
 
+# Lower-cased text matched by directory search; queries must use the same
+# expression for Postgres to pick idx_doctors_directory_trgm
+SEARCH_TEXT = (
+    "lower(first_name || ' ' || last_name || ' ' || specialization || ' ' || "
+    "email || ' ' || phone || ' ' || license_number)"
+)
+
 
 class Doctor(Base):
     __tablename__ = "doctors"
+    __table_args__ = (
+        Index("idx_doctors_directory_trgm", text(f"({SEARCH_TEXT}) gin_trgm_ops"), postgresql_using="gin"),
+    )
 
     id = Column(UUID, primary_key=True, default=uuid4)
     first_name = Column(String(255), nullable=False)
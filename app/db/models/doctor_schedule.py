@@ -17,9 +17,11 @@ class DoctorSchedule(Base):
     start_time = Column(Time, nullable=False)
     end_time = Column(Time, nullable=False)
     is_available = Column(Boolean, default=True)
+    location_id = Column(UUID, ForeignKey("locations.id", ondelete="SET NULL"))  # NULL: DEFAULT_TIME_ZONE
 
     # Relationships
     doctor = relationship("Doctor", back_populates="schedules")
+    location = relationship("Location", back_populates="schedules", lazy="joined")
 
     __table_args__ = (
         CheckConstraint("day_of_week BETWEEN 0 AND 6", name="valid_day_of_week"),
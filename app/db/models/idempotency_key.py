@@ -0,0 +1,25 @@
+from sqlalchemy import Column, String, SmallInteger, LargeBinary, DateTime, Index
+from sqlalchemy.dialects.postgresql import JSONB
+
+from app.db.base_class import Base
+
+
+class IdempotencyKey(Base):
+    """Response to a POST sent with an Idempotency-Key header, kept until expires_at (see app.core.idempotency)."""
+    __tablename__ = "idempotency_keys"
+
+    owner = Column(String(64), primary_key=True)  # user:<id>, or ip:<address> for anonymous clients
+    key = Column(String(255), primary_key=True)
+    fingerprint = Column(String(64), nullable=False)  # SHA-256 of method, path, query and body
+    status_code = Column(SmallInteger)  # NULL while the first attempt is in progress
+    headers = Column(JSONB)  # [[name, value], ...] of the stored response, replayed with the body
+    body = Column(LargeBinary)
+    locked_until = Column(DateTime(timezone=True))  # An unfinished attempt can be taken over after this
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        Index("idx_idempotency_keys_expires_at", "expires_at"),
+    )
+
+    def __repr__(self):
+        return f"<IdempotencyKey {self.owner} {self.key}: {self.status_code}>"
@@ -0,0 +1,26 @@
+from uuid import uuid4
+
+from sqlalchemy import Column, String, Text, Boolean, DateTime, text
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import relationship
+
+from app.db.base_class import Base
+
+
+class Location(Base):
+    """A clinic site. Schedules at a location are wall-clock times in its time zone."""
+    __tablename__ = "locations"
+
+    id = Column(UUID, primary_key=True, default=uuid4)
+    name = Column(String(255), nullable=False, unique=True)
+    time_zone = Column(String(64), nullable=False)  # IANA name, e.g. Africa/Nairobi
+    address = Column(Text)
+    is_active = Column(Boolean, nullable=False, default=True)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=text("now()"))
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=text("now()"), onupdate=text("now()"))
+
+    # Relationships
+    schedules = relationship("DoctorSchedule", back_populates="location")
+
+    def __repr__(self):
+        return f"<Location {self.id}: {self.name} ({self.time_zone})>"
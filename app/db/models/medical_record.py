@@ -1,8 +1,8 @@
 from datetime import datetime
 from uuid import uuid4
 
-from sqlalchemy import Column, ForeignKey, Text, DateTime, text
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, Computed, ForeignKey, Integer, Text, DateTime, Index, text
+from sqlalchemy.dialects.postgresql import TSVECTOR, UUID
 from sqlalchemy.orm import relationship
 
 from app.db.base_class import Base
@@ -10,6 +10,22 @@ from app.db.base_class import Base
 
 class MedicalRecord(Base):
     __tablename__ = "medical_records"
+    __table_args__ = (
+        # Serve the newest-first keyset listings; doctor_id is included so the
+        # ownership predicate can be checked from the index
+        Index(
+            "idx_medical_records_patient_created",
+            "patient_id", text("created_at DESC"), text("id DESC"),
+            postgresql_include=["doctor_id"]
+        ),
+        Index("idx_medical_records_doctor_created", "doctor_id", text("created_at DESC"), text("id DESC")),
+        Index("idx_medical_records_search", "search_vector", postgresql_using="gin"),
+        # Fuzzy drug-name matching (requires the pg_trgm extension)
+        Index(
+            "idx_medical_records_prescription_trgm", "prescription",
+            postgresql_using="gin", postgresql_ops={"prescription": "gin_trgm_ops"}
+        ),
+    )
 
     id = Column(UUID, primary_key=True, default=uuid4)
     patient_id = Column(UUID, ForeignKey("patients.id", ondelete="CASCADE"), nullable=False)
@@ -18,13 +34,30 @@ class MedicalRecord(Base):
     diagnosis = Column(Text)
     prescription = Column(Text)
     notes = Column(Text)
+    # Latest version number; older versions are rebuilt from medical_record_revisions
+    current_version = Column(Integer, nullable=False, default=1, server_default=text("1"))
     created_at = Column(DateTime(timezone=True), nullable=False, server_default=text("now()"))
     updated_at = Column(DateTime(timezone=True), nullable=False, server_default=text("now()"), onupdate=text("now()"))
+    # Maintained by Postgres; diagnosis matches rank above prescription, then notes
+    search_vector = Column(TSVECTOR, Computed(
+        "setweight(to_tsvector('english', coalesce(diagnosis, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(prescription, '')), 'B') || "
+        "setweight(to_tsvector('english', coalesce(notes, '')), 'C')",
+        persisted=True
+    ))
 
     # Relationships
     patient = relationship("Patient", back_populates="medical_records")
     appointment = relationship("Appointment", back_populates="medical_records")
     doctor = relationship("Doctor", back_populates="medical_records")
+    revisions = relationship(
+        "MedicalRecordRevision", back_populates="record",
+        cascade="all, delete-orphan", passive_deletes=True
+    )
+    attachments = relationship(
+        "MedicalRecordAttachment", back_populates="record",
+        cascade="all, delete-orphan", passive_deletes=True
+    )
 
     def __repr__(self):
         return f"<MedicalRecord {self.id}: Patient {self.patient_id}, Doctor {self.doctor_id}>" 
\ No newline at end of file
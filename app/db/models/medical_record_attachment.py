@@ -0,0 +1,35 @@
+from uuid import uuid4
+
+from sqlalchemy import Column, ForeignKey, BigInteger, String, DateTime, Index, text
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import relationship
+
+from app.db.base_class import Base
+
+
+class MedicalRecordAttachment(Base):
+    """
+    Metadata for a file attached to a medical record. The bytes live in the
+    content-addressed blob store under sha256, shared by identical uploads.
+    """
+    __tablename__ = "medical_record_attachments"
+
+    id = Column(UUID, primary_key=True, default=uuid4)
+    record_id = Column(UUID, ForeignKey("medical_records.id", ondelete="CASCADE"), nullable=False)
+    filename = Column(String(255), nullable=False)
+    content_type = Column(String(100), nullable=False)
+    size = Column(BigInteger, nullable=False)
+    sha256 = Column(String(64), nullable=False)
+    uploaded_by = Column(UUID, ForeignKey("users.id", ondelete="SET NULL"))
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=text("now()"))
+
+    __table_args__ = (
+        Index("idx_medical_record_attachments_record", "record_id", "created_at"),
+        Index("idx_medical_record_attachments_sha256", "sha256"),
+    )
+
+    # Relationships
+    record = relationship("MedicalRecord", back_populates="attachments")
+
+    def __repr__(self):
+        return f"<MedicalRecordAttachment {self.id}: {self.filename} ({self.size} bytes)>"
@@ -0,0 +1,37 @@
+from uuid import uuid4
+
+from sqlalchemy import Column, ForeignKey, Integer, Text, DateTime, UniqueConstraint, text
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, UUID
+from sqlalchemy.orm import relationship
+
+from app.db.base_class import Base
+
+
+class MedicalRecordRevision(Base):
+    """
+    One edit of a medical record, append-only.
+
+    Revision N records who produced version N and a reverse delta that turns
+    version N's text back into version N-1's, so the record row always holds
+    the latest text and older versions are rebuilt by walking back.
+    """
+    __tablename__ = "medical_record_revisions"
+
+    id = Column(UUID, primary_key=True, default=uuid4)
+    record_id = Column(UUID, ForeignKey("medical_records.id", ondelete="CASCADE"), nullable=False)
+    version = Column(Integer, nullable=False)
+    changed_fields = Column(ARRAY(Text), nullable=False)
+    delta = Column(JSONB, nullable=False)
+    author_id = Column(UUID, ForeignKey("users.id", ondelete="SET NULL"))
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=text("now()"))
+
+    __table_args__ = (
+        # Also stops two concurrent edits from both producing the same version
+        UniqueConstraint("record_id", "version", name="uq_medical_record_revisions_version"),
+    )
+
+    # Relationships
+    record = relationship("MedicalRecord", back_populates="revisions")
+
+    def __repr__(self):
+        return f"<MedicalRecordRevision {self.record_id} v{self.version}>"
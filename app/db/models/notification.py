@@ -0,0 +1,36 @@
+from datetime import datetime
+from uuid import uuid4
+
+from sqlalchemy import Column, ForeignKey, String, Text, Boolean, DateTime, Index, text
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import relationship
+
+from app.db.base_class import Base
+
+
+class Notification(Base):
+    __tablename__ = "notifications"
+
+    id = Column(UUID, primary_key=True, default=uuid4)
+    user_id = Column(UUID, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    type = Column(String(50), nullable=False)
+    content = Column(Text, nullable=False)
+    is_read = Column(Boolean, nullable=False, default=False)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=text("now()"))
+
+    # Relationships
+    user = relationship("User")
+
+    __table_args__ = (
+        Index("idx_notifications_user_created", "user_id", text("created_at DESC"), text("id DESC")),
+        Index(
+            "idx_notifications_unread",
+            "user_id",
+            text("created_at DESC"),
+            text("id DESC"),
+            postgresql_where=text("is_read = false"),
+        ),
+    )
+
+    def __repr__(self):
+        return f"<Notification {self.id}: {self.type} for User {self.user_id}>"
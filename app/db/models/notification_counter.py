@@ -0,0 +1,20 @@
+from sqlalchemy import Column, ForeignKey, Integer, DateTime, CheckConstraint, text
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.db.base_class import Base
+
+
+class NotificationCounter(Base):
+    """Per-user unread notification counter, kept in step with the notifications table."""
+    __tablename__ = "notification_counters"
+
+    user_id = Column(UUID, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    unread_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=text("now()"), onupdate=text("now()"))
+
+    __table_args__ = (
+        CheckConstraint("unread_count >= 0", name="check_unread_count_non_negative"),
+    )
+
+    def __repr__(self):
+        return f"<NotificationCounter User {self.user_id}: {self.unread_count} unread>"
@@ -1,15 +1,23 @@
 from datetime import datetime, date
 from uuid import uuid4
 
-from sqlalchemy import Column, String, Text, DateTime, Date, JSON, text
+from sqlalchemy import Column, String, Text, DateTime, Date, Index, JSON, text
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 
 from app.db.base_class import Base
 
+# Lower-cased text matched by directory search; queries must use the same
+# expression for Postgres to pick idx_patients_directory_trgm
+SEARCH_TEXT = "lower(first_name || ' ' || last_name || ' ' || email || ' ' || phone)"
+
 
 class Patient(Base):
     __tablename__ = "patients"
+    __table_args__ = (
+        Index("idx_patients_directory_trgm", text(f"({SEARCH_TEXT}) gin_trgm_ops"), postgresql_using="gin"),
+        Index("idx_patients_created", "created_at", "id"),
+    )
 
     id = Column(UUID, primary_key=True, default=uuid4)
     first_name = Column(String(255), nullable=False)
@@ -0,0 +1,58 @@
+from uuid import uuid4
+
+from sqlalchemy import Column, ForeignKey, String, Boolean, DateTime, CheckConstraint, Index, text
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import relationship
+
+from app.db.base_class import Base
+
+
+class Resource(Base):
+    """A bookable exam room or piece of equipment."""
+    __tablename__ = "resources"
+
+    id = Column(UUID, primary_key=True, default=uuid4)
+    name = Column(String(255), nullable=False, unique=True)
+    kind = Column(String(20), nullable=False)
+    is_active = Column(Boolean, nullable=False, default=True)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=text("now()"))
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=text("now()"), onupdate=text("now()"))
+
+    # Relationships
+    bookings = relationship("ResourceBooking", back_populates="resource", passive_deletes=True)
+
+    __table_args__ = (
+        CheckConstraint("kind IN ('room', 'equipment')", name="check_resource_kind"),
+    )
+
+    def __repr__(self):
+        return f"<Resource {self.id}: {self.name} ({self.kind})>"
+
+
+class ResourceBooking(Base):
+    """A resource held for an appointment; it is free again once the appointment is cancelled."""
+    __tablename__ = "resource_bookings"
+
+    id = Column(UUID, primary_key=True, default=uuid4)
+    resource_id = Column(UUID, ForeignKey("resources.id", ondelete="CASCADE"), nullable=False)
+    appointment_id = Column(UUID, ForeignKey("appointments.id", ondelete="CASCADE"), nullable=False)
+    start_time = Column(DateTime(timezone=True), nullable=False)
+    end_time = Column(DateTime(timezone=True), nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=text("now()"))
+
+    # Relationships
+    resource = relationship("Resource", back_populates="bookings")
+    appointment = relationship("Appointment", back_populates="resource_bookings")
+
+    __table_args__ = (
+        CheckConstraint("end_time > start_time", name="check_resource_booking_times"),
+        Index(
+            "idx_resource_bookings_resource_time",
+            "resource_id", "start_time",
+            postgresql_include=["end_time", "appointment_id"]
+        ),
+        Index("idx_resource_bookings_appointment", "appointment_id"),
+    )
+
+    def __repr__(self):
+        return f"<ResourceBooking {self.resource_id}: {self.start_time} to {self.end_time}>"
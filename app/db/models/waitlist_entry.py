@@ -0,0 +1,46 @@
+from uuid import uuid4
+
+from sqlalchemy import Column, ForeignKey, Integer, String, Text, DateTime, CheckConstraint, Index, text
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import relationship
+
+from app.db.base_class import Base
+
+
+class WaitlistEntry(Base):
+    """A patient waiting for any slot of duration_minutes with a doctor inside a time window."""
+    __tablename__ = "waitlist_entries"
+
+    id = Column(UUID, primary_key=True, default=uuid4)
+    doctor_id = Column(UUID, ForeignKey("doctors.id", ondelete="CASCADE"), nullable=False)
+    patient_id = Column(UUID, ForeignKey("patients.id", ondelete="CASCADE"), nullable=False)
+    earliest_start = Column(DateTime(timezone=True), nullable=False)
+    latest_end = Column(DateTime(timezone=True), nullable=False)
+    duration_minutes = Column(Integer, nullable=False)
+    priority = Column(Integer, nullable=False, default=0)  # Higher is served first
+    reason = Column(Text, nullable=False)
+    status = Column(String(20), nullable=False, default="waiting")
+    appointment_id = Column(UUID, ForeignKey("appointments.id", ondelete="SET NULL"))
+    requested_at = Column(DateTime(timezone=True), nullable=False, server_default=text("now()"))
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=text("now()"), onupdate=text("now()"))
+
+    # Relationships
+    doctor = relationship("Doctor")
+    patient = relationship("Patient")
+    appointment = relationship("Appointment")
+
+    __table_args__ = (
+        CheckConstraint("latest_end > earliest_start", name="check_waitlist_window"),
+        CheckConstraint("duration_minutes > 0", name="check_waitlist_duration"),
+        CheckConstraint("status IN ('waiting', 'booked', 'cancelled')", name="check_waitlist_status"),
+        # Matching a freed slot only scans the doctor's waiting entries around it
+        Index(
+            "idx_waitlist_entries_doctor_window",
+            "doctor_id", "earliest_start", "latest_end",
+            postgresql_where=text("status = 'waiting'"),
+        ),
+        Index("idx_waitlist_entries_patient", "patient_id", "status"),
+    )
+
+    def __repr__(self):
+        return f"<WaitlistEntry {self.id}: Patient {self.patient_id} for Dr. {self.doctor_id} ({self.status})>"
@@ -0,0 +1,189 @@
+"""
+Read replicas.
+
+Endpoints that only read (appointment lists and exports, medical record
+history, notifications) take their session from deps.get_read_db, which
+routes to one of DATABASE_REPLICA_URLS when any are configured and to the
+primary otherwise. Replica connections are opened read-only.
+
+Each replica is checked every REPLICA_HEALTH_CHECK_SECONDS: the check
+times a round trip and reads the WAL position the standby has replayed.
+Unreachable replicas are skipped until a check succeeds again. Healthy
+ones are picked in turn (REPLICA_SELECTION=round_robin) or by the lowest
+average check latency (least_latency).
+
+Read-your-writes: when a request wrote to the primary, the response sets
+the db_lsn cookie to the primary's WAL position after the write. For
+REPLICA_STICKY_SECONDS, that client's reads go only to replicas known to
+have replayed that position, and to the primary if none has. A database
+that is not a standby (pg_is_in_recovery() is false, e.g. a second local
+database standing in for a replica) is taken to be current.
+"""
+import asyncio
+import itertools
+import logging
+import threading
+import time
+from typing import Callable, List, Optional
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import Session, sessionmaker
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.db.session import SessionLocal, TimedQueuePool
+
+logger = logging.getLogger(__name__)
+
+LSN_COOKIE = "db_lsn"
+
+
+def parse_lsn(value: Optional[str]) -> Optional[int]:
+    """'16/B374D848' as an integer, or None if it is not an LSN."""
+    if not value:
+        return None
+    try:
+        high, low = value.split("/")
+        return (int(high, 16) << 32) | int(low, 16)
+    except ValueError:
+        return None
+
+
+class Replica:
+    def __init__(self, url: str, engine_factory: Callable[..., object] = create_engine):
+        self.url = url
+        self.engine = engine_factory(
+            url,
+            poolclass=TimedQueuePool,
+            connect_args={"options": "-c default_transaction_read_only=on"}
+        )
+        self.sessionmaker = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        # Used until the first check, so replicas serve reads even without the checker running
+        self.healthy = True
+        self.in_recovery = True
+        self.replay_lsn: Optional[int] = None
+        self.latency: Optional[float] = None  # Moving average, seconds
+
+    def caught_up(self, min_lsn: Optional[int]) -> bool:
+        if min_lsn is None or not self.in_recovery:
+            return True
+        return self.replay_lsn is not None and self.replay_lsn >= min_lsn
+
+    def check(self) -> None:
+        started = time.perf_counter()
+        try:
+            with self.engine.connect() as connection:
+                in_recovery, replay_lsn = connection.execute(
+                    text("SELECT pg_is_in_recovery(), pg_last_wal_replay_lsn()::text")
+                ).one()
+        except Exception as e:
+            if self.healthy:
+                logger.warning(f"Read replica {self.engine.url.host} is unavailable: {str(e)}")
+            self.healthy = False
+            return
+        elapsed = time.perf_counter() - started
+        self.latency = elapsed if self.latency is None else self.latency + 0.2 * (elapsed - self.latency)
+        self.in_recovery = in_recovery
+        self.replay_lsn = parse_lsn(replay_lsn)
+        self.healthy = True
+
+
+class ReplicaRouter:
+    def __init__(
+        self,
+        urls: List[str] = settings.DATABASE_REPLICA_URLS,
+        selection: str = settings.REPLICA_SELECTION,
+        health_check_seconds: int = settings.REPLICA_HEALTH_CHECK_SECONDS,
+        replica_factory: Callable[[str], Replica] = Replica
+    ):
+        self.replicas = [replica_factory(url) for url in urls]
+        self.selection = selection
+        self.health_check_seconds = health_check_seconds
+        self._turn = itertools.count()
+        self._lock = threading.Lock()
+
+    def choose(self, min_lsn: Optional[int] = None) -> Optional[Replica]:
+        eligible = [replica for replica in self.replicas if replica.healthy and replica.caught_up(min_lsn)]
+        if not eligible:
+            return None
+        if self.selection == "least_latency":
+            return min(eligible, key=lambda replica: replica.latency if replica.latency is not None else 0.0)
+        with self._lock:
+            return eligible[next(self._turn) % len(eligible)]
+
+    def session(self, min_lsn: Optional[int] = None) -> Optional[Session]:
+        """A session on a suitable replica, or None to read from the primary."""
+        replica = self.choose(min_lsn)
+        return replica.sessionmaker() if replica else None
+
+    def check(self) -> None:
+        for replica in self.replicas:
+            replica.check()
+
+    def dispose(self) -> None:
+        for replica in self.replicas:
+            replica.engine.dispose()
+
+    async def run_forever(self) -> None:
+        while True:
+            try:
+                await asyncio.to_thread(self.check)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error checking read replicas: {str(e)}")
+            await asyncio.sleep(self.health_check_seconds)
+
+
+replica_router = ReplicaRouter()
+
+
+def _mark_orm_write(session, flush_context) -> None:
+    session.info["wrote"] = True
+
+
+def _mark_statement_write(orm_execute_state) -> None:
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["wrote"] = True
+
+
+# Primary sessions note whether they wrote, so the request can pin the
+# client's next reads to replicas that have caught up with the write
+event.listen(SessionLocal, "after_flush", _mark_orm_write)
+event.listen(SessionLocal, "do_orm_execute", _mark_statement_write)
+
+
+def write_position(db: Session) -> Optional[str]:
+    """The primary's WAL position if db wrote and replicas are in use."""
+    if not replica_router.replicas or not db.info.get("wrote"):
+        return None
+    try:
+        return db.execute(text("SELECT pg_current_wal_lsn()::text")).scalar()
+    except Exception as e:
+        logger.error(f"Error reading WAL position: {str(e)}")
+        return None
+
+
+class ReadYourWritesMiddleware:
+    """Sets the db_lsn cookie on responses to requests that wrote (see write_position)."""
+
+    def __init__(self, app: ASGIApp, max_age: int = settings.REPLICA_STICKY_SECONDS) -> None:
+        self.app = app
+        self.max_age = max_age
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        state = scope.setdefault("state", {})
+
+        async def send_with_cookie(message: Message) -> None:
+            if message["type"] == "http.response.start" and state.get("write_lsn"):
+                MutableHeaders(scope=message).append(
+                    "set-cookie",
+                    f"{LSN_COOKIE}={state['write_lsn']}; Max-Age={self.max_age}; Path=/; HttpOnly; SameSite=Lax"
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
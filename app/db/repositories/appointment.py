@@ -2,7 +2,9 @@ from typing import List, Optional
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, or_
+from sqlalchemy.engine import Row
 
+from app.db.dml import update_returning
 from app.db.repositories.base import BaseRepository
 from app.db.models.appointment import Appointment, AppointmentStatus
 from app.schemas.appointment import AppointmentCreate, AppointmentUpdate
@@ -108,12 +110,11 @@ class AppointmentRepository(BaseRepository[Appointment, AppointmentCreate, Appoi
         
         return conflicting_appointments is None
 
-    def cancel_appointment(self, db: Session, appointment_id: str) -> Optional[Appointment]:
-        appointment = self.get(db, id=appointment_id)
-        if appointment and appointment.status == AppointmentStatus.SCHEDULED:
-            appointment.status = AppointmentStatus.CANCELLED
-            db.add(appointment)
-            db.commit()
-            db.refresh(appointment)
-            return appointment
-        return None 
\ No newline at end of file
+    def cancel_appointment(self, db: Session, appointment_id: str) -> Optional[Row]:
+        appointment = update_returning(
+            db, Appointment, appointment_id,
+            {"status": AppointmentStatus.CANCELLED, "version": Appointment.version + 1},
+            Appointment.status == AppointmentStatus.SCHEDULED
+        )
+        db.commit()
+        return appointment 
\ No newline at end of file
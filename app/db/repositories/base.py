@@ -1,9 +1,11 @@
 from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
 from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import Session
 
 from app.db.base_class import Base
+from app.db.dml import update_returning
 
 ModelType = TypeVar("ModelType", bound=Base)
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
@@ -38,19 +40,14 @@ class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         *,
         db_obj: ModelType,
         obj_in: Union[UpdateSchemaType, Dict[str, Any]]
-    ) -> ModelType:
-        obj_data = jsonable_encoder(db_obj)
+    ) -> Optional[Row]:
         if isinstance(obj_in, dict):
             update_data = obj_in
         else:
             update_data = obj_in.dict(exclude_unset=True)
-        for field in obj_data:
-            if field in update_data:
-                setattr(db_obj, field, update_data[field])
-        db.add(db_obj)
+        row = update_returning(db, self.model, db_obj.id, update_data)
         db.commit()
-        db.refresh(db_obj)
-        return db_obj
+        return row
 
     def remove(self, db: Session, *, id: Any) -> ModelType:
         obj = db.query(self.model).get(id)
@@ -2,7 +2,9 @@ from typing import List, Optional
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
 from sqlalchemy import and_
+from sqlalchemy.engine import Row
 
+from app.db.dml import update_returning
 from app.db.repositories.base import BaseRepository
 from app.db.models.doctor_schedule import DoctorSchedule
 from app.schemas.doctor_schedule import DoctorScheduleCreate, DoctorScheduleUpdate
@@ -61,12 +63,7 @@ class DoctorScheduleRepository(BaseRepository[DoctorSchedule, DoctorScheduleCrea
 
     def update_availability(
         self, db: Session, schedule_id: str, is_available: bool
-    ) -> Optional[DoctorSchedule]:
-        schedule = self.get(db, id=schedule_id)
-        if schedule:
-            schedule.is_available = is_available
-            db.add(schedule)
-            db.commit()
-            db.refresh(schedule)
-            return schedule
-        return None 
\ No newline at end of file
+    ) -> Optional[Row]:
+        schedule = update_returning(db, DoctorSchedule, schedule_id, {"is_available": is_available})
+        db.commit()
+        return schedule 
\ No newline at end of file
@@ -1,13 +1,60 @@
+import threading
+import time
+from typing import Optional
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
 from app.core.config import settings
+from app.core.load_shedding import concurrency_limiter
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that reports how long each checkout waited for a connection."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            concurrency_limiter.observe_pool_wait(time.perf_counter() - started)
+
+_engine: Optional[Engine] = None
+_engine_lock = threading.Lock()
+
+def get_engine() -> Engine:
+    """The primary's engine, created on first use so importing the app loads no database driver."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = create_engine(str(settings.DATABASE_URL), poolclass=TimedQueuePool)
+    return _engine
+
+def dispose_engine() -> None:
+    """Close the pool's connections, if the engine was ever created."""
+    if _engine is not None:
+        _engine.dispose()
+
+class LazySessionmaker(sessionmaker):
+    """sessionmaker bound to get_engine() when it makes its first session."""
+
+    def __call__(self, **local_kw):
+        if self.kw.get("bind") is None:
+            self.kw["bind"] = get_engine()
+        return super().__call__(**local_kw)
+
+SessionLocal = LazySessionmaker(autocommit=False, autoflush=False)
 
-engine = create_engine(str(settings.DATABASE_URL))
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def __getattr__(name: str):
+    # `from app.db.session import engine` keeps working, and creates the engine
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
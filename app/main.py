@@ -1,15 +1,37 @@
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from app.api.v1.api import api_router
+from app.api.lazy import load_routers
+from app.api.v1.api import include_api_routers
+from app.core.compression import CompressionMiddleware
 from app.core.config import settings
+from app.core.idempotency import IdempotencyMiddleware
+from app.core.lifespan import lifespan, readiness
+from app.core.load_shedding import LoadSheddingMiddleware
+from app.core.rate_limit import RateLimitMiddleware
+from app.db.replicas import ReadYourWritesMiddleware
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     description="API for managing healthcare appointments",
     version="1.0.0",
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    # Pre-warms and starts background tasks, then closes resources after draining
+    lifespan=lifespan
 )
 
+# Point clients that just wrote at replicas that have caught up with it
+app.add_middleware(ReadYourWritesMiddleware)
+
+# Answer retried POSTs that carry an Idempotency-Key from the stored response
+app.add_middleware(IdempotencyMiddleware)
+
+# Shed load with 503 while the database pool is backed up, after
+# throttling clients that exceed their route class's rate with 429.
+# Added before CORS so 429 and 503 responses carry its headers
+app.add_middleware(LoadSheddingMiddleware)
+app.add_middleware(RateLimitMiddleware)
+
 # Set all CORS enabled origins
 app.add_middleware(
     CORSMiddleware,
@@ -19,8 +41,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Include API router
-app.include_router(api_router, prefix=settings.API_V1_STR)
+# Compress JSON and text responses over COMPRESSION_MINIMUM_SIZE
+app.add_middleware(CompressionMiddleware)
+
+# Include API routers; each endpoint module is imported on first use
+include_api_routers(app, settings.API_V1_STR)
+
+def openapi():
+    # The schema has to see every router, loaded or not
+    load_routers(app)
+    return FastAPI.openapi(app)
+
+app.openapi = openapi
 
 @app.get("/")
 async def root():
@@ -28,4 +60,11 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"} 
\ No newline at end of file
+    return {"status": "healthy"}
+
+@app.get("/health/ready")
+async def readiness_check():
+    # Unlike /health, fails while starting up and while draining for shutdown
+    if not readiness.ready or readiness.draining:
+        return JSONResponse({"status": readiness.status}, status_code=503)
+    return {"status": readiness.status}
@@ -1,4 +1,4 @@
-from datetime import datetime, date, time
+from datetime import datetime, date, time, timedelta
 from typing import Optional, List
 from pydantic import BaseModel, Field, validator
 from uuid import UUID
@@ -36,6 +36,7 @@ class AppointmentCreate(BaseModel):
     reason: str = Field("General appointment", description="Reason for the appointment")
     notes: Optional[str] = Field(None, description="Additional notes")
     status: Optional[str] = Field("scheduled", description="Appointment status")
+    resource_ids: List[UUID] = Field(default_factory=list, description="Rooms and equipment to reserve with the doctor")
 
     @validator('doctor_id', 'patient_id')
     def validate_uuid(cls, v):
@@ -142,6 +143,7 @@ class AppointmentResponse(BaseModel):
     status: str
     reason: str
     notes: Optional[str] = None
+    version: int
     created_at: str
     updated_at: str
     
@@ -157,3 +159,61 @@ class AppointmentListResponse(BaseModel):
     total: int
     page: int
     size: int
+
+class AppointmentBulkTransition(BaseModel):
+    status: str = Field(..., description="Target status: confirmed, completed or cancelled")
+    appointment_ids: Optional[List[UUID]] = Field(None, max_length=500, description="Appointments to move")
+    doctor_id: Optional[UUID] = Field(None, description="Or every appointment of this doctor...")
+    start: Optional[datetime] = Field(None, description="...starting at or after start...")
+    end: Optional[datetime] = Field(None, description="...and before end")
+
+    @validator('status')
+    def validate_status(cls, v):
+        if v not in ['confirmed', 'completed', 'cancelled']:
+            raise ValueError("Status must be 'confirmed', 'completed', or 'cancelled'")
+        return v
+
+    @validator('end', always=True)
+    def validate_selection(cls, v, values):
+        by_filter = values.get('doctor_id') is not None or values.get('start') is not None or v is not None
+        if bool(values.get('appointment_ids')) == by_filter:
+            raise ValueError("Give either appointment_ids or doctor_id with start and end")
+        if by_filter:
+            if values.get('doctor_id') is None or values.get('start') is None or v is None:
+                raise ValueError("doctor_id, start and end are all required")
+            # Both naive (the doctor's wall-clock time) or both with an offset; a mix cannot be compared
+            if (v.tzinfo is None) != (values['start'].tzinfo is None):
+                raise ValueError("start and end must both include a timezone offset or both omit it")
+            if v <= values['start']:
+                raise ValueError("end must be after start")
+            if v - values['start'] > timedelta(days=31):
+                raise ValueError("Transition at most 31 days of appointments at a time")
+        return v
+
+class AppointmentTransitionResult(BaseModel):
+    id: str
+    outcome: str = Field(..., description="updated, conflict (status does not allow it) or not_found")
+    status: Optional[str] = None
+    version: Optional[int] = None
+
+class AppointmentBulkTransitionResponse(BaseModel):
+    updated: int
+    results: List[AppointmentTransitionResult]
+
+class CalendarInterval(BaseModel):
+    start_time: str
+    end_time: str
+
+class CalendarBooking(CalendarInterval):
+    status: str
+
+class CalendarDay(BaseModel):
+    date: str
+    time_zone: str
+    working_hours: Optional[CalendarInterval] = None
+    booked: List[CalendarBooking]
+    free: List[CalendarInterval]
+
+class DoctorCalendarResponse(BaseModel):
+    doctor_id: str
+    days: List[CalendarDay]
@@ -0,0 +1,16 @@
+from typing import List, Optional
+from pydantic import BaseModel
+
+
+class DirectoryEntry(BaseModel):
+    id: str
+    type: str
+    name: str
+    email: str
+    phone: str
+    specialization: Optional[str] = None
+    license_number: Optional[str] = None
+
+
+class DirectoryResults(BaseModel):
+    items: List[DirectoryEntry]
@@ -9,6 +9,7 @@ class DoctorScheduleBase(BaseModel):
     start_time: str = Field(..., description="Time in HH:MM:SS format")
     end_time: str = Field(..., description="Time in HH:MM:SS format")
     is_available: bool = True
+    location_id: Optional[str] = Field(None, description="Clinic location; its time zone applies to start_time and end_time")
 
     @validator('start_time', 'end_time')
     def validate_time_format(cls, v):
@@ -33,10 +34,12 @@ class DoctorScheduleUpdate(DoctorScheduleBase):
     start_time: Optional[str] = None
     end_time: Optional[str] = None
     is_available: Optional[bool] = None
+    location_id: Optional[str] = None
 
 class DoctorScheduleInDB(DoctorScheduleBase):
     id: str
     doctor_id: str
+    time_zone: str
 
     class Config:
         from_attributes = True
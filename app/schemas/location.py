@@ -0,0 +1,22 @@
+from typing import Optional
+from pydantic import BaseModel, Field, validator
+
+from app.core.timezones import validate_time_zone
+
+
+class LocationCreate(BaseModel):
+    name: str = Field(..., min_length=1, max_length=255)
+    time_zone: str = Field(..., description="IANA time zone, e.g. Africa/Nairobi")
+    address: Optional[str] = None
+
+    @validator('time_zone')
+    def validate_zone(cls, v):
+        return validate_time_zone(v)
+
+
+class LocationResponse(BaseModel):
+    id: str
+    name: str
+    time_zone: str
+    address: Optional[str] = None
+    is_active: bool
@@ -25,6 +25,7 @@ class MedicalRecordUpdate(BaseModel):
 
 class MedicalRecordInDB(MedicalRecordBase):
     id: UUID
+    current_version: int = 1
     created_at: datetime
     updated_at: datetime
 
@@ -40,4 +41,25 @@ class MedicalRecordListResponse(BaseModel):
     items: list[MedicalRecordResponse]
     total: int
     page: int
-    size: int 
\ No newline at end of file
+    size: int 
+
+
+class MedicalRecordPage(BaseModel):
+    items: list[MedicalRecordResponse]
+    next_cursor: Optional[str] = None
+
+
+class MedicalRecordSearchHit(MedicalRecordResponse):
+    rank: float
+    snippet: str
+
+
+class MedicalRecordSearchResults(BaseModel):
+    items: list[MedicalRecordSearchHit]
+
+
+class MedicalRecordVersion(BaseModel):
+    version: int
+    changed_fields: list[str]
+    author_id: Optional[str] = None
+    created_at: datetime
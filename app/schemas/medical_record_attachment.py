@@ -0,0 +1,13 @@
+from typing import Optional
+from pydantic import BaseModel
+
+
+class MedicalRecordAttachmentResponse(BaseModel):
+    id: str
+    record_id: str
+    filename: str
+    content_type: str
+    size: int
+    sha256: str
+    uploaded_by: Optional[str] = None
+    created_at: str
@@ -0,0 +1,40 @@
+from datetime import datetime
+from typing import List, Optional
+from pydantic import BaseModel
+from uuid import UUID
+
+
+class NotificationBase(BaseModel):
+    user_id: UUID
+    type: str
+    content: str
+
+
+class NotificationCreate(NotificationBase):
+    pass
+
+
+class NotificationInDB(NotificationBase):
+    id: UUID
+    is_read: bool
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class NotificationResponse(NotificationInDB):
+    pass
+
+
+class NotificationPage(BaseModel):
+    items: List[NotificationResponse]
+    next_cursor: Optional[str] = None
+
+
+class NotificationReadRequest(BaseModel):
+    notification_ids: List[UUID]
+
+
+class UnreadCountResponse(BaseModel):
+    unread_count: int
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr, Field
-from typing import Optional, Dict
+from typing import Optional, Dict, List
 from datetime import date, datetime
 from uuid import UUID
 
@@ -49,4 +49,8 @@ class PatientResponse(PatientBase):
         json_encoders = {
             UUID: str,
             datetime: lambda dt: dt.isoformat()
-        } 
\ No newline at end of file
+        } 
+
+class PatientPage(BaseModel):
+    items: List[PatientResponse]
+    next_cursor: Optional[str] = None
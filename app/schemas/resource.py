@@ -0,0 +1,31 @@
+from pydantic import BaseModel, Field, validator
+
+
+class ResourceCreate(BaseModel):
+    name: str = Field(..., min_length=1, max_length=255)
+    kind: str = Field(..., description="room or equipment")
+    is_active: bool = True
+
+    @validator('kind')
+    def validate_kind(cls, v):
+        if v not in ['room', 'equipment']:
+            raise ValueError("Resource kind must be 'room' or 'equipment'")
+        return v
+
+
+class ResourceResponse(BaseModel):
+    id: str
+    name: str
+    kind: str
+    is_active: bool
+
+
+class ResourceBookingResponse(BaseModel):
+    appointment_id: str
+    start_time: str
+    end_time: str
+
+
+class AvailableSlot(BaseModel):
+    start_time: str
+    end_time: str
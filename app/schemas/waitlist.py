@@ -0,0 +1,40 @@
+from datetime import datetime
+from typing import Optional
+from pydantic import BaseModel, Field, validator
+from uuid import UUID
+
+
+class WaitlistEntryCreate(BaseModel):
+    doctor_id: UUID
+    patient_id: Optional[UUID] = Field(None, description="Defaults to the current patient")
+    earliest_start: datetime
+    latest_end: datetime
+    duration_minutes: int = Field(30, ge=5, le=480)
+    priority: int = Field(0, ge=0, le=10, description="Higher is served first; set by clinic staff")
+    reason: str = "General appointment"
+
+    @validator('earliest_start', 'latest_end')
+    def validate_timezone(cls, v):
+        if v.tzinfo is None:
+            raise ValueError("Waitlist times must include a timezone offset")
+        return v
+
+    @validator('latest_end')
+    def validate_window(cls, v, values):
+        if 'earliest_start' in values and v <= values['earliest_start']:
+            raise ValueError("latest_end must be after earliest_start")
+        return v
+
+
+class WaitlistEntryResponse(BaseModel):
+    id: str
+    doctor_id: str
+    patient_id: str
+    earliest_start: datetime
+    latest_end: datetime
+    duration_minutes: int
+    priority: int
+    reason: str
+    status: str
+    appointment_id: Optional[str] = None
+    requested_at: datetime
@@ -1,16 +1,38 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import Boolean, DateTime, Integer, String, Time, and_, cast, literal, null, select, union_all, update
+from sqlalchemy.orm import Session, sessionmaker
 from app.db.models.appointment import Appointment
+from app.db.models.doctor import Doctor
 from app.schemas.appointment import AppointmentCreate, AppointmentUpdate
 from app.db.models.user import User
 from datetime import datetime, timedelta, time, date, timezone
 from uuid import UUID, uuid4
-from typing import List, Optional, Dict
+from typing import Dict, Iterator, List, Optional
 from sqlalchemy.exc import IntegrityError
 import uuid
 from app.db.models.doctor_schedule import DoctorSchedule
+from app.db.models.location import Location
 from app.services.doctor_schedule_service import DoctorScheduleService
+from app.core.concurrency import precondition_failed
+from app.core.config import settings
+from app.core.events import build_event, publish_event, publish_events
+from app.core.intervals import complement, from_epoch, merge, to_epoch
+from app.core.streaming import json_array_stream
+from app.core.timezones import get_zone, local_to_epoch, schedule_window
+from app.db.dml import update_returning
+from app.services.waitlist_service import WaitlistService
+from app.services.resource_service import ResourceService
+import logging
 from fastapi import HTTPException, status
 
+logger = logging.getLogger(__name__)
+
+# Status an appointment can move to -> statuses it can move from
+STATUS_TRANSITIONS = {
+    "confirmed": ("scheduled",),
+    "completed": ("scheduled", "confirmed"),
+    "cancelled": ("scheduled", "confirmed"),
+}
+
 class AppointmentService:
     def __init__(self, db: Session, doctor_schedule_service: DoctorScheduleService):
         self.db = db
@@ -27,75 +49,80 @@ class AppointmentService:
             "status": appointment.status,
             "reason": appointment.reason,
             "notes": appointment.notes,
+            "version": appointment.version,
             "created_at": appointment.created_at.isoformat(),
             "updated_at": appointment.updated_at.isoformat()
         }
 
-    def _check_availability(self, doctor_id: str, start_time: datetime, end_time: datetime) -> tuple[bool, str]:
-        """Check if doctor is available at the specified time."""
+    def _publish_change(self, event_type: str, appointment: Dict) -> None:
+        """Push an appointment change to the doctor's and patient's event streams."""
+        publish_event(
+            event_type,
+            [f"doctor:{appointment['doctor_id']}", f"patient:{appointment['patient_id']}"],
+            appointment
+        )
+
+    def _fill_from_waitlist(self, doctor_id, start_time: datetime, end_time: datetime) -> List[Dict]:
+        """
+        Offer a freed interval of a doctor's day to the waitlist in the same
+        transaction. A failure only rolls back the waitlist bookings.
+        """
         try:
-            # Get the day of week (0 = Monday, 6 = Sunday)
-            day_of_week = start_time.weekday()
-            
-            print(f"Checking availability for doctor {doctor_id} on day {day_of_week} (date: {start_time.date()}) between {start_time.time()} and {end_time.time()}")
-            
-            # Get doctor's schedule for the day
-            schedule = self.doctor_schedule_service.get_by_doctor(doctor_id, day_of_week)
-            
+            with self.db.begin_nested():
+                return WaitlistService(self.db).fill_freed_slot(doctor_id, start_time, end_time)
+        except Exception as e:
+            logger.error(f"Error filling freed slot {start_time} to {end_time} of doctor {doctor_id} from waitlist: {str(e)}")
+            return []
+
+    def _check_availability(self, doctor_id: str, start_time: datetime, end_time: datetime,
+                            schedules: Optional[Dict[int, DoctorSchedule]] = None) -> tuple[bool, str]:
+        """
+        Check if doctor is available at the specified time.
+
+        Working hours are wall-clock times at the schedule's location, so they
+        are turned into instants in that location's time zone for the day in
+        question; a naive start or end is read as wall-clock time there too.
+        """
+        try:
+            if schedules is None:
+                schedules = self.doctor_schedule_service.get_week(doctor_id)
+            start_time = self.doctor_schedule_service.localize(schedules, start_time)
+            end_time = self.doctor_schedule_service.localize(schedules, end_time)
+
+            # The working day is the local date where the doctor works, not the UTC date
+            schedule, zone, day = self.doctor_schedule_service.find_working_day(schedules, start_time)
+            local_start = start_time.astimezone(zone)
+            local_end = end_time.astimezone(zone)
+
             if not schedule:
-                return False, f"Doctor does not have a schedule for {start_time.strftime('%A')}."
+                return False, f"Doctor does not have a schedule for {local_start.strftime('%A')}."
                 
             if not schedule.is_available:
-                return False, f"Doctor is not available on {start_time.strftime('%A')}."
-                
-            # Convert schedule times to datetime for comparison
-            schedule_start = datetime.combine(start_time.date(), schedule.start_time)
-            schedule_end = datetime.combine(start_time.date(), schedule.end_time)
-            
-            # Make all times timezone-aware using the same timezone
-            if start_time.tzinfo is not None:
-                tz = start_time.tzinfo
-                schedule_start = schedule_start.replace(tzinfo=tz)
-                schedule_end = schedule_end.replace(tzinfo=tz)
-            else:
-                # If start_time is naive, make it aware using UTC
-                tz = timezone.utc
-                start_time = start_time.replace(tzinfo=tz)
-                end_time = end_time.replace(tzinfo=tz)
-                schedule_start = schedule_start.replace(tzinfo=tz)
-                schedule_end = schedule_end.replace(tzinfo=tz)
-            
-            print(f"Doctor schedule: {schedule_start.time()} to {schedule_end.time()}")
-            print(f"Requested time: {start_time.time()} to {end_time.time()}")
-            
+                return False, f"Doctor is not available on {local_start.strftime('%A')}."
+
+            window_start, window_end = schedule_window(day, schedule.start_time, schedule.end_time, zone)
+
             # Check if appointment time falls within doctor's schedule
-            if start_time < schedule_start or end_time > schedule_end:
-                return False, f"Requested time ({start_time.strftime('%H:%M')} to {end_time.strftime('%H:%M')}) is outside doctor's working hours ({schedule_start.strftime('%H:%M')} to {schedule_end.strftime('%H:%M')})."
+            if to_epoch(start_time) < window_start or to_epoch(end_time) > window_end:
+                return False, (
+                    f"Requested time ({local_start.strftime('%H:%M')} to {local_end.strftime('%H:%M')}) "
+                    f"is outside doctor's working hours ({schedule.start_time.strftime('%H:%M')} to "
+                    f"{schedule.end_time.strftime('%H:%M')} {zone.key})."
+                )
                 
             # Check for existing appointments that overlap
-            existing_appointments = self.db.query(Appointment).filter(
+            existing_appointment = self.db.query(Appointment).filter(
                 Appointment.doctor_id == doctor_id,
                 Appointment.start_time <= end_time,
                 Appointment.end_time >= start_time,
                 Appointment.status != "cancelled"
             ).first()
             
-            if existing_appointments:
-                print(f"Found overlapping appointment: {existing_appointments.id}")
-                # Ensure existing appointment times are in the same timezone
-                existing_start = existing_appointments.start_time
-                existing_end = existing_appointments.end_time
-                
-                if existing_start.tzinfo is None:
-                    existing_start = existing_start.replace(tzinfo=start_time.tzinfo)
-                if existing_end.tzinfo is None:
-                    existing_end = existing_end.replace(tzinfo=start_time.tzinfo)
-                
-                overlap_start = max(existing_start, start_time)
-                overlap_end = min(existing_end, end_time)
-                return False, f"Time slot conflicts with existing appointment from {overlap_start.strftime('%H:%M')} to {overlap_end.strftime('%H:%M')} on {start_time.strftime('%Y-%m-%d')}. Please choose a different time."
+            if existing_appointment:
+                overlap_start = max(existing_appointment.start_time, start_time).astimezone(zone)
+                overlap_end = min(existing_appointment.end_time, end_time).astimezone(zone)
+                return False, f"Time slot conflicts with existing appointment from {overlap_start.strftime('%H:%M')} to {overlap_end.strftime('%H:%M')} on {day.isoformat()}. Please choose a different time."
             
-            print(f"Doctor is available at the requested time")
             return True, "Doctor is available at the requested time."
             
         except Exception as e:
@@ -153,8 +180,16 @@ class AppointmentService:
                 except ValueError:
                     raise ValueError(f"Invalid end time format: {appointment.end_time}")
 
+            # Serialise bookings for this doctor so the availability check and insert are atomic
+            self.db.query(Doctor.id).filter(Doctor.id == doctor_id).with_for_update().first()
+
+            # Naive times are wall-clock times at the doctor's location; store the instants
+            schedules = self.doctor_schedule_service.get_week(doctor_id)
+            start_time = self.doctor_schedule_service.localize(schedules, start_time)
+            end_time = self.doctor_schedule_service.localize(schedules, end_time)
+
             # Check availability
-            availability, message = self._check_availability(doctor_id, start_time, end_time)
+            availability, message = self._check_availability(doctor_id, start_time, end_time, schedules)
             if not availability:
                 raise ValueError(message)
 
@@ -170,10 +205,16 @@ class AppointmentService:
             )
 
             self.db.add(db_appointment)
+            if appointment.resource_ids:
+                # Rooms and equipment are reserved in the same transaction, or nothing is booked
+                self.db.flush()
+                ResourceService(self.db).reserve(db_appointment, appointment.resource_ids)
             self.db.commit()
             self.db.refresh(db_appointment)
             
-            return self._format_appointment(db_appointment)
+            formatted = self._format_appointment(db_appointment)
+            self._publish_change("appointment.created", formatted)
+            return formatted
 
         except ValueError as e:
             self.db.rollback()
@@ -227,6 +268,95 @@ class AppointmentService:
         except Exception as e:
             raise ValueError(f"Error retrieving appointments: {str(e)}")
 
+    def get_doctor_calendar(self, doctor_id: str, start_date: date, days: int = 1) -> Dict:
+        """
+        A doctor's working hours, booked blocks and free gaps for days local
+        days from start_date, read in one round trip.
+
+        The schedule rows and the bookings come back from one UNION ALL. The
+        booking half only touches columns of idx_appointments_doctor_start, so
+        it is an index-only scan. Days are local days in the time zone of that
+        weekday's schedule location.
+        """
+        doctor_id = UUID(str(doctor_id))
+        end_date = start_date + timedelta(days=days - 1)
+        # Local days can start up to 14 hours either side of UTC midnight
+        range_start = datetime.combine(start_date - timedelta(days=1), time.min, timezone.utc)
+        range_end = datetime.combine(end_date + timedelta(days=2), time.min, timezone.utc)
+
+        no_time = cast(null(), Time)
+        no_timestamp = cast(null(), DateTime(timezone=True))
+        schedules = (
+            select(
+                literal("schedule").label("kind"),
+                DoctorSchedule.day_of_week,
+                DoctorSchedule.start_time.label("opens"),
+                DoctorSchedule.end_time.label("closes"),
+                DoctorSchedule.is_available,
+                Location.time_zone,
+                no_timestamp.label("start_time"),
+                no_timestamp.label("end_time"),
+                cast(null(), String).label("status")
+            )
+            .outerjoin(Location, Location.id == DoctorSchedule.location_id)
+            .where(DoctorSchedule.doctor_id == doctor_id)
+        )
+        bookings = (
+            select(
+                literal("booking"),
+                cast(null(), Integer),
+                no_time,
+                no_time,
+                cast(null(), Boolean),
+                cast(null(), String),
+                Appointment.start_time,
+                Appointment.end_time,
+                Appointment.status
+            )
+            .where(
+                Appointment.doctor_id == doctor_id,
+                Appointment.start_time >= range_start,
+                Appointment.start_time < range_end,
+                Appointment.status != "cancelled"
+            )
+        )
+        rows = self.db.execute(union_all(schedules, bookings)).all()
+
+        week = {row.day_of_week: row for row in rows if row.kind == "schedule"}
+        booked = sorted(
+            (to_epoch(row.start_time), to_epoch(row.end_time), row.status)
+            for row in rows if row.kind == "booking"
+        )
+
+        calendar = []
+        for offset in range(days):
+            day = start_date + timedelta(days=offset)
+            schedule = week.get(day.weekday())
+            zone = get_zone(schedule.time_zone if schedule else None)
+            day_start = local_to_epoch(day, time.min, zone)
+            day_end = local_to_epoch(day + timedelta(days=1), time.min, zone)
+            bookings_today = [booking for booking in booked if booking[0] < day_end and booking[1] > day_start]
+
+            def local(epoch: int) -> str:
+                return from_epoch(epoch).astimezone(zone).isoformat()
+
+            working_hours, free = None, []
+            if schedule and schedule.is_available:
+                window = schedule_window(day, schedule.opens, schedule.closes, zone)
+                working_hours = {"start_time": local(window[0]), "end_time": local(window[1])}
+                free = complement(merge((start, end) for start, end, _ in bookings_today), window)
+            calendar.append({
+                "date": day.isoformat(),
+                "time_zone": zone.key,
+                "working_hours": working_hours,
+                "booked": [
+                    {"start_time": local(start), "end_time": local(end), "status": booking_status}
+                    for start, end, booking_status in bookings_today
+                ],
+                "free": [{"start_time": local(start), "end_time": local(end)} for start, end in free]
+            })
+        return {"doctor_id": str(doctor_id), "days": calendar}
+
     def get_by_patient(self, patient_id: str, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None) -> List[Dict]:
         """Get all appointments for a patient, optionally filtered by date range."""
         try:
@@ -252,18 +382,79 @@ class AppointmentService:
         except Exception as e:
             raise ValueError(f"Error retrieving appointments: {str(e)}")
 
-    def update(self, appointment_id: str, update_data: dict) -> Optional[Dict]:
-        """Update an appointment."""
+    def export(self, doctor_id: Optional[str] = None, patient_id: Optional[str] = None,
+               start_date: Optional[datetime] = None, end_date: Optional[datetime] = None) -> Iterator[bytes]:
+        """
+        Appointments in start time order as a streamed JSON array, read from a
+        server-side cursor so memory does not grow with the export.
+        """
+        query = select(*Appointment.__table__.c)
+        if doctor_id:
+            query = query.where(Appointment.doctor_id == UUID(str(doctor_id)))
+        if patient_id:
+            query = query.where(Appointment.patient_id == UUID(str(patient_id)))
+        if start_date:
+            query = query.where(Appointment.start_time >= start_date)
+        if end_date:
+            query = query.where(Appointment.start_time <= end_date)
+        query = query.order_by(Appointment.start_time, Appointment.id)
+
+        def produce(db: Session):
+            rows = db.execute(query.execution_options(yield_per=settings.STREAM_BATCH_SIZE))
+            for row in rows:
+                yield self._format_appointment(row)
+
+        # Stream from the database the request reads from, which may be a replica
+        return json_array_stream(produce, session_factory=sessionmaker(bind=self.db.get_bind()))
+
+    def _swap(self, appointment_id: UUID, values: dict, expected_version: Optional[int], *conditions):
+        """
+        Apply values with one UPDATE ... RETURNING and bump the version. With
+        expected_version the statement is a compare-and-swap; None is returned
+        when no row matched.
+        """
+        if expected_version is not None:
+            conditions += (Appointment.version == expected_version,)
+        return update_returning(
+            self.db, Appointment, appointment_id, {**values, "version": Appointment.version + 1}, *conditions
+        )
+
+    def _explain_miss(self, appointment_id: UUID, *conditions):
+        """
+        Work out why a conditional write matched nothing, after rolling it back:
+        None if the appointment does not exist (or fails conditions), else
+        (version, status).
+        """
+        current = self.db.execute(
+            select(Appointment.version, Appointment.status).where(Appointment.id == appointment_id, *conditions)
+        ).first()
+        self.db.rollback()
+        return current
+
+    def update(self, appointment_id: str, update_data: dict, expected_version: Optional[int] = None) -> Optional[Dict]:
+        """
+        Update an appointment.
+
+        The write is a single UPDATE ... RETURNING. Given expected_version (the
+        client's If-Match) it only applies if nobody changed the appointment
+        since, otherwise 412. Rescheduling is the one path that reads first,
+        as the new time has to be checked against the doctor's calendar; it
+        then swaps against the version it read.
+        """
         try:
-            appointment = self.db.query(Appointment).filter(
-                Appointment.id == UUID(appointment_id)
-            ).first()
-            
-            if not appointment:
-                return None
-                
+            appointment_id = UUID(str(appointment_id))
+            values = {}
+            event_type = "appointment.updated"
+
             # If updating time, check availability
             if "start_time" in update_data or "end_time" in update_data:
+                current = self.db.query(Appointment).filter(Appointment.id == appointment_id).first()
+                if not current:
+                    return None
+                if expected_version is not None and current.version != expected_version:
+                    raise precondition_failed(current.version)
+                expected_version = current.version
+
                 # Get new start and end times
                 if "start_time" in update_data:
                     try:
@@ -271,7 +462,7 @@ class AppointmentService:
                     except ValueError:
                         raise ValueError("Invalid start_time format")
                 else:
-                    start_time = appointment.start_time
+                    start_time = current.start_time
                     
                 if "end_time" in update_data:
                     try:
@@ -279,28 +470,60 @@ class AppointmentService:
                     except ValueError:
                         raise ValueError("Invalid end_time format")
                 else:
-                    end_time = appointment.end_time
-                
+                    end_time = current.end_time
+
+                schedules = self.doctor_schedule_service.get_week(str(current.doctor_id))
+                start_time = self.doctor_schedule_service.localize(schedules, start_time)
+                end_time = self.doctor_schedule_service.localize(schedules, end_time)
+
                 # Check if the time change would cause a conflict
-                availability, message = self._check_availability(str(appointment.doctor_id), start_time, end_time)
+                availability, message = self._check_availability(
+                    str(current.doctor_id), start_time, end_time, schedules
+                )
                 if not availability:
                     raise ValueError(message)
                 
-                appointment.start_time = start_time
-                appointment.end_time = end_time
+                values["start_time"] = start_time
+                values["end_time"] = end_time
+                event_type = "appointment.rescheduled"
             
             # Update other fields if provided
-            if "status" in update_data:
-                appointment.status = update_data["status"]
-            if "reason" in update_data:
-                appointment.reason = update_data["reason"]
-            if "notes" in update_data:
-                appointment.notes = update_data["notes"]
-                
+            for field in ("status", "reason", "notes"):
+                if field in update_data:
+                    values[field] = update_data[field]
+
+            cancelling = values.get("status") == "cancelled"
+            if cancelling:
+                event_type = "appointment.cancelled"
+                # Only the write that actually cancels hands the slot to the waitlist
+                appointment = self._swap(
+                    appointment_id, values, expected_version, Appointment.__table__.c.status != "cancelled"
+                )
+                if appointment is None:
+                    cancelling = False
+                    appointment = self._swap(appointment_id, values, expected_version)
+            else:
+                appointment = self._swap(appointment_id, values, expected_version)
+
+            if appointment is None:
+                current = self._explain_miss(appointment_id)
+                if current is None:
+                    return None
+                raise precondition_failed(current.version)
+
+            if event_type == "appointment.rescheduled":
+                # The rooms and equipment move with the appointment, or the reschedule fails
+                ResourceService(self.db).move_bookings(appointment_id, appointment.start_time, appointment.end_time)
+
+            bookings = []
+            if cancelling:
+                bookings = self._fill_from_waitlist(appointment.doctor_id, appointment.start_time, appointment.end_time)
             self.db.commit()
-            self.db.refresh(appointment)
             
-            return self._format_appointment(appointment)
+            formatted = self._format_appointment(appointment)
+            self._publish_change(event_type, formatted)
+            WaitlistService.publish_bookings(bookings, self._format_appointment)
+            return formatted
             
         except ValueError as e:
             self.db.rollback()
@@ -315,20 +538,160 @@ class AppointmentService:
                 detail=f"Error updating appointment: {str(e)}"
             )
 
+    def transition(self, appointment_id: str, new_status: str, expected_version: Optional[int] = None,
+                   only_doctor_id: Optional[UUID] = None, only_patient_id: Optional[UUID] = None) -> Optional[Dict]:
+        """
+        Move an appointment to confirmed, completed or cancelled in one round
+        trip: the allowed source states are part of the UPDATE's WHERE clause,
+        so the check and the write cannot be split by a concurrent change.
+        Returns None if the appointment does not exist; 412 if expected_version
+        is stale; 409 if its current status does not allow the transition.
+        With only_doctor_id or only_patient_id, anyone else's appointment is
+        treated as not found.
+        """
+        if new_status not in STATUS_TRANSITIONS:
+            raise ValueError(f"Unknown status transition: {new_status}")
+        try:
+            appointment_id = UUID(str(appointment_id))
+        except ValueError as e:
+            raise ValueError(f"Invalid appointment ID format: {str(e)}")
+
+        owner = []
+        if only_doctor_id is not None:
+            owner.append(Appointment.doctor_id == only_doctor_id)
+        if only_patient_id is not None:
+            owner.append(Appointment.patient_id == only_patient_id)
+        appointment = self._swap(
+            appointment_id, {"status": new_status}, expected_version,
+            Appointment.status.in_(STATUS_TRANSITIONS[new_status]), *owner
+        )
+        if appointment is None:
+            current = self._explain_miss(appointment_id, *owner)
+            if current is None:
+                return None
+            if expected_version is not None and current.version != expected_version:
+                raise precondition_failed(current.version)
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Cannot mark a {current.status} appointment as {new_status}"
+            )
+
+        # The freed slot goes straight to the waitlist, committed together with the cancellation
+        bookings = []
+        if new_status == "cancelled":
+            bookings = self._fill_from_waitlist(appointment.doctor_id, appointment.start_time, appointment.end_time)
+        self.db.commit()
+
+        formatted = self._format_appointment(appointment)
+        self._publish_change(f"appointment.{new_status}", formatted)
+        WaitlistService.publish_bookings(bookings, self._format_appointment)
+        return formatted
+
+    def bulk_transition(self, new_status: str, appointment_ids: Optional[List[UUID]] = None,
+                        doctor_id: Optional[UUID] = None, start: Optional[datetime] = None,
+                        end: Optional[datetime] = None, only_doctor_id: Optional[UUID] = None) -> List[Dict]:
+        """
+        Move many appointments to confirmed, completed or cancelled with one
+        set-based UPDATE ... RETURNING, selected either by id or by doctor and
+        start time in [start, end). Only appointments whose status allows the
+        transition are touched; the rest are reported, not failed.
+
+        Returns one outcome per appointment: updated, conflict (with the
+        status that blocked it) or not_found. A filter reports only the
+        appointments it updated. With only_doctor_id, other doctors'
+        appointments are treated as not found.
+        """
+        if new_status not in STATUS_TRANSITIONS:
+            raise ValueError(f"Unknown status transition: {new_status}")
+        appointments = Appointment.__table__
+        if appointment_ids:
+            appointment_ids = list(dict.fromkeys(UUID(str(appointment_id)) for appointment_id in appointment_ids))
+            selection = appointments.c.id.in_(appointment_ids)
+        else:
+            if start.tzinfo is None or end.tzinfo is None:
+                # Naive bounds are wall-clock times where the doctor works, as for bookings
+                schedules = self.doctor_schedule_service.get_week(str(doctor_id))
+                start = self.doctor_schedule_service.localize(schedules, start)
+                end = self.doctor_schedule_service.localize(schedules, end)
+            selection = and_(
+                appointments.c.doctor_id == doctor_id,
+                appointments.c.start_time >= start,
+                appointments.c.start_time < end
+            )
+        if only_doctor_id is not None:
+            selection = and_(selection, appointments.c.doctor_id == only_doctor_id)
+
+        updated = self.db.execute(
+            update(appointments)
+            .where(selection, appointments.c.status.in_(STATUS_TRANSITIONS[new_status]))
+            .values(status=new_status, version=appointments.c.version + 1)
+            .returning(*appointments.c)
+        ).all()
+
+        results = {
+            str(row.id): {"id": str(row.id), "outcome": "updated", "status": row.status, "version": row.version}
+            for row in updated
+        }
+        missed = [appointment_id for appointment_id in appointment_ids or () if str(appointment_id) not in results]
+        if missed:
+            # Only explain what was not updated: one extra read, and only when something was skipped
+            for row in self.db.execute(
+                select(Appointment.id, Appointment.status, Appointment.version)
+                .where(Appointment.id.in_(missed), selection)
+            ):
+                results[str(row.id)] = {
+                    "id": str(row.id), "outcome": "conflict", "status": row.status, "version": row.version
+                }
+
+        bookings = []
+        if new_status == "cancelled":
+            # Back-to-back cancellations free one longer interval, which longer waitlist requests can use
+            freed = []
+            for row in sorted(updated, key=lambda row: (str(row.doctor_id), row.start_time)):
+                if freed and freed[-1][0] == row.doctor_id and row.start_time <= freed[-1][2]:
+                    freed[-1][2] = max(freed[-1][2], row.end_time)
+                else:
+                    freed.append([row.doctor_id, row.start_time, row.end_time])
+            for freed_doctor_id, freed_start, freed_end in freed:
+                bookings += self._fill_from_waitlist(freed_doctor_id, freed_start, freed_end)
+        self.db.commit()
+
+        events = []
+        for row in updated:
+            formatted = self._format_appointment(row)
+            events.append(build_event(
+                f"appointment.{new_status}",
+                [f"doctor:{formatted['doctor_id']}", f"patient:{formatted['patient_id']}"],
+                formatted
+            ))
+        publish_events(events)
+        WaitlistService.publish_bookings(bookings, self._format_appointment)
+
+        if appointment_ids:
+            return [
+                results.get(str(appointment_id), {"id": str(appointment_id), "outcome": "not_found"})
+                for appointment_id in appointment_ids
+            ]
+        return list(results.values())
+
     def delete(self, appointment_id: str) -> bool:
         """Delete an appointment."""
         try:
-            appointment = self.db.query(Appointment).filter(
-                Appointment.id == UUID(str(appointment_id))
-            ).first()
-            
-            if not appointment:
-                return False
-            
-            # Instead of hard delete, update status to cancelled
-            appointment.status = "cancelled"
+            appointment_id = UUID(str(appointment_id))
+            # Instead of hard delete, update status to cancelled. Only the write
+            # that actually cancels publishes and hands the slot to the waitlist.
+            appointment = self._swap(
+                appointment_id, {"status": "cancelled"}, None, Appointment.status != "cancelled"
+            )
+            if appointment is None:
+                # Missing, or already cancelled (which is still a success)
+                return self._explain_miss(appointment_id) is not None
+
+            bookings = self._fill_from_waitlist(appointment.doctor_id, appointment.start_time, appointment.end_time)
             self.db.commit()
-            
+
+            self._publish_change("appointment.cancelled", self._format_appointment(appointment))
+            WaitlistService.publish_bookings(bookings, self._format_appointment)
             return True
             
         except ValueError as e:
@@ -0,0 +1,215 @@
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import List, Optional
+import asyncio
+import gzip
+import logging
+import re
+
+from sqlalchemy import select, text, tuple_
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.pagination import encode_cursor, decode_cursor
+from app.db.models.audit_log import DEFAULT_PARTITION, AuditLog
+from app.db.session import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+PARTITION_NAME = re.compile(r"^audit_logs_y(\d{4})m(\d{2})$")
+DEFAULT_HISTORY_DAYS = 30
+
+
+def _month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def _add_months(day: date, months: int) -> date:
+    month_index = day.year * 12 + day.month - 1 + months
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def _as_utc(value: datetime) -> datetime:
+    """Naive datetimes from query strings are taken to be UTC."""
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+class AuditLogService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _format_log(self, log: AuditLog) -> dict:
+        """Format audit log entry for response."""
+        return {
+            "id": str(log.id),
+            "user_id": str(log.user_id) if log.user_id else None,
+            "action": log.action,
+            "resource_type": log.resource_type,
+            "resource_id": str(log.resource_id) if log.resource_id else None,
+            "details": log.details,
+            "ip_address": log.ip_address,
+            "created_at": log.created_at.isoformat()
+        }
+
+    def get_history(
+        self,
+        resource_type: Optional[str] = None,
+        resource_id: Optional[str] = None,
+        user_id: Optional[str] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> dict:
+        """
+        Get audit entries newest first, keyset-paginated.
+        The query is always bounded by a created_at range so Postgres only
+        scans the monthly partitions that overlap it.
+        """
+        end_date = _as_utc(end_date) if end_date else datetime.now(timezone.utc)
+        start_date = _as_utc(start_date) if start_date else end_date - timedelta(days=DEFAULT_HISTORY_DAYS)
+        if start_date >= end_date:
+            raise ValueError("start_date must be before end_date")
+
+        query = select(AuditLog).where(
+            AuditLog.created_at >= start_date,
+            AuditLog.created_at < end_date
+        )
+        if resource_type:
+            query = query.where(AuditLog.resource_type == resource_type)
+        if resource_id:
+            query = query.where(AuditLog.resource_id == resource_id)
+        if user_id:
+            query = query.where(AuditLog.user_id == user_id)
+
+        after = decode_cursor(cursor)
+        if after:
+            query = query.where(tuple_(AuditLog.created_at, AuditLog.id) < tuple_(*after))
+
+        logs = self.db.execute(
+            query.order_by(AuditLog.created_at.desc(), AuditLog.id.desc()).limit(limit + 1)
+        ).scalars().all()
+
+        next_cursor = None
+        if len(logs) > limit:
+            logs = logs[:limit]
+            next_cursor = encode_cursor(logs[-1].created_at, str(logs[-1].id))
+
+        return {
+            "items": [self._format_log(log) for log in logs],
+            "next_cursor": next_cursor
+        }
+
+    def list_partitions(self) -> List[str]:
+        rows = self.db.execute(text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON pg_inherits.inhparent = parent.oid "
+            "JOIN pg_class child ON pg_inherits.inhrelid = child.oid "
+            "WHERE parent.relname = 'audit_logs' ORDER BY child.relname"
+        )).all()
+        return [row.relname for row in rows]
+
+    def _create_partition(self, month_start: date) -> str:
+        """
+        Create the month's partition, moving any of its rows out of the default
+        partition first: Postgres refuses to add a range the default holds rows for.
+        """
+        name = f"audit_logs_y{month_start:%Y}m{month_start:%m}"
+        # Months in UTC, whatever the session's time zone
+        bounds = (f"{month_start} 00:00:00+00", f"{_add_months(month_start, 1)} 00:00:00+00")
+        # Inserts into the default partition wait until the rows have moved
+        self.db.execute(text(f'LOCK TABLE "{DEFAULT_PARTITION}" IN EXCLUSIVE MODE'))
+        self.db.execute(text(f'CREATE TABLE "{name}" (LIKE audit_logs INCLUDING DEFAULTS INCLUDING CONSTRAINTS)'))
+        self.db.execute(text(
+            f'WITH moved AS (DELETE FROM "{DEFAULT_PARTITION}" '
+            f"WHERE created_at >= '{bounds[0]}' AND created_at < '{bounds[1]}' RETURNING *) "
+            f'INSERT INTO "{name}" SELECT * FROM moved'
+        ))
+        self.db.execute(text(
+            f"ALTER TABLE audit_logs ATTACH PARTITION \"{name}\" FOR VALUES FROM ('{bounds[0]}') TO ('{bounds[1]}')"
+        ))
+        return name
+
+    def ensure_partitions(self, months_ahead: int = settings.AUDIT_PARTITIONS_AHEAD) -> List[str]:
+        """Create the default partition, the current month's and the next months_ahead ones, if missing."""
+        current = _month_start(datetime.now(timezone.utc).date())
+        self.db.execute(text(f'CREATE TABLE IF NOT EXISTS "{DEFAULT_PARTITION}" PARTITION OF audit_logs DEFAULT'))
+        self.db.commit()
+        existing = set(self.list_partitions())
+        created = []
+        for offset in range(months_ahead + 1):
+            month_start = _add_months(current, offset)
+            if f"audit_logs_y{month_start:%Y}m{month_start:%m}" in existing:
+                continue
+            try:
+                created.append(self._create_partition(month_start))
+                self.db.commit()
+            except Exception:
+                self.db.rollback()
+                raise
+        return created
+
+    def _export_partition(self, name: str, archive_dir: Path) -> Path:
+        """Stream a detached partition to a gzip-compressed CSV with COPY."""
+        archive_dir.mkdir(parents=True, exist_ok=True)
+        path = archive_dir / f"{name}.csv.gz"
+        connection = self.db.connection().connection
+        with gzip.open(path, "wb") as archive, connection.cursor() as cursor:
+            cursor.copy_expert(f'COPY "{name}" TO STDOUT WITH (FORMAT csv, HEADER)', archive)
+        return path
+
+    def archive_partitions(
+        self,
+        retention_months: int = settings.AUDIT_RETENTION_MONTHS,
+        archive_dir: str = settings.AUDIT_ARCHIVE_DIR
+    ) -> List[str]:
+        """
+        Detach partitions that fall entirely outside the retention window,
+        export them to compressed files and drop them.
+        """
+        cutoff = _add_months(_month_start(datetime.now(timezone.utc).date()), -retention_months)
+        archived = []
+        for name in self.list_partitions():
+            match = PARTITION_NAME.match(name)
+            if not match or date(int(match.group(1)), int(match.group(2)), 1) >= cutoff:
+                continue
+            try:
+                # Detaching first keeps the long export off the live table
+                self.db.execute(text(f'ALTER TABLE audit_logs DETACH PARTITION "{name}"'))
+                self.db.commit()
+                path = self._export_partition(name, Path(archive_dir))
+                self.db.execute(text(f'DROP TABLE "{name}"'))
+                self.db.commit()
+                archived.append(name)
+                logger.info(f"Archived audit log partition {name} to {path}")
+            except Exception as e:
+                self.db.rollback()
+                # A detached but undropped table is kept so nothing is lost
+                logger.error(f"Error archiving audit log partition {name}: {str(e)}")
+        return archived
+
+
+class AuditMaintenanceScheduler:
+    """Keeps future audit partitions in place and archives expired ones, once per interval."""
+
+    def __init__(self, interval_seconds: int = settings.AUDIT_MAINTENANCE_INTERVAL_SECONDS):
+        self.interval_seconds = interval_seconds
+
+    def run_once(self) -> None:
+        db = SessionLocal()
+        try:
+            service = AuditLogService(db)
+            service.ensure_partitions()
+            service.archive_partitions()
+        finally:
+            db.close()
+
+    async def run_forever(self) -> None:
+        while True:
+            try:
+                await asyncio.to_thread(self.run_once)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error running audit log maintenance: {str(e)}")
+            await asyncio.sleep(self.interval_seconds)
@@ -1,7 +1,10 @@
 from typing import Generic, TypeVar, Type, Optional, List
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 
+from app.db.dml import update_returning
+
 ModelType = TypeVar("ModelType")
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
@@ -24,15 +27,11 @@ class BaseService(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         self.db.refresh(db_obj)
         return db_obj
 
-    def update(self, id: str, obj_in: UpdateSchemaType) -> ModelType:
-        db_obj = self.get(id)
-        if db_obj:
-            update_data = obj_in.model_dump(exclude_unset=True)
-            for field, value in update_data.items():
-                setattr(db_obj, field, value)
-            self.db.commit()
-            self.db.refresh(db_obj)
-        return db_obj
+    def update(self, id: str, obj_in: UpdateSchemaType) -> Optional[Row]:
+        """One UPDATE ... RETURNING; None if there is no row with this id."""
+        row = update_returning(self.db, self.model, id, obj_in.model_dump(exclude_unset=True))
+        self.db.commit()
+        return row
 
     def remove(self, id: str) -> ModelType:
         obj = self.db.query(self.model).get(id)
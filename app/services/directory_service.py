@@ -0,0 +1,119 @@
+from typing import List, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import func, literal_column, or_, select
+from sqlalchemy.orm import Session
+
+from app.core.typeahead import tokenize, typeahead
+from app.db.models import doctor as doctor_model
+from app.db.models import patient as patient_model
+from app.db.models.doctor import Doctor
+from app.db.models.patient import Patient
+from app.db.models.user import User
+
+DIRECTORY_KINDS = ("doctor", "patient")
+# Patients are only listed to the people who book and treat them
+DIRECTORY_ROLES = {
+    "doctor": ("admin", "staff", "doctor", "patient"),
+    "patient": ("admin", "staff", "doctor"),
+}
+MIN_SEARCH_LENGTH = 2
+
+
+def _doctor_entry(doctor: Doctor) -> dict:
+    return {
+        "id": str(doctor.id),
+        "type": "doctor",
+        "name": f"{doctor.first_name} {doctor.last_name}",
+        "email": doctor.email,
+        "phone": doctor.phone,
+        "specialization": doctor.specialization,
+        "license_number": doctor.license_number
+    }
+
+
+def _patient_entry(patient: Patient) -> dict:
+    return {
+        "id": str(patient.id),
+        "type": "patient",
+        "name": f"{patient.first_name} {patient.last_name}",
+        "email": patient.email,
+        "phone": patient.phone,
+        "specialization": None,
+        "license_number": None
+    }
+
+
+def _load_doctors(db: Session):
+    query = select(Doctor).where(Doctor.is_active == True).order_by(Doctor.last_name, Doctor.first_name)
+    for doctor in db.execute(query.execution_options(yield_per=1000)).scalars():
+        entry = _doctor_entry(doctor)
+        tokens = tokenize(entry["name"], doctor.email, doctor.phone, doctor.specialization, doctor.license_number)
+        yield entry["id"], tokens, entry
+
+
+def _load_patients(db: Session):
+    query = select(Patient).order_by(Patient.last_name, Patient.first_name)
+    for patient in db.execute(query.execution_options(yield_per=1000)).scalars():
+        entry = _patient_entry(patient)
+        yield entry["id"], tokenize(entry["name"], patient.email, patient.phone), entry
+
+
+typeahead.register("doctor", _load_doctors)
+typeahead.register("patient", _load_patients)
+
+
+class DirectoryService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _kinds(self, current_user: User, kind: Optional[str]) -> List[str]:
+        if kind is not None and kind not in DIRECTORY_KINDS:
+            raise ValueError(f"Invalid directory type: {kind}")
+        kinds = [k for k in (DIRECTORY_KINDS if kind is None else (kind,))
+                 if current_user.role in DIRECTORY_ROLES[k]]
+        if not kinds:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="You don't have permission to search this directory"
+            )
+        return kinds
+
+    def _search_table(self, model, search_text: str, query: str, limit: int):
+        document = literal_column(search_text)
+        stmt = select(model).where(
+            or_(
+                document.contains(query, autoescape=True),
+                document.op("%")(query)
+            )
+        )
+        if model is Doctor:
+            stmt = stmt.where(Doctor.is_active == True)
+        stmt = stmt.order_by(func.word_similarity(query, document).desc(), model.last_name).limit(limit)
+        return self.db.execute(stmt).scalars().all()
+
+    def search(self, query: str, current_user: User, kind: Optional[str] = None, limit: int = 10) -> List[dict]:
+        """
+        Substring and fuzzy search over names, email, phone, specialization
+        and license number, served by the trigram indexes.
+        """
+        query = query.lower().strip()
+        if len(query) < MIN_SEARCH_LENGTH:
+            raise ValueError(f"Search query must be at least {MIN_SEARCH_LENGTH} characters")
+
+        results = []
+        for directory in self._kinds(current_user, kind):
+            if directory == "doctor":
+                results.extend(_doctor_entry(doctor) for doctor in
+                               self._search_table(Doctor, doctor_model.SEARCH_TEXT, query, limit))
+            else:
+                results.extend(_patient_entry(patient) for patient in
+                               self._search_table(Patient, patient_model.SEARCH_TEXT, query, limit))
+        return results[:limit]
+
+    def typeahead(self, prefix: str, current_user: User, kind: Optional[str] = None, limit: int = 10) -> List[dict]:
+        """Prefix suggestions from the in-process tries, without a database round-trip once warm."""
+        results = []
+        for directory in self._kinds(current_user, kind):
+            results.extend(typeahead.search(self.db, directory, prefix, limit))
+        return results[:limit]
@@ -11,6 +11,7 @@ from app.schemas.doctor_patient_assignment import (
 )
 from app.db.models.doctor import Doctor
 from app.db.models.patient import Patient
+from app.core.permissions import authorization
 
 class DoctorPatientAssignmentService:
     def __init__(self, db: Session):
@@ -32,11 +33,10 @@ class DoctorPatientAssignmentService:
     def create(self, assignment_in: DoctorPatientAssignmentCreate, current_user: dict) -> dict:
         """Create a new doctor-patient assignment."""
         # Check if user has permission to create assignments
-        if current_user.role not in ["admin", "doctor"]:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="You don't have permission to create doctor-patient assignments"
-            )
+        authorization.require_role_access(
+            current_user, "doctor_patient_assignment", "create",
+            "You don't have permission to create doctor-patient assignments"
+        )
 
         # Verify doctor exists
         doctor = self.db.query(Doctor).filter(Doctor.id == assignment_in.doctor_id).first()
@@ -75,6 +75,7 @@ class DoctorPatientAssignmentService:
         self.db.add(assignment)
         self.db.commit()
         self.db.refresh(assignment)
+        authorization.assignments.invalidate(assignment.doctor_id)
         return self._format_assignment(assignment)
 
     def get(self, assignment_id: str, current_user: dict) -> Optional[dict]:
@@ -90,7 +91,7 @@ class DoctorPatientAssignmentService:
             )
 
         # Check if user has permission to view this assignment
-        if current_user.role not in ["admin"] and str(current_user.doctor_id) != str(assignment.doctor_id):
+        if not authorization.can(self.db, current_user, "doctor_patient_assignment", "view", assignment.doctor_id, assignment.patient_id):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="You don't have permission to view this assignment"
@@ -101,7 +102,7 @@ class DoctorPatientAssignmentService:
     def get_by_doctor(self, doctor_id: str, current_user: dict) -> List[dict]:
         """Get all assignments for a doctor."""
         # Check if user has permission to view these assignments
-        if current_user.role not in ["admin"] and str(current_user.doctor_id) != doctor_id:
+        if not authorization.can(self.db, current_user, "doctor_patient_assignment", "view", doctor_id=doctor_id):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="You don't have permission to view these assignments"
@@ -139,7 +140,7 @@ class DoctorPatientAssignmentService:
             )
 
         # Check if user has permission to update this assignment
-        if current_user.role not in ["admin"] and str(current_user.doctor_id) != str(assignment.doctor_id):
+        if not authorization.can(self.db, current_user, "doctor_patient_assignment", "update", assignment.doctor_id, assignment.patient_id):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="You don't have permission to update this assignment"
@@ -150,6 +151,7 @@ class DoctorPatientAssignmentService:
 
         self.db.commit()
         self.db.refresh(assignment)
+        authorization.assignments.invalidate(assignment.doctor_id)
         return self._format_assignment(assignment)
 
     def delete(self, assignment_id: str, current_user: dict) -> bool:
@@ -165,12 +167,14 @@ class DoctorPatientAssignmentService:
             )
 
         # Check if user has permission to delete this assignment
-        if current_user.role not in ["admin"] and str(current_user.doctor_id) != str(assignment.doctor_id):
+        if not authorization.can(self.db, current_user, "doctor_patient_assignment", "delete", assignment.doctor_id, assignment.patient_id):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="You don't have permission to delete this assignment"
             )
 
+        doctor_id = assignment.doctor_id
         self.db.delete(assignment)
         self.db.commit()
+        authorization.assignments.invalidate(doctor_id)
         return True 
\ No newline at end of file
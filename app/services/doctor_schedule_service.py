@@ -1,11 +1,18 @@
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Tuple
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
-from datetime import time
+from datetime import date, datetime, time
 from uuid import UUID, uuid4
+from zoneinfo import ZoneInfo
 from fastapi import HTTPException, status
 
+from app.core.http_cache import response_cache
+from app.core.intervals import to_epoch
+from app.core.timezones import get_zone, local_date, to_local
+from app.db.dml import update_returning
 from app.db.models.doctor_schedule import DoctorSchedule
+from app.db.models.location import Location
 from app.schemas.doctor_schedule import DoctorScheduleCreate, DoctorScheduleUpdate
 
 
@@ -13,7 +20,7 @@ class DoctorScheduleService:
     def __init__(self, db: Session):
         self.db = db
 
-    def _format_schedule(self, schedule: DoctorSchedule) -> Dict:
+    def _format_schedule(self, schedule: DoctorSchedule, zone: Optional[ZoneInfo] = None) -> Dict:
         """Format schedule object for response."""
         return {
             "id": str(schedule.id),
@@ -21,9 +28,49 @@ class DoctorScheduleService:
             "day_of_week": schedule.day_of_week,
             "start_time": schedule.start_time.isoformat(),
             "end_time": schedule.end_time.isoformat(),
-            "is_available": schedule.is_available
+            "is_available": schedule.is_available,
+            "location_id": str(schedule.location_id) if schedule.location_id else None,
+            "time_zone": (zone or self.time_zone(schedule)).key
         }
 
+    @staticmethod
+    def time_zone(schedule: Optional[DoctorSchedule]) -> ZoneInfo:
+        """The zone a schedule's wall-clock times are in."""
+        location = schedule.location if schedule is not None else None
+        return get_zone(location.time_zone if location is not None else None)
+
+    def get_week(self, doctor_id: str) -> Dict[int, DoctorSchedule]:
+        """All of a doctor's schedules with their locations, keyed by day of week."""
+        schedules = self.db.query(DoctorSchedule).filter(DoctorSchedule.doctor_id == doctor_id).all()
+        return {schedule.day_of_week: schedule for schedule in schedules}
+
+    @classmethod
+    def localize(cls, schedules: Dict[int, DoctorSchedule], value: datetime) -> datetime:
+        """
+        Read a naive datetime as wall-clock time where the doctor works that
+        weekday. Aware datetimes already name an instant and are kept.
+        """
+        if value.tzinfo is not None:
+            return value
+        return to_local(value, cls.time_zone(schedules.get(value.weekday())))
+
+    @classmethod
+    def find_working_day(
+        cls, schedules: Dict[int, DoctorSchedule], instant: datetime
+    ) -> Tuple[Optional[DoctorSchedule], ZoneInfo, date]:
+        """
+        The schedule covering an instant: the one whose weekday matches the
+        instant's local date in the schedule's own time zone.
+        """
+        epoch = to_epoch(instant)
+        for schedule in schedules.values():
+            zone = cls.time_zone(schedule)
+            day = local_date(epoch, zone)
+            if day.weekday() == schedule.day_of_week:
+                return schedule, zone, day
+        zone = get_zone()
+        return None, zone, local_date(epoch, zone)
+
     def create(self, schedule_data: dict) -> dict:
         """Create a new doctor schedule."""
         try:
@@ -42,21 +89,16 @@ class DoctorScheduleService:
                 day_of_week=day_of_week,
                 start_time=start_time,
                 end_time=end_time,
-                is_available=schedule_data.get("is_available", True)
+                is_available=schedule_data.get("is_available", True),
+                location_id=UUID(schedule_data["location_id"]) if schedule_data.get("location_id") else None
             )
             
             self.db.add(schedule)
             self.db.commit()
             self.db.refresh(schedule)
+            response_cache.invalidate([f"doctor:{doctor_id}"])
             
-            return {
-                "id": str(schedule.id),
-                "doctor_id": str(schedule.doctor_id),
-                "day_of_week": schedule.day_of_week,
-                "start_time": schedule.start_time.isoformat(),
-                "end_time": schedule.end_time.isoformat(),
-                "is_available": schedule.is_available
-            }
+            return self._format_schedule(schedule)
             
         except ValueError as e:
             self.db.rollback()
@@ -81,14 +123,7 @@ class DoctorScheduleService:
             if not schedule:
                 return None
                 
-            return {
-                "id": str(schedule.id),
-                "doctor_id": str(schedule.doctor_id),
-                "day_of_week": schedule.day_of_week,
-                "start_time": schedule.start_time.isoformat(),
-                "end_time": schedule.end_time.isoformat(),
-                "is_available": schedule.is_available
-            }
+            return self._format_schedule(schedule)
             
         except ValueError:
             raise HTTPException(
@@ -96,6 +131,10 @@ class DoctorScheduleService:
                 detail="Invalid UUID format"
             )
 
+    def list_by_doctor(self, doctor_id: str) -> List[dict]:
+        """All of a doctor's schedules, Monday first."""
+        return [self._format_schedule(schedule) for _, schedule in sorted(self.get_week(doctor_id).items())]
+
     def get_by_doctor(self, doctor_id: str, day_of_week: int) -> Optional[DoctorSchedule]:
         """Get doctor's schedule for a specific day of the week."""
         try:
@@ -125,36 +164,38 @@ class DoctorScheduleService:
             raise ValueError(f"Error retrieving doctor schedule: {str(e)}")
 
     def update(self, schedule_id: str, update_data: dict) -> Optional[dict]:
-        """Update a schedule."""
+        """Update a schedule with one UPDATE ... RETURNING, including its location's time zone."""
         try:
-            schedule = self.db.query(DoctorSchedule).filter(
-                DoctorSchedule.id == UUID(schedule_id)
-            ).first()
-            
-            if not schedule:
-                return None
-                
+            values = {}
             # Update fields if provided
             if "day_of_week" in update_data:
-                schedule.day_of_week = int(update_data["day_of_week"])
+                values["day_of_week"] = int(update_data["day_of_week"])
             if "start_time" in update_data:
-                schedule.start_time = time.fromisoformat(update_data["start_time"])
+                values["start_time"] = time.fromisoformat(update_data["start_time"])
             if "end_time" in update_data:
-                schedule.end_time = time.fromisoformat(update_data["end_time"])
+                values["end_time"] = time.fromisoformat(update_data["end_time"])
             if "is_available" in update_data:
-                schedule.is_available = update_data["is_available"]
-                
+                values["is_available"] = update_data["is_available"]
+            if "location_id" in update_data:
+                location_id = update_data["location_id"]
+                values["location_id"] = UUID(location_id) if location_id else None
+
+            # Correlated on the new location_id, since RETURNING sees the updated row
+            location_time_zone = (
+                select(Location.time_zone)
+                .where(Location.id == DoctorSchedule.location_id)
+                .scalar_subquery()
+                .label("location_time_zone")
+            )
+            schedule = update_returning(
+                self.db, DoctorSchedule, UUID(schedule_id), values, returning=(location_time_zone,)
+            )
+            if not schedule:
+                return None
             self.db.commit()
-            self.db.refresh(schedule)
-            
-            return {
-                "id": str(schedule.id),
-                "doctor_id": str(schedule.doctor_id),
-                "day_of_week": schedule.day_of_week,
-                "start_time": schedule.start_time.isoformat(),
-                "end_time": schedule.end_time.isoformat(),
-                "is_available": schedule.is_available
-            }
+            response_cache.invalidate([f"doctor:{schedule.doctor_id}"])
+
+            return self._format_schedule(schedule, get_zone(schedule.location_time_zone))
             
         except ValueError as e:
             self.db.rollback()
@@ -181,6 +222,7 @@ class DoctorScheduleService:
                 
             self.db.delete(schedule)
             self.db.commit()
+            response_cache.invalidate([f"doctor:{schedule.doctor_id}"])
             return True
             
         except ValueError:
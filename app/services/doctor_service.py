@@ -3,7 +3,10 @@ from sqlalchemy.orm import Session
 from app.db.models.doctor import Doctor
 from app.db.models.user import User
 from app.schemas.doctor import DoctorCreate, DoctorUpdate
+from app.db.dml import update_returning
 from app.services.base import BaseService
+from app.core.http_cache import response_cache
+from app.core.typeahead import typeahead
 import uuid
 
 class DoctorService(BaseService[Doctor, DoctorCreate, DoctorUpdate]):
@@ -20,7 +23,9 @@ class DoctorService(BaseService[Doctor, DoctorCreate, DoctorUpdate]):
             "email": doctor.email,
             "phone": doctor.phone,
             "license_number": doctor.license_number,
-            "is_active": doctor.is_active
+            "is_active": doctor.is_active,
+            "created_at": doctor.created_at.isoformat(),
+            "updated_at": doctor.updated_at.isoformat()
         }
 
     def get(self, id: str) -> Optional[dict]:
@@ -64,6 +69,7 @@ class DoctorService(BaseService[Doctor, DoctorCreate, DoctorUpdate]):
         self.db.add(db_obj)
         self.db.commit()
         self.db.refresh(db_obj)
+        typeahead.invalidate("doctor")
         return self._format_doctor(db_obj)
 
     def update(self, id: str, obj_in: DoctorUpdate) -> dict:
@@ -73,14 +79,12 @@ class DoctorService(BaseService[Doctor, DoctorCreate, DoctorUpdate]):
                 doctor_uuid = str(id)
             else:
                 doctor_uuid = str(uuid.UUID(id))
-            db_obj = self.db.query(Doctor).filter(Doctor.id == doctor_uuid).first()
-            if db_obj:
-                update_data = obj_in.model_dump(exclude_unset=True)
-                for field, value in update_data.items():
-                    setattr(db_obj, field, value)
-                self.db.commit()
-                self.db.refresh(db_obj)
-            return self._format_doctor(db_obj) if db_obj else None
+            doctor = update_returning(self.db, Doctor, doctor_uuid, obj_in.model_dump(exclude_unset=True))
+            self.db.commit()
+            if doctor:
+                typeahead.invalidate("doctor")
+                response_cache.invalidate([f"doctor:{doctor_uuid}"])
+            return self._format_doctor(doctor) if doctor else None
         except ValueError:
             return None
 
@@ -95,6 +99,8 @@ class DoctorService(BaseService[Doctor, DoctorCreate, DoctorUpdate]):
             if obj:
                 self.db.delete(obj)
                 self.db.commit()
+                typeahead.invalidate("doctor")
+                response_cache.invalidate([f"doctor:{doctor_uuid}"])
             return self._format_doctor(obj) if obj else None
         except ValueError:
             return None 
\ No newline at end of file
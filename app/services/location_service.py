@@ -0,0 +1,51 @@
+from typing import List
+
+from fastapi import HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.db.models.location import Location
+from app.db.models.user import User
+from app.schemas.location import LocationCreate
+
+
+class LocationService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _format_location(self, location: Location) -> dict:
+        """Format location for response."""
+        return {
+            "id": str(location.id),
+            "name": location.name,
+            "time_zone": location.time_zone,
+            "address": location.address,
+            "is_active": location.is_active
+        }
+
+    def create(self, location_in: LocationCreate, current_user: User) -> dict:
+        if current_user.role not in ("admin", "staff"):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Only admin and staff can manage locations"
+            )
+        location = Location(
+            name=location_in.name,
+            time_zone=location_in.time_zone,
+            address=location_in.address
+        )
+        self.db.add(location)
+        try:
+            self.db.commit()
+        except IntegrityError:
+            self.db.rollback()
+            raise ValueError(f"A location named {location_in.name} already exists")
+        self.db.refresh(location)
+        return self._format_location(location)
+
+    def list(self) -> List[dict]:
+        locations = self.db.execute(
+            select(Location).where(Location.is_active == True).order_by(Location.name)
+        ).scalars().all()
+        return [self._format_location(location) for location in locations]
@@ -0,0 +1,183 @@
+from typing import Iterable, List
+import logging
+
+from fastapi import HTTPException, status
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.core.audit import AuditLogger
+from app.core.blob_store import BlobWriter, blob_store
+from app.core.permissions import MedicalRecordPermissions
+from app.db.models.medical_record import MedicalRecord
+from app.db.models.medical_record_attachment import MedicalRecordAttachment
+from app.db.models.user import User
+
+logger = logging.getLogger(__name__)
+
+
+def lock_blob(db: Session, digest: str) -> None:
+    """
+    Serialise storing and releasing one blob until the transaction ends, so a
+    release never unlinks a file that an attachment about to be committed
+    was deduplicated onto.
+    """
+    db.execute(select(func.pg_advisory_xact_lock(func.hashtext(digest))))
+
+
+class MedicalRecordAttachmentService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _format_attachment(self, attachment: MedicalRecordAttachment) -> dict:
+        """Format attachment metadata for response."""
+        return {
+            "id": str(attachment.id),
+            "record_id": str(attachment.record_id),
+            "filename": attachment.filename,
+            "content_type": attachment.content_type,
+            "size": attachment.size,
+            "sha256": attachment.sha256,
+            "uploaded_by": str(attachment.uploaded_by) if attachment.uploaded_by else None,
+            "created_at": attachment.created_at.isoformat()
+        }
+
+    def _get_record(self, record_id: str) -> MedicalRecord:
+        record = self.db.query(MedicalRecord).filter(MedicalRecord.id == record_id).first()
+        if not record:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Medical record not found"
+            )
+        return record
+
+    def check_can_attach(self, record_id: str, current_user: User) -> None:
+        """Checked before the upload is read, so refused requests never stream their body."""
+        record = self._get_record(record_id)
+        if not MedicalRecordPermissions.can_update_record(current_user, record):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="You don't have permission to add attachments to this record"
+            )
+
+    def create(self, record_id: str, filename: str, content_type: str, writer: BlobWriter,
+               current_user: User) -> dict:
+        """
+        Store a streamed upload and its attachment row. The file is moved into
+        place (or deduplicated onto an existing copy) under the digest's lock,
+        held until the row is committed.
+        """
+        sha256 = writer.finish()
+        try:
+            self.check_can_attach(record_id, current_user)
+            lock_blob(self.db, sha256)
+            writer.commit()
+        except Exception:
+            writer.abort()
+            self.db.rollback()
+            raise
+
+        try:
+            attachment = MedicalRecordAttachment(
+                record_id=record_id,
+                filename=filename,
+                content_type=content_type,
+                size=writer.size,
+                sha256=sha256,
+                uploaded_by=current_user.id
+            )
+            self.db.add(attachment)
+            self.db.flush()
+            AuditLogger.log_action(
+                self.db, current_user, "attach", "medical_record", record_id,
+                details={"attachment_id": str(attachment.id), "sha256": sha256, "size": writer.size},
+                durable=True
+            )
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            self.release_blobs(self.db, [sha256])
+            raise
+        self.db.refresh(attachment)
+        return self._format_attachment(attachment)
+
+    def list(self, record_id: str, current_user: User) -> List[dict]:
+        """Attachment metadata for a record; never reads blob contents."""
+        record = self._get_record(record_id)
+        if not MedicalRecordPermissions.can_view_record(current_user, record, self.db):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="You don't have permission to view this record"
+            )
+        attachments = self.db.execute(
+            select(MedicalRecordAttachment)
+            .where(MedicalRecordAttachment.record_id == record_id)
+            .order_by(MedicalRecordAttachment.created_at)
+        ).scalars().all()
+        return [self._format_attachment(attachment) for attachment in attachments]
+
+    def _get_attachment(self, record_id: str, attachment_id: str) -> MedicalRecordAttachment:
+        attachment = self.db.query(MedicalRecordAttachment).filter(
+            MedicalRecordAttachment.id == attachment_id,
+            MedicalRecordAttachment.record_id == record_id
+        ).first()
+        if not attachment:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Attachment not found"
+            )
+        return attachment
+
+    def get_for_download(self, record_id: str, attachment_id: str, current_user: User) -> dict:
+        record = self._get_record(record_id)
+        if not MedicalRecordPermissions.can_view_record(current_user, record, self.db):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="You don't have permission to view this record"
+            )
+        attachment = self._get_attachment(record_id, attachment_id)
+        AuditLogger.log_action(
+            self.db, current_user, "download", "medical_record", record_id,
+            details={"attachment_id": str(attachment.id)}
+        )
+        return self._format_attachment(attachment)
+
+    def delete(self, record_id: str, attachment_id: str, current_user: User) -> bool:
+        record = self._get_record(record_id)
+        if not MedicalRecordPermissions.can_update_record(current_user, record):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="You don't have permission to remove attachments from this record"
+            )
+        attachment = self._get_attachment(record_id, attachment_id)
+        sha256 = attachment.sha256
+        AuditLogger.log_action(
+            self.db, current_user, "detach", "medical_record", record_id,
+            details={"attachment_id": str(attachment.id), "sha256": sha256},
+            durable=True
+        )
+        self.db.delete(attachment)
+        self.db.commit()
+        self.release_blobs(self.db, [sha256])
+        return True
+
+    @staticmethod
+    def release_blobs(db: Session, digests: Iterable[str]) -> None:
+        """Remove stored files that no attachment refers to any more."""
+        digests = set(digests)
+        if not digests:
+            return
+        # In a fixed order, so two releases of overlapping sets cannot deadlock
+        for digest in sorted(digests):
+            lock_blob(db, digest)
+        referenced = set(db.execute(
+            select(MedicalRecordAttachment.sha256)
+            .where(MedicalRecordAttachment.sha256.in_(digests))
+            .distinct()
+        ).scalars())
+        for digest in digests - referenced:
+            try:
+                blob_store.delete(digest)
+            except OSError as e:
+                logger.error(f"Error removing attachment blob {digest}: {str(e)}")
+        # Releases the locks
+        db.commit()
@@ -1,14 +1,43 @@
-from typing import List, Optional
-from sqlalchemy.orm import Session
+from html import escape
+from typing import Iterator, List, Optional
+from sqlalchemy import func, or_, select, tuple_, update
+from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.exc import IntegrityError
 from uuid import UUID
 from fastapi import HTTPException, status
 
 from app.db.models.medical_record import MedicalRecord
+from app.db.models.medical_record_revision import MedicalRecordRevision
+from app.db.models.medical_record_attachment import MedicalRecordAttachment
 from app.schemas.medical_record import MedicalRecordCreate, MedicalRecordUpdate
 from app.db.models.user import User
-from app.core.permissions import MedicalRecordPermissions
-from app.db.models.doctor_patient_assignment import DoctorPatientAssignment
+from app.core.permissions import MedicalRecordPermissions, authorization
+from app.core.audit import AuditLogger
+from app.core.concurrency import precondition_failed
+from app.core.config import settings
+from app.core.streaming import json_array_stream
+from app.services.medical_record_attachment_service import MedicalRecordAttachmentService
+from app.core.pagination import encode_cursor, decode_cursor
+from app.core.text_delta import apply_field_delta, field_delta
+
+SEARCH_CONFIG = "english"
+# ts_headline returns the record text as is, so it marks matches with private-use
+# characters and the snippet is HTML-escaped before they become <mark> tags
+MARK_START, MARK_STOP = "\ue000", "\ue001"
+HEADLINE_OPTIONS = f"StartSel={MARK_START}, StopSel={MARK_STOP}, MaxFragments=2, MaxWords=20, MinWords=5"
+# What _format_record needs, so writes can RETURNING just these instead of search_vector too
+RECORD_COLUMNS = (
+    "id", "patient_id", "doctor_id", "appointment_id", "diagnosis", "prescription", "notes",
+    "current_version", "created_at", "updated_at"
+)
+
+
+def headline_html(snippet: Optional[str]) -> Optional[str]:
+    """Escape a ts_headline snippet and wrap its matches in <mark> tags."""
+    if snippet is None:
+        return None
+    return escape(snippet).replace(MARK_START, "<mark>").replace(MARK_STOP, "</mark>")
+
 
 class MedicalRecordService:
     def __init__(self, db: Session):
@@ -24,33 +53,26 @@ class MedicalRecordService:
             "diagnosis": record.diagnosis,
             "prescription": record.prescription,
             "notes": record.notes,
+            "current_version": record.current_version,
             "created_at": record.created_at.isoformat(),
             "updated_at": record.updated_at.isoformat()
         }
 
     def create(self, record_in: MedicalRecordCreate, current_user: dict) -> dict:
         """Create a new medical record."""
-        # Check if user has permission to create record
-        if not MedicalRecordPermissions.can_create_record(current_user, str(record_in.patient_id)):
+        # Check if user has permission to create records at all
+        authorization.require_role_access(
+            current_user, "medical_record", "create",
+            "You don't have permission to create medical records"
+        )
+
+        # Doctors may only write records for patients assigned to them (served from the assignment cache)
+        if not MedicalRecordPermissions.can_create_record(current_user, str(record_in.patient_id), self.db):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
-                detail="You don't have permission to create medical records"
+                detail="You are not assigned to this patient"
             )
 
-        # If user is a doctor, verify they are assigned to the patient
-        if current_user.role == "doctor":
-            assignment = self.db.query(DoctorPatientAssignment).filter(
-                DoctorPatientAssignment.doctor_id == record_in.doctor_id,
-                DoctorPatientAssignment.patient_id == record_in.patient_id,
-                DoctorPatientAssignment.is_active == True
-            ).first()
-            
-            if not assignment:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="You are not assigned to this patient"
-                )
-
         record = MedicalRecord(
             patient_id=record_in.patient_id,
             doctor_id=record_in.doctor_id,
@@ -60,12 +82,122 @@ class MedicalRecordService:
             notes=record_in.notes
         )
         self.db.add(record)
+        self.db.flush()
+        AuditLogger.log_medical_record_access(self.db, current_user, "create", str(record.id), durable=True)
         self.db.commit()
         self.db.refresh(record)
         return self._format_record(record)
 
     def get(self, record_id: str, current_user: dict) -> Optional[dict]:
         """Get a medical record by ID."""
+        record = self._get_viewable(record_id, current_user)
+        AuditLogger.log_medical_record_access(self.db, current_user, "view", str(record.id))
+        return self._format_record(record)
+
+    def _list_records(self, column, value: str, current_user: dict, limit: int, cursor: Optional[str]) -> dict:
+        """
+        Get a page of records matching column == value, newest first.
+        The caller's access rules are part of the WHERE clause, so only
+        visible rows are loaded and every page is full.
+        """
+        authorization.require_role_access(
+            current_user, "medical_record", "view",
+            "You don't have permission to view these records"
+        )
+
+        query = select(MedicalRecord).where(
+            column == value,
+            authorization.record_filter(current_user)
+        )
+        after = decode_cursor(cursor)
+        if after:
+            query = query.where(tuple_(MedicalRecord.created_at, MedicalRecord.id) < tuple_(*after))
+
+        records = self.db.execute(
+            query.order_by(MedicalRecord.created_at.desc(), MedicalRecord.id.desc()).limit(limit + 1)
+        ).scalars().all()
+
+        next_cursor = None
+        if len(records) > limit:
+            records = records[:limit]
+            next_cursor = encode_cursor(records[-1].created_at, str(records[-1].id))
+
+        return {
+            "items": [self._format_record(record) for record in records],
+            "next_cursor": next_cursor
+        }
+
+    def get_by_patient(self, patient_id: str, current_user: dict, limit: int = 50,
+                       cursor: Optional[str] = None) -> dict:
+        """Get a page of medical records for a patient."""
+        return self._list_records(MedicalRecord.patient_id, patient_id, current_user, limit, cursor)
+
+    def get_by_doctor(self, doctor_id: str, current_user: dict, limit: int = 50,
+                      cursor: Optional[str] = None) -> dict:
+        """Get a page of medical records for a doctor."""
+        return self._list_records(MedicalRecord.doctor_id, doctor_id, current_user, limit, cursor)
+
+    def search(self, query: str, current_user: dict, patient_id: Optional[str] = None,
+               limit: int = 20, fuzzy: bool = False) -> dict:
+        """
+        Full-text search over diagnosis, prescription and notes, best match first.
+        Matching and ranking use the GIN-indexed search_vector column; with
+        fuzzy=True prescriptions are also matched by trigram word similarity,
+        so misspelt drug names still hit.
+        """
+        authorization.require_role_access(
+            current_user, "medical_record", "view",
+            "You don't have permission to view these records"
+        )
+        query = query.strip()
+        if not query:
+            raise ValueError("Search query must not be empty")
+
+        ts_query = func.websearch_to_tsquery(SEARCH_CONFIG, query)
+        rank = func.ts_rank_cd(MedicalRecord.search_vector, ts_query)
+        match = MedicalRecord.search_vector.op("@@")(ts_query)
+        if fuzzy:
+            match = or_(match, MedicalRecord.prescription.op("%>")(query))
+            rank = func.greatest(rank, func.word_similarity(query, MedicalRecord.prescription))
+
+        ranked = select(MedicalRecord.id, rank.label("rank")).where(
+            match,
+            authorization.record_filter(current_user)
+        )
+        if patient_id:
+            ranked = ranked.where(MedicalRecord.patient_id == patient_id)
+        ranked = ranked.order_by(rank.desc(), MedicalRecord.created_at.desc()).limit(limit).subquery()
+
+        # Headlines are the expensive part, so they are only built for the returned rows
+        document = func.concat_ws(" ", MedicalRecord.diagnosis, MedicalRecord.prescription, MedicalRecord.notes)
+        snippet = func.ts_headline(SEARCH_CONFIG, document, ts_query, HEADLINE_OPTIONS)
+        rows = self.db.execute(
+            select(MedicalRecord, ranked.c.rank, snippet.label("snippet"))
+            .join(ranked, ranked.c.id == MedicalRecord.id)
+            .order_by(ranked.c.rank.desc(), MedicalRecord.created_at.desc())
+        ).all()
+
+        items = [
+            {**self._format_record(record), "rank": float(rank), "snippet": headline_html(snippet)}
+            for record, rank, snippet in rows
+        ]
+        AuditLogger.log_action(
+            self.db, current_user, "search", "medical_record", None,
+            details={"user_role": current_user.role, "record_ids": [item["id"] for item in items]}
+        )
+        return {"items": items}
+
+    def update(self, record_id: str, record_in: MedicalRecordUpdate, current_user: dict,
+               expected_version: Optional[int] = None) -> Optional[dict]:
+        """
+        Update a medical record.
+        The previous text is kept as an append-only revision holding a reverse
+        delta of the changed fields, and current_version moves forward. The
+        row is read for the permission check and the delta, then written with a
+        compare-and-swap on current_version (the client's If-Match, else the
+        version just read), so a concurrent edit gets a 412 instead of being
+        overwritten.
+        """
         record = self.db.query(MedicalRecord).filter(MedicalRecord.id == record_id).first()
         if not record:
             raise HTTPException(
@@ -73,63 +205,131 @@ class MedicalRecordService:
                 detail="Medical record not found"
             )
 
-        if not MedicalRecordPermissions.can_view_record(current_user, record):
+        if not MedicalRecordPermissions.can_update_record(current_user, record):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
-                detail="You don't have permission to view this record"
+                detail="You don't have permission to update this record"
             )
 
-        return self._format_record(record)
-
-    def get_by_patient(self, patient_id: str, current_user: dict) -> List[dict]:
-        """Get all medical records for a patient."""
-        # Check if user has permission to view patient's records
-        if current_user.role not in ["admin", "doctor"] and str(current_user.patient_id) != patient_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="You don't have permission to view these records"
-            )
+        if expected_version is not None and record.current_version != expected_version:
+            raise precondition_failed(record.current_version)
 
-        records = self.db.query(MedicalRecord).filter(
-            MedicalRecord.patient_id == patient_id
-        ).all()
-        return [self._format_record(record) for record in records]
+        changes = {
+            field: value for field, value in record_in.dict(exclude_unset=True).items()
+            if getattr(record, field) != value
+        }
+        if not changes:
+            return self._format_record(record)
 
-    def get_by_doctor(self, doctor_id: str, current_user: dict) -> List[dict]:
-        """Get all medical records for a doctor."""
-        # Check if user has permission to view doctor's records
-        if current_user.role not in ["admin"] and str(current_user.doctor_id) != doctor_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="You don't have permission to view these records"
-            )
+        version = record.current_version + 1
+        records = MedicalRecord.__table__
+        updated = self.db.execute(
+            update(records)
+            .where(records.c.id == record.id, records.c.current_version == record.current_version)
+            .values(**changes, current_version=version)
+            .returning(*[records.c[name] for name in RECORD_COLUMNS])
+        ).first()
+        if updated is None:
+            self.db.rollback()
+            raise precondition_failed()
 
-        records = self.db.query(MedicalRecord).filter(
-            MedicalRecord.doctor_id == doctor_id
-        ).all()
-        return [self._format_record(record) for record in records]
+        self.db.add(MedicalRecordRevision(
+            record_id=record.id,
+            version=version,
+            changed_fields=sorted(changes),
+            delta={field: field_delta(value, getattr(record, field)) for field, value in changes.items()},
+            author_id=current_user.id
+        ))
+        AuditLogger.log_medical_record_access(self.db, current_user, "update", str(record.id), durable=True)
+        try:
+            self.db.commit()
+        except IntegrityError as e:
+            self.db.rollback()
+            # Only a concurrent edit that took this version number is a stale write
+            if getattr(getattr(e.orig, "diag", None), "constraint_name", None) == "uq_medical_record_revisions_version":
+                raise precondition_failed()
+            raise
+        return self._format_record(updated)
 
-    def update(self, record_id: str, record_in: MedicalRecordUpdate, current_user: dict) -> Optional[dict]:
-        """Update a medical record."""
+    def _get_viewable(self, record_id: str, current_user: dict) -> MedicalRecord:
         record = self.db.query(MedicalRecord).filter(MedicalRecord.id == record_id).first()
         if not record:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Medical record not found"
             )
-
-        if not MedicalRecordPermissions.can_update_record(current_user, record):
+        if not MedicalRecordPermissions.can_view_record(current_user, record, self.db):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
-                detail="You don't have permission to update this record"
+                detail="You don't have permission to view this record"
             )
+        return record
 
-        for field, value in record_in.dict(exclude_unset=True).items():
-            setattr(record, field, value)
+    def stream_history(self, record_id: str, current_user: dict) -> Iterator[bytes]:
+        """
+        The record's versions, newest first, as a streamed JSON array. Access
+        is checked now; the revisions are read from a server-side cursor
+        without loading any deltas.
+        """
+        record = self._get_viewable(record_id, current_user)
+        record_id, created_at = record.id, record.created_at
 
-        self.db.commit()
-        self.db.refresh(record)
-        return self._format_record(record)
+        def produce(db: Session):
+            revisions = db.execute(
+                select(
+                    MedicalRecordRevision.version,
+                    MedicalRecordRevision.changed_fields,
+                    MedicalRecordRevision.author_id,
+                    MedicalRecordRevision.created_at
+                )
+                .where(MedicalRecordRevision.record_id == record_id)
+                .order_by(MedicalRecordRevision.version.desc())
+                .execution_options(yield_per=settings.STREAM_BATCH_SIZE)
+            )
+            for revision in revisions:
+                yield {
+                    "version": revision.version,
+                    "changed_fields": list(revision.changed_fields),
+                    "author_id": str(revision.author_id) if revision.author_id else None,
+                    "created_at": revision.created_at.isoformat()
+                }
+            yield {
+                "version": 1,
+                "changed_fields": [],
+                "author_id": None,
+                "created_at": created_at.isoformat()
+            }
+
+        return json_array_stream(produce, session_factory=sessionmaker(bind=self.db.get_bind()))
+
+    def get_version(self, record_id: str, version: int, current_user: dict) -> dict:
+        """Rebuild an earlier version by applying reverse deltas from the current text."""
+        record = self._get_viewable(record_id, current_user)
+        if version < 1 or version > record.current_version:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Medical record version not found"
+            )
+
+        rebuilt = self._format_record(record)
+        deltas = self.db.execute(
+            select(MedicalRecordRevision.delta)
+            .where(
+                MedicalRecordRevision.record_id == record.id,
+                MedicalRecordRevision.version > version
+            )
+            .order_by(MedicalRecordRevision.version.desc())
+        ).scalars()
+        for delta in deltas:
+            for field, field_change in delta.items():
+                rebuilt[field] = apply_field_delta(rebuilt[field], field_change)
+
+        AuditLogger.log_action(
+            self.db, current_user, "view_version", "medical_record", str(record.id),
+            details={"user_role": current_user.role, "version": version}
+        )
+        rebuilt["current_version"] = version
+        return rebuilt
 
     def delete(self, record_id: str, current_user: dict) -> bool:
         """Delete a medical record."""
@@ -146,6 +346,12 @@ class MedicalRecordService:
                 detail="You don't have permission to delete this record"
             )
 
+        # Attachment rows go with the record (ON DELETE CASCADE); their files are released afterwards
+        digests = self.db.execute(
+            select(MedicalRecordAttachment.sha256).where(MedicalRecordAttachment.record_id == record.id)
+        ).scalars().all()
+        AuditLogger.log_medical_record_access(self.db, current_user, "delete", str(record.id), durable=True)
         self.db.delete(record)
         self.db.commit()
+        MedicalRecordAttachmentService.release_blobs(self.db, digests)
         return True 
\ No newline at end of file
@@ -1,131 +1,270 @@
 from app.core.rabbitmq import RabbitMQ
-from app.db.session import SessionLocal
-from app.models.notification import Notification
+from app.core.events import publish_event
+from app.core.pagination import encode_cursor, decode_cursor
+from app.db.models.appointment import Appointment
+from app.db.models.medical_record import MedicalRecord
+from app.db.models.notification import Notification
+from app.db.models.notification_counter import NotificationCounter
+from app.db.models.user import User
 from app.schemas.notification import NotificationCreate
-from typing import List, Optional
+from sqlalchemy import func, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+from typing import Dict, List, Optional
+from uuid import UUID
 import json
 import logging
 
 logger = logging.getLogger(__name__)
 
 class NotificationService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _format_notification(self, notification: Notification) -> dict:
+        """Format notification for response."""
+        return {
+            "id": str(notification.id),
+            "user_id": str(notification.user_id),
+            "type": notification.type,
+            "content": notification.content,
+            "is_read": notification.is_read,
+            "created_at": notification.created_at.isoformat()
+        }
+
+    @staticmethod
+    def increment_unread_counts(db: Session, counts: Dict[str, int]) -> None:
+        """
+        Add newly inserted unread notifications to the per-user counters.
+        Runs as one upsert in the caller's transaction, so the counter commits
+        together with the notification rows.
+        """
+        rows = [
+            {"user_id": str(user_id), "unread_count": count}
+            for user_id, count in counts.items()
+            if count > 0
+        ]
+        if not rows:
+            return
+        stmt = pg_insert(NotificationCounter).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[NotificationCounter.user_id],
+            set_={
+                "unread_count": NotificationCounter.unread_count + stmt.excluded.unread_count,
+                "updated_at": func.now()
+            }
+        )
+        db.execute(stmt)
+
     @staticmethod
-    async def send_notification(notification: NotificationCreate):
+    def decrement_unread_count(db: Session, user_id: str, count: int) -> None:
+        """Remove notifications that were just marked as read from the user's counter."""
+        if count <= 0:
+            return
+        db.execute(
+            update(NotificationCounter)
+            .where(NotificationCounter.user_id == str(user_id))
+            .values(
+                unread_count=func.greatest(NotificationCounter.unread_count - count, 0),
+                updated_at=func.now()
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+    def create(self, notification: NotificationCreate) -> Notification:
+        """Store a notification and bump the recipient's unread counter."""
+        try:
+            db_notification = Notification(
+                user_id=notification.user_id,
+                type=notification.type,
+                content=notification.content,
+                is_read=False
+            )
+            self.db.add(db_notification)
+            self.db.flush()
+            self.increment_unread_counts(self.db, {str(notification.user_id): 1})
+            self.db.commit()
+            self.db.refresh(db_notification)
+            return db_notification
+        except Exception:
+            self.db.rollback()
+            raise
+
+    async def send_notification(self, notification: NotificationCreate):
         """
         Send a notification using RabbitMQ
         """
         try:
             # Store notification in database
-            db = SessionLocal()
-            try:
-                db_notification = Notification(
-                    user_id=notification.user_id,
-                    type=notification.type,
-                    content=notification.content
-                )
-                db.add(db_notification)
-                db.commit()
-                db.refresh(db_notification)
-                
-                # Publish to RabbitMQ
-                message = {
-                    "notification_id": str(db_notification.id),
-                    "user_id": str(notification.user_id),
-                    "type": notification.type,
-                    "content": notification.content
-                }
-                await RabbitMQ.publish_message(
-                    "notifications",
-                    json.dumps(message)
-                )
-                logger.info(f"Notification sent: {message}")
-            finally:
-                db.close()
+            db_notification = self.create(notification)
+
+            # Publish to RabbitMQ
+            message = {
+                "notification_id": str(db_notification.id),
+                "user_id": str(notification.user_id),
+                "type": notification.type,
+                "content": notification.content
+            }
+            await RabbitMQ.publish_message(
+                "notifications",
+                json.dumps(message)
+            )
+            publish_event("notification.created", [f"user:{notification.user_id}"], message)
+            logger.info(f"Notification sent: {message}")
         except Exception as e:
             logger.error(f"Error sending notification: {str(e)}")
             raise
 
-    @staticmethod
-    async def send_appointment_reminder(appointment_id: str):
+    def _patient_user_id(self, patient_id) -> Optional[str]:
+        user_id = self.db.query(User.id).filter(User.patient_id == patient_id).scalar()
+        return str(user_id) if user_id else None
+
+    async def send_appointment_reminder(self, appointment_id: str):
         """
-        Send appointment reminder notification
+        Send appointment reminder notification.
+        Scheduled reminders go through ReminderScheduler, which batches them.
         """
-        db = SessionLocal()
-        try:
-            appointment = db.query(Appointment).filter(Appointment.id == appointment_id).first()
-            if not appointment:
-                raise ValueError(f"Appointment {appointment_id} not found")
-            
-            notification = NotificationCreate(
-                user_id=appointment.patient_id,
-                type="appointment_reminder",
-                content=f"Reminder: You have an appointment with Dr. {appointment.doctor.first_name} "
-                       f"on {appointment.start_time.strftime('%Y-%m-%d %H:%M')}"
-            )
-            await NotificationService.send_notification(notification)
-        finally:
-            db.close()
+        appointment = self.db.query(Appointment).filter(Appointment.id == appointment_id).first()
+        if not appointment:
+            raise ValueError(f"Appointment {appointment_id} not found")
 
-    @staticmethod
-    async def send_follow_up(medical_record_id: str):
+        user_id = self._patient_user_id(appointment.patient_id)
+        if not user_id:
+            raise ValueError(f"Patient {appointment.patient_id} has no user account")
+
+        notification = NotificationCreate(
+            user_id=user_id,
+            type="appointment_reminder",
+            content=f"Reminder: You have an appointment with Dr. {appointment.doctor.first_name} "
+                   f"on {appointment.start_time.strftime('%Y-%m-%d %H:%M')}"
+        )
+        await self.send_notification(notification)
+
+    async def send_follow_up(self, medical_record_id: str):
         """
         Send follow-up notification
         """
-        db = SessionLocal()
+        medical_record = self.db.query(MedicalRecord).filter(MedicalRecord.id == medical_record_id).first()
+        if not medical_record:
+            raise ValueError(f"Medical record {medical_record_id} not found")
+
+        user_id = self._patient_user_id(medical_record.patient_id)
+        if not user_id:
+            raise ValueError(f"Patient {medical_record.patient_id} has no user account")
+
+        notification = NotificationCreate(
+            user_id=user_id,
+            type="follow_up",
+            content=f"Follow-up required for your recent appointment. "
+                   f"Please schedule a follow-up visit with Dr. {medical_record.doctor.first_name}"
+        )
+        await self.send_notification(notification)
+
+    def mark_notifications_as_read(self, user_id: str, notification_ids: List[str]) -> int:
+        """
+        Mark several of the user's notifications as read in one statement.
+        Returns how many were unread before the call.
+        """
+        if not notification_ids:
+            return 0
         try:
-            medical_record = db.query(MedicalRecord).filter(MedicalRecord.id == medical_record_id).first()
-            if not medical_record:
-                raise ValueError(f"Medical record {medical_record_id} not found")
-            
-            notification = NotificationCreate(
-                user_id=medical_record.patient_id,
-                type="follow_up",
-                content=f"Follow-up required for your recent appointment. "
-                       f"Please schedule a follow-up visit with Dr. {medical_record.doctor.first_name}"
+            result = self.db.execute(
+                update(Notification)
+                .where(
+                    Notification.user_id == str(user_id),
+                    Notification.id.in_([str(UUID(str(id))) for id in notification_ids]),
+                    Notification.is_read == False
+                )
+                .values(is_read=True)
+                .execution_options(synchronize_session=False)
             )
-            await NotificationService.send_notification(notification)
-        finally:
-            db.close()
+            self.decrement_unread_count(self.db, user_id, result.rowcount)
+            self.db.commit()
+            return result.rowcount
+        except ValueError:
+            self.db.rollback()
+            raise ValueError("Invalid notification ID format")
+        except Exception:
+            self.db.rollback()
+            raise
 
-    @staticmethod
-    async def mark_notification_as_read(notification_id: str):
+    def mark_notification_as_read(self, notification_id: str, user_id: str) -> bool:
         """
         Mark a notification as read
         """
-        db = SessionLocal()
+        return self.mark_notifications_as_read(user_id, [notification_id]) > 0
+
+    def mark_all_as_read(self, user_id: str) -> int:
+        """Mark every unread notification of the user as read and take them off the counter."""
         try:
-            notification = db.query(Notification).filter(Notification.id == notification_id).first()
-            if notification:
-                notification.is_read = True
-                db.commit()
-        finally:
-            db.close()
+            result = self.db.execute(
+                update(Notification)
+                .where(Notification.user_id == str(user_id), Notification.is_read == False)
+                .values(is_read=True)
+                .execution_options(synchronize_session=False)
+            )
+            # Not a reset to 0: a notification inserted concurrently is still unread
+            self.decrement_unread_count(self.db, user_id, result.rowcount)
+            self.db.commit()
+            return result.rowcount
+        except Exception:
+            self.db.rollback()
+            raise
 
-    @staticmethod
-    async def get_user_notifications(user_id: str, skip: int = 0, limit: int = 100) -> List[Notification]:
+    def get_user_notifications(
+        self,
+        user_id: str,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        unread_only: bool = False
+    ) -> dict:
         """
-        Get notifications for a user
+        Get a page of notifications for a user, newest first.
+        Keyset-paginated on (created_at, id) so deep pages cost the same as the first.
         """
-        db = SessionLocal()
-        try:
-            return db.query(Notification)\
-                .filter(Notification.user_id == user_id)\
-                .order_by(Notification.created_at.desc())\
-                .offset(skip)\
-                .limit(limit)\
-                .all()
-        finally:
-            db.close()
+        query = select(Notification).where(Notification.user_id == str(user_id))
+        if unread_only:
+            # Served by the partial idx_notifications_unread index
+            query = query.where(Notification.is_read == False)
 
-    @staticmethod
-    async def get_unread_notifications_count(user_id: str) -> int:
+        after = decode_cursor(cursor)
+        if after:
+            query = query.where(tuple_(Notification.created_at, Notification.id) < tuple_(*after))
+
+        notifications = self.db.execute(
+            query.order_by(Notification.created_at.desc(), Notification.id.desc()).limit(limit + 1)
+        ).scalars().all()
+
+        next_cursor = None
+        if len(notifications) > limit:
+            notifications = notifications[:limit]
+            last = notifications[-1]
+            next_cursor = encode_cursor(last.created_at, str(last.id))
+
+        return {
+            "items": [self._format_notification(notification) for notification in notifications],
+            "next_cursor": next_cursor
+        }
+
+    def get_unread_notifications_count(self, user_id: str) -> int:
         """
         Get count of unread notifications for a user
         """
-        db = SessionLocal()
-        try:
-            return db.query(Notification)\
-                .filter(Notification.user_id == user_id, Notification.is_read == False)\
-                .count()
-        finally:
-            db.close()
+        count = self.db.query(NotificationCounter.unread_count)\
+            .filter(NotificationCounter.user_id == str(user_id))\
+            .scalar()
+        return count or 0
+
+    def rebuild_unread_count(self, user_id: str) -> int:
+        """Recompute a user's counter from the notifications table, for repairs."""
+        count = self.db.query(func.count(Notification.id))\
+            .filter(Notification.user_id == str(user_id), Notification.is_read == False)\
+            .scalar()
+        stmt = pg_insert(NotificationCounter).values(user_id=str(user_id), unread_count=count)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[NotificationCounter.user_id],
+            set_={"unread_count": count, "updated_at": func.now()}
+        )
+        self.db.execute(stmt)
+        self.db.commit()
+        return count
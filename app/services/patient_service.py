@@ -1,11 +1,16 @@
-from typing import Optional, List
+from typing import Iterator, Optional, List
+from sqlalchemy import select, tuple_
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import Session
 from datetime import datetime
 from uuid import UUID
 
 from app.db.models.patient import Patient
 from app.db.models.user import User
+from app.db.dml import update_returning
 from app.schemas.patient import PatientCreate, PatientUpdate
+from app.core.pagination import encode_cursor, decode_cursor
+from app.core.typeahead import typeahead
 
 class PatientService:
     def __init__(self, db: Session):
@@ -17,8 +22,26 @@ class PatientService:
     def get_by_user_id(self, user_id: str) -> Optional[Patient]:
         return self.db.query(Patient).join(User.patient).filter(User.id == user_id).first()
 
-    def get_all(self) -> List[Patient]:
-        return self.db.query(Patient).all()
+    def get_multi(self, limit: int = 100, cursor: Optional[str] = None) -> dict:
+        """Get a page of patients in registration order, keyset-paginated on (created_at, id)."""
+        query = select(Patient)
+        after = decode_cursor(cursor)
+        if after:
+            query = query.where(tuple_(Patient.created_at, Patient.id) > tuple_(*after))
+        patients = self.db.execute(
+            query.order_by(Patient.created_at, Patient.id).limit(limit + 1)
+        ).scalars().all()
+
+        next_cursor = None
+        if len(patients) > limit:
+            patients = patients[:limit]
+            next_cursor = encode_cursor(patients[-1].created_at, str(patients[-1].id))
+        return {"items": patients, "next_cursor": next_cursor}
+
+    def iter_all(self, batch_size: int = 1000) -> Iterator[Patient]:
+        """Stream every patient from a server-side cursor, batch_size rows in memory at a time."""
+        query = select(Patient).order_by(Patient.created_at, Patient.id)
+        yield from self.db.execute(query.execution_options(yield_per=batch_size)).scalars()
 
     def create(self, obj_in: PatientCreate) -> Patient:
         db_obj = Patient(
@@ -33,21 +56,17 @@ class PatientService:
         self.db.add(db_obj)
         self.db.commit()
         self.db.refresh(db_obj)
+        typeahead.invalidate("patient")
         return db_obj
 
-    def update(self, id: UUID, obj_in: PatientUpdate) -> Optional[Patient]:
-        db_obj = self.get(id)
-        if not db_obj:
+    def update(self, id: UUID, obj_in: PatientUpdate) -> Optional[Row]:
+        """Update a patient with one UPDATE ... RETURNING; None if there is no such patient."""
+        patient = update_returning(self.db, Patient, id, obj_in.dict(exclude_unset=True))
+        if not patient:
             return None
-        
-        update_data = obj_in.dict(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(db_obj, field, value)
-            
-        self.db.add(db_obj)
         self.db.commit()
-        self.db.refresh(db_obj)
-        return db_obj
+        typeahead.invalidate("patient")
+        return patient
 
     def delete(self, id: UUID) -> bool:
         db_obj = self.get(id)
@@ -55,4 +74,5 @@ class PatientService:
             return False
         self.db.delete(db_obj)
         self.db.commit()
+        typeahead.invalidate("patient")
         return True 
\ No newline at end of file
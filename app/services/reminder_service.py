@@ -0,0 +1,198 @@
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+from uuid import uuid4
+import asyncio
+import json
+import logging
+
+from sqlalchemy import func, insert, select, tuple_, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.events import publish_event
+from app.core.rabbitmq import RabbitMQ
+from app.db.models.appointment import Appointment
+from app.db.models.doctor import Doctor
+from app.db.models.notification import Notification
+from app.db.models.user import User
+from app.db.session import SessionLocal
+from app.services.notification_service import NotificationService
+
+logger = logging.getLogger(__name__)
+
+REMINDER_STATUSES = ("scheduled", "confirmed")
+
+
+class ReminderService:
+    """
+    Batch dispatcher for appointment reminders.
+
+    Due appointments are scanned in keyset-paginated pages ordered by
+    (start_time, id). Each page is claimed by setting ``reminder_sent_at``
+    in a single UPDATE, so concurrent runs never remind the same appointment
+    twice, and the notification rows and unread counters are written in the
+    same transaction.
+    """
+
+    def __init__(self, db: Session, batch_size: int = settings.REMINDER_BATCH_SIZE):
+        self.db = db
+        self.batch_size = batch_size
+
+    @staticmethod
+    def _reminder_content(doctor_first_name: str, start_time: datetime) -> str:
+        return (
+            f"Reminder: You have an appointment with Dr. {doctor_first_name} "
+            f"on {start_time.strftime('%Y-%m-%d %H:%M')}"
+        )
+
+    def _fetch_page(
+        self,
+        window_start: datetime,
+        window_end: datetime,
+        after: Optional[Tuple[datetime, str]] = None
+    ) -> List:
+        """Fetch the next page of due appointments joined with doctor and patient user."""
+        query = (
+            select(
+                Appointment.id,
+                Appointment.start_time,
+                Doctor.first_name.label("doctor_first_name"),
+                User.id.label("user_id"),
+            )
+            .join(Doctor, Doctor.id == Appointment.doctor_id)
+            .outerjoin(User, User.patient_id == Appointment.patient_id)
+            .where(
+                Appointment.start_time >= window_start,
+                Appointment.start_time < window_end,
+                Appointment.status.in_(REMINDER_STATUSES),
+                Appointment.reminder_sent_at.is_(None),
+            )
+        )
+        if after is not None:
+            query = query.where(tuple_(Appointment.start_time, Appointment.id) > tuple_(*after))
+        query = query.order_by(Appointment.start_time, Appointment.id).limit(self.batch_size)
+        return self.db.execute(query).all()
+
+    def _claim(self, appointment_ids: List) -> set:
+        """Set the sent-marker on the given appointments and return the ones this run won."""
+        result = self.db.execute(
+            update(Appointment)
+            .where(
+                Appointment.id.in_(appointment_ids),
+                Appointment.reminder_sent_at.is_(None),
+            )
+            .values(reminder_sent_at=func.now())
+            .returning(Appointment.id)
+            .execution_options(synchronize_session=False)
+        )
+        return {str(row.id) for row in result}
+
+    def process_page(
+        self,
+        window_start: datetime,
+        window_end: datetime,
+        after: Optional[Tuple[datetime, str]] = None
+    ) -> Tuple[int, Optional[Tuple[datetime, str]], List[str]]:
+        """
+        Claim and persist reminders for one page of due appointments.
+
+        Returns the number of rows scanned, the keyset cursor for the next page
+        and the queue messages to publish once the transaction has committed.
+        """
+        rows = self._fetch_page(window_start, window_end, after)
+        if not rows:
+            return 0, None, []
+
+        try:
+            claimed = self._claim([row.id for row in rows])
+            notifications = [
+                {
+                    "id": uuid4(),
+                    "user_id": row.user_id,
+                    "type": "appointment_reminder",
+                    "content": self._reminder_content(row.doctor_first_name, row.start_time),
+                }
+                for row in rows
+                if str(row.id) in claimed and row.user_id is not None
+            ]
+            if notifications:
+                self.db.execute(insert(Notification), notifications)
+                NotificationService.increment_unread_counts(
+                    self.db,
+                    Counter(str(notification["user_id"]) for notification in notifications)
+                )
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+        messages = [
+            json.dumps({
+                "notification_id": str(notification["id"]),
+                "user_id": str(notification["user_id"]),
+                "type": notification["type"],
+                "content": notification["content"],
+            })
+            for notification in notifications
+        ]
+        last = rows[-1]
+        return len(rows), (last.start_time, last.id), messages
+
+    async def dispatch(self, window_start: datetime, window_end: datetime) -> int:
+        """Send reminders for every unreminded appointment starting in the window."""
+        sent = 0
+        cursor = None
+        while True:
+            # Database work is blocking, keep it off the event loop
+            scanned, cursor, messages = await asyncio.to_thread(
+                self.process_page, window_start, window_end, cursor
+            )
+            if messages:
+                try:
+                    await RabbitMQ.publish_messages("notifications", messages)
+                except Exception as e:
+                    # The notification rows are already stored, clients still see them in their inbox
+                    logger.error(f"Error publishing reminder batch: {str(e)}")
+                for message in messages:
+                    payload = json.loads(message)
+                    publish_event("notification.created", [f"user:{payload['user_id']}"], payload)
+                sent += len(messages)
+            if scanned < self.batch_size:
+                break
+        return sent
+
+
+class ReminderScheduler:
+    """Periodically dispatches reminders for appointments entering the lead window."""
+
+    def __init__(
+        self,
+        lead: timedelta = timedelta(minutes=settings.REMINDER_LEAD_MINUTES),
+        interval_seconds: int = settings.REMINDER_INTERVAL_SECONDS,
+        batch_size: int = settings.REMINDER_BATCH_SIZE
+    ):
+        self.lead = lead
+        self.interval_seconds = interval_seconds
+        self.batch_size = batch_size
+
+    async def run_once(self, now: Optional[datetime] = None) -> int:
+        """Dispatch the bucket of appointments starting between now and now + lead."""
+        now = now or datetime.now(timezone.utc)
+        db = SessionLocal()
+        try:
+            return await ReminderService(db, self.batch_size).dispatch(now, now + self.lead)
+        finally:
+            db.close()
+
+    async def run_forever(self) -> None:
+        while True:
+            try:
+                sent = await self.run_once()
+                if sent:
+                    logger.info(f"Dispatched {sent} appointment reminders")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error dispatching appointment reminders: {str(e)}")
+            await asyncio.sleep(self.interval_seconds)
@@ -0,0 +1,254 @@
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Optional, Sequence
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.intervals import (
+    complement, conflict_interval, from_epoch, intersect_all, merge, slot_starts, to_epoch
+)
+from app.core.timezones import schedule_window
+from app.db.models.appointment import Appointment
+from app.db.models.resource import Resource, ResourceBooking
+from app.db.models.user import User
+from app.schemas.resource import ResourceCreate
+from app.services.doctor_schedule_service import DoctorScheduleService
+
+MAX_SEARCH_DAYS = 31
+
+
+class ResourceService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _format_resource(self, resource: Resource) -> dict:
+        """Format resource for response."""
+        return {
+            "id": str(resource.id),
+            "name": resource.name,
+            "kind": resource.kind,
+            "is_active": resource.is_active
+        }
+
+    def create(self, resource_in: ResourceCreate, current_user: User) -> dict:
+        if current_user.role not in ("admin", "staff"):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Only admin and staff can manage resources"
+            )
+        resource = Resource(name=resource_in.name, kind=resource_in.kind, is_active=resource_in.is_active)
+        self.db.add(resource)
+        try:
+            self.db.commit()
+        except IntegrityError:
+            self.db.rollback()
+            raise ValueError(f"A resource named {resource_in.name} already exists")
+        self.db.refresh(resource)
+        return self._format_resource(resource)
+
+    def list(self, kind: Optional[str] = None) -> List[dict]:
+        query = select(Resource).where(Resource.is_active == True)
+        if kind:
+            query = query.where(Resource.kind == kind)
+        resources = self.db.execute(query.order_by(Resource.kind, Resource.name)).scalars().all()
+        return [self._format_resource(resource) for resource in resources]
+
+    def get_calendar(self, resource_id: str, start: datetime, end: datetime) -> List[dict]:
+        """Active bookings of a resource overlapping [start, end]."""
+        rows = self.db.execute(
+            select(ResourceBooking.appointment_id, ResourceBooking.start_time, ResourceBooking.end_time)
+            .join(Appointment, Appointment.id == ResourceBooking.appointment_id)
+            .where(
+                ResourceBooking.resource_id == resource_id,
+                ResourceBooking.start_time <= end,
+                ResourceBooking.end_time >= start,
+                Appointment.status != "cancelled"
+            )
+            .order_by(ResourceBooking.start_time)
+        ).all()
+        return [
+            {
+                "appointment_id": str(row.appointment_id),
+                "start_time": row.start_time.isoformat(),
+                "end_time": row.end_time.isoformat()
+            }
+            for row in rows
+        ]
+
+    def _lock(self, resource_ids: Sequence[str]) -> Dict[str, Resource]:
+        resources = self.db.execute(
+            select(Resource)
+            .where(Resource.id.in_(resource_ids))
+            .order_by(Resource.id)
+            .with_for_update()
+        ).scalars().all()
+        return {str(resource.id): resource for resource in resources}
+
+    def _check_free(self, found: Dict[str, Resource], start: datetime, end: datetime,
+                    exclude_appointment_id: Optional[UUID] = None) -> None:
+        # Same overlap rule as AppointmentService._check_availability
+        query = (
+            select(ResourceBooking.resource_id, ResourceBooking.start_time, ResourceBooking.end_time)
+            .join(Appointment, Appointment.id == ResourceBooking.appointment_id)
+            .where(
+                ResourceBooking.resource_id.in_(list(found)),
+                ResourceBooking.start_time <= end,
+                ResourceBooking.end_time >= start,
+                Appointment.status != "cancelled"
+            )
+        )
+        if exclude_appointment_id is not None:
+            query = query.where(ResourceBooking.appointment_id != exclude_appointment_id)
+        conflict = self.db.execute(query.limit(1)).first()
+        if conflict:
+            name = found[str(conflict.resource_id)].name
+            raise ValueError(
+                f"{name} is already booked from {conflict.start_time.strftime('%H:%M')} "
+                f"to {conflict.end_time.strftime('%H:%M')} on {conflict.start_time.strftime('%Y-%m-%d')}."
+            )
+
+    def reserve(self, appointment: Appointment, resource_ids: Sequence[str]) -> None:
+        """
+        Hold the resources for an appointment in the caller's transaction.
+
+        The resource rows are locked in a fixed order first, so two bookings
+        racing for the same room serialise instead of both passing the
+        conflict check. Raises ValueError if any resource is unavailable.
+        """
+        resource_ids = sorted({str(resource_id) for resource_id in resource_ids})
+        if not resource_ids:
+            return
+        found = self._lock(resource_ids)
+        for resource_id in resource_ids:
+            if resource_id not in found or not found[resource_id].is_active:
+                raise ValueError(f"Resource {resource_id} not found")
+
+        self._check_free(found, appointment.start_time, appointment.end_time)
+
+        self.db.add_all([
+            ResourceBooking(
+                resource_id=resource_id,
+                appointment_id=appointment.id,
+                start_time=appointment.start_time,
+                end_time=appointment.end_time
+            )
+            for resource_id in resource_ids
+        ])
+
+    def move_bookings(self, appointment_id: UUID, start: datetime, end: datetime) -> None:
+        """
+        Move the resources held for a rescheduled appointment to its new time, in the caller's transaction.
+
+        The resources are locked in the same order as reserve() and checked
+        against every other booking, so the old slot is freed and the new one
+        cannot be double-booked. Raises ValueError if a resource is taken.
+        """
+        resource_ids = sorted({
+            str(resource_id) for resource_id in self.db.execute(
+                select(ResourceBooking.resource_id).where(ResourceBooking.appointment_id == appointment_id)
+            ).scalars().all()
+        })
+        if not resource_ids:
+            return
+        found = self._lock(resource_ids)
+        self._check_free(found, start, end, exclude_appointment_id=appointment_id)
+        self.db.execute(
+            update(ResourceBooking)
+            .where(ResourceBooking.appointment_id == appointment_id)
+            .values(start_time=start, end_time=end)
+        )
+
+    def _doctor_busy(self, doctor_id: str, start: datetime, end: datetime):
+        rows = self.db.execute(
+            select(Appointment.start_time, Appointment.end_time).where(
+                Appointment.doctor_id == doctor_id,
+                Appointment.start_time <= end,
+                Appointment.end_time >= start,
+                Appointment.status != "cancelled"
+            )
+        ).all()
+        return merge(conflict_interval(row.start_time, row.end_time) for row in rows)
+
+    def _resources_busy(self, resource_ids: Sequence[str], start: datetime, end: datetime) -> Dict[str, list]:
+        rows = self.db.execute(
+            select(ResourceBooking.resource_id, ResourceBooking.start_time, ResourceBooking.end_time)
+            .join(Appointment, Appointment.id == ResourceBooking.appointment_id)
+            .where(
+                ResourceBooking.resource_id.in_(resource_ids),
+                ResourceBooking.start_time <= end,
+                ResourceBooking.end_time >= start,
+                Appointment.status != "cancelled"
+            )
+        ).all()
+        busy = defaultdict(list)
+        for row in rows:
+            busy[str(row.resource_id)].append(conflict_interval(row.start_time, row.end_time))
+        return {resource_id: merge(busy[resource_id]) for resource_id in resource_ids}
+
+    def find_slots(
+        self,
+        doctor_id: str,
+        resource_ids: Sequence[str],
+        start_date: date,
+        end_date: date,
+        duration_minutes: int,
+        step_minutes: int = 15,
+        limit: int = 20
+    ) -> List[dict]:
+        """
+        Slots where the doctor and every required resource are free together.
+
+        Busy time is loaded with one query for the doctor and one for all the
+        resources, turned into merged interval lists, and each day's free
+        intervals are intersected with a sorted sweep. Days are local days at
+        the schedule's location, and slots are returned in its time zone.
+        """
+        if end_date < start_date:
+            raise ValueError("end_date must not be before start_date")
+        if (end_date - start_date).days >= MAX_SEARCH_DAYS:
+            raise ValueError(f"Search at most {MAX_SEARCH_DAYS} days at a time")
+        resource_ids = sorted({str(resource_id) for resource_id in resource_ids})
+
+        schedules = {
+            day_of_week: schedule
+            for day_of_week, schedule in DoctorScheduleService(self.db).get_week(doctor_id).items()
+            if schedule.is_available
+        }
+        # Local days can start up to 14 hours either side of UTC midnight
+        range_start = datetime.combine(start_date - timedelta(days=1), datetime.min.time(), timezone.utc)
+        range_end = datetime.combine(end_date + timedelta(days=2), datetime.min.time(), timezone.utc)
+        doctor_busy = self._doctor_busy(doctor_id, range_start, range_end)
+        resources_busy = self._resources_busy(resource_ids, range_start, range_end) if resource_ids else {}
+
+        length = duration_minutes * 60 + 1  # An inclusive [start, end] booking occupies one extra second
+        not_before = to_epoch(datetime.now(timezone.utc))
+        slots = []
+        for offset in range((end_date - start_date).days + 1):
+            if len(slots) >= limit:
+                break
+            current = start_date + timedelta(days=offset)
+            schedule = schedules.get(current.weekday())
+            if schedule is None:
+                continue
+            zone = DoctorScheduleService.time_zone(schedule)
+            window_start, window_end = schedule_window(current, schedule.start_time, schedule.end_time, zone)
+            window = (window_start, window_end + 1)
+            free = intersect_all(
+                [complement(doctor_busy, window)]
+                + [complement(resources_busy[resource_id], window) for resource_id in resource_ids]
+            )
+            for start in slot_starts(free, length, step_minutes * 60, origin=window[0]):
+                if start < not_before:
+                    continue
+                slot_start = from_epoch(start).astimezone(zone)
+                slots.append({
+                    "start_time": slot_start.isoformat(),
+                    "end_time": from_epoch(start + duration_minutes * 60).astimezone(zone).isoformat()
+                })
+                if len(slots) >= limit:
+                    break
+        return slots
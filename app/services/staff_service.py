@@ -1,7 +1,9 @@
 from typing import Optional, List
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import Session
 from app.db.models.staff import Staff
 from app.db.models.user import User
+from app.db.dml import update_returning
 from app.schemas.staff import StaffCreate, StaffUpdate
 from app.services.base import BaseService
 
@@ -31,15 +33,10 @@ class StaffService(BaseService[Staff, StaffCreate, StaffUpdate]):
         self.db.refresh(db_obj)
         return db_obj
 
-    def update(self, id: str, obj_in: StaffUpdate) -> Staff:
-        db_obj = self.get(id)
-        if db_obj:
-            update_data = obj_in.model_dump(exclude_unset=True)
-            for field, value in update_data.items():
-                setattr(db_obj, field, value)
-            self.db.commit()
-            self.db.refresh(db_obj)
-        return db_obj
+    def update(self, id: str, obj_in: StaffUpdate) -> Optional[Row]:
+        row = update_returning(self.db, Staff, id, obj_in.model_dump(exclude_unset=True))
+        self.db.commit()
+        return row
 
     def remove(self, id: str) -> Staff:
         obj = self.db.query(Staff).get(id)
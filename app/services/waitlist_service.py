@@ -0,0 +1,251 @@
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+import heapq
+import logging
+
+from fastapi import HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.events import publish_event
+from app.db.models.appointment import Appointment
+from app.db.models.notification import Notification
+from app.db.models.user import User
+from app.db.models.waitlist_entry import WaitlistEntry
+from app.schemas.waitlist import WaitlistEntryCreate
+from app.services.notification_service import NotificationService
+
+logger = logging.getLogger(__name__)
+
+
+class WaitlistQueue:
+    """One doctor's waiting entries as a heap: highest priority first, then earliest request."""
+
+    def __init__(self, entries=()):
+        self._heap = []
+        for entry in entries:
+            self.push(entry)
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def push(self, entry: WaitlistEntry) -> None:
+        heapq.heappush(self._heap, (-entry.priority, entry.requested_at, str(entry.id), entry))
+
+    def pop(self) -> WaitlistEntry:
+        return heapq.heappop(self._heap)[-1]
+
+    def fill(self, start: datetime, end: datetime) -> List[Tuple[WaitlistEntry, datetime, datetime]]:
+        """
+        Hand out slots inside [start, end) in queue order. Each entry gets the
+        earliest start its window allows in any part of the interval still
+        free, so a gap left before an entry that had to start later can go to
+        a lower-priority entry.
+        """
+        matches = []
+        free = [(start, end)]
+        while self._heap and free:
+            entry = self.pop()
+            duration = timedelta(minutes=entry.duration_minutes)
+            for i, (free_start, free_end) in enumerate(free):
+                slot_start = max(free_start, entry.earliest_start)
+                slot_end = slot_start + duration
+                if slot_end <= min(free_end, entry.latest_end):
+                    matches.append((entry, slot_start, slot_end))
+                    free[i:i + 1] = [
+                        (gap_start, gap_end)
+                        for gap_start, gap_end in ((free_start, slot_start), (slot_end, free_end))
+                        if gap_start < gap_end
+                    ]
+                    break
+        return matches
+
+
+class WaitlistService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _format_entry(self, entry: WaitlistEntry) -> dict:
+        """Format waitlist entry for response."""
+        return {
+            "id": str(entry.id),
+            "doctor_id": str(entry.doctor_id),
+            "patient_id": str(entry.patient_id),
+            "earliest_start": entry.earliest_start.isoformat(),
+            "latest_end": entry.latest_end.isoformat(),
+            "duration_minutes": entry.duration_minutes,
+            "priority": entry.priority,
+            "reason": entry.reason,
+            "status": entry.status,
+            "appointment_id": str(entry.appointment_id) if entry.appointment_id else None,
+            "requested_at": entry.requested_at.isoformat()
+        }
+
+    def _check_access(self, current_user: User, doctor_id, patient_id) -> None:
+        if current_user.role in ("admin", "staff"):
+            return
+        if current_user.role == "doctor" and str(current_user.doctor_id) == str(doctor_id):
+            return
+        if current_user.role == "patient" and str(current_user.patient_id) == str(patient_id):
+            return
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You don't have permission to manage this waitlist entry"
+        )
+
+    def create(self, entry_in: WaitlistEntryCreate, current_user: User) -> dict:
+        patient_id = entry_in.patient_id or current_user.patient_id
+        if not patient_id:
+            raise ValueError("patient_id is required")
+        self._check_access(current_user, entry_in.doctor_id, patient_id)
+        if entry_in.priority and current_user.role not in ("admin", "staff", "doctor"):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Only clinic staff can prioritise waitlist entries"
+            )
+        if entry_in.earliest_start + timedelta(minutes=entry_in.duration_minutes) > entry_in.latest_end:
+            raise ValueError("The requested duration does not fit in the time window")
+
+        entry = WaitlistEntry(
+            doctor_id=str(entry_in.doctor_id),
+            patient_id=str(patient_id),
+            earliest_start=entry_in.earliest_start,
+            latest_end=entry_in.latest_end,
+            duration_minutes=entry_in.duration_minutes,
+            priority=entry_in.priority,
+            reason=entry_in.reason,
+            status="waiting"
+        )
+        self.db.add(entry)
+        self.db.commit()
+        self.db.refresh(entry)
+        return self._format_entry(entry)
+
+    def list(self, current_user: User, doctor_id: Optional[str] = None,
+             patient_id: Optional[str] = None, entry_status: str = "waiting") -> List[dict]:
+        """List entries in the order they would be served."""
+        if current_user.role == "doctor":
+            doctor_id = str(current_user.doctor_id)
+        elif current_user.role == "patient":
+            patient_id = str(current_user.patient_id)
+        elif current_user.role not in ("admin", "staff"):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="You don't have permission to view the waitlist"
+            )
+
+        query = select(WaitlistEntry).where(WaitlistEntry.status == entry_status)
+        if doctor_id:
+            query = query.where(WaitlistEntry.doctor_id == doctor_id)
+        if patient_id:
+            query = query.where(WaitlistEntry.patient_id == patient_id)
+        entries = self.db.execute(
+            query.order_by(WaitlistEntry.priority.desc(), WaitlistEntry.requested_at).limit(500)
+        ).scalars().all()
+        return [self._format_entry(entry) for entry in entries]
+
+    def cancel(self, entry_id: str, current_user: User) -> bool:
+        entry = self.db.query(WaitlistEntry).filter(WaitlistEntry.id == entry_id).first()
+        if not entry:
+            return False
+        self._check_access(current_user, entry.doctor_id, entry.patient_id)
+        if entry.status != "waiting":
+            raise ValueError(f"Waitlist entry is already {entry.status}")
+        entry.status = "cancelled"
+        self.db.commit()
+        return True
+
+    def fill_freed_slot(self, doctor_id, start: datetime, end: datetime) -> List[Dict]:
+        """
+        Book waiting patients into a slot that was just freed.
+
+        Runs inside the caller's transaction, so the cancellation and the new
+        bookings commit together. Candidate entries are locked with SKIP
+        LOCKED, so concurrent cancellations never hand the same entry two
+        slots. Returns the bookings for publish_bookings once committed.
+        """
+        start = max(start, datetime.now(timezone.utc))
+        if start >= end:
+            return []
+
+        freed_minutes = (end - start).total_seconds() / 60
+        candidates = self.db.execute(
+            select(WaitlistEntry)
+            .where(
+                WaitlistEntry.doctor_id == doctor_id,
+                WaitlistEntry.status == "waiting",
+                WaitlistEntry.earliest_start < end,
+                WaitlistEntry.latest_end > start,
+                WaitlistEntry.duration_minutes <= freed_minutes
+            )
+            .order_by(WaitlistEntry.priority.desc(), WaitlistEntry.requested_at)
+            .limit(settings.WAITLIST_MATCH_LIMIT)
+            .with_for_update(skip_locked=True)
+        ).scalars().all()
+
+        matches = WaitlistQueue(candidates).fill(start, end)
+        if not matches:
+            return []
+
+        user_ids = dict(self.db.execute(
+            select(User.patient_id, User.id)
+            .where(User.patient_id.in_([entry.patient_id for entry, _, _ in matches]))
+        ).all())
+
+        bookings = []
+        for entry, slot_start, slot_end in matches:
+            appointment = Appointment(
+                doctor_id=entry.doctor_id,
+                patient_id=entry.patient_id,
+                start_time=slot_start,
+                end_time=slot_end,
+                status="scheduled",
+                reason=entry.reason
+            )
+            self.db.add(appointment)
+            self.db.flush()
+            entry.status = "booked"
+            entry.appointment_id = appointment.id
+
+            notification = None
+            user_id = user_ids.get(entry.patient_id)
+            if user_id:
+                notification = Notification(
+                    user_id=user_id,
+                    type="waitlist_booked",
+                    content=f"A slot opened up: you are booked on "
+                            f"{slot_start.strftime('%Y-%m-%d %H:%M')}",
+                    is_read=False
+                )
+                self.db.add(notification)
+            bookings.append({"appointment": appointment, "notification": notification})
+
+        self.db.flush()
+        NotificationService.increment_unread_counts(self.db, Counter(
+            str(booking["notification"].user_id) for booking in bookings if booking["notification"]
+        ))
+        return bookings
+
+    @staticmethod
+    def publish_bookings(bookings: List[Dict], format_appointment) -> None:
+        for booking in bookings:
+            appointment = format_appointment(booking["appointment"])
+            publish_event(
+                "appointment.created",
+                [f"doctor:{appointment['doctor_id']}", f"patient:{appointment['patient_id']}"],
+                {**appointment, "source": "waitlist"}
+            )
+            notification = booking["notification"]
+            if notification is not None:
+                publish_event(
+                    "notification.created",
+                    [f"user:{notification.user_id}"],
+                    {
+                        "notification_id": str(notification.id),
+                        "user_id": str(notification.user_id),
+                        "type": notification.type,
+                        "content": notification.content
+                    }
+                )
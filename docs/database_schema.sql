@@ -1,5 +1,7 @@
 -- Enable UUID extension
 CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
+-- Enable trigram matching for fuzzy search
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
 
 -- Create tables
 -- Create the base users table 
@@ -63,6 +65,17 @@ CREATE TABLE doctors (
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
+-- Create the locations table (schedule times are wall-clock times in the location's time zone)
+CREATE TABLE locations (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    name VARCHAR(255) UNIQUE NOT NULL,
+    time_zone VARCHAR(64) NOT NULL, -- IANA name, e.g. Africa/Nairobi
+    address TEXT,
+    is_active BOOLEAN NOT NULL DEFAULT TRUE,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
 -- Create the doctor_schedules table
 CREATE TABLE doctor_schedules (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
@@ -71,6 +84,7 @@ CREATE TABLE doctor_schedules (
     start_time TIME NOT NULL,
     end_time TIME NOT NULL,
     is_available BOOLEAN DEFAULT TRUE,
+    location_id UUID REFERENCES locations(id) ON DELETE SET NULL, -- NULL: DEFAULT_TIME_ZONE
     CONSTRAINT valid_day_of_week CHECK (day_of_week BETWEEN 0 AND 6),
     CONSTRAINT valid_time_range CHECK (start_time < end_time),
     UNIQUE (doctor_id, day_of_week)
@@ -89,6 +103,8 @@ CREATE TABLE appointments (
     is_recurring BOOLEAN DEFAULT FALSE,
     recurrence_pattern VARCHAR(20),
     recurrence_end_date TIMESTAMP WITH TIME ZONE,
+    reminder_sent_at TIMESTAMP WITH TIME ZONE,
+    version INT NOT NULL DEFAULT 1, -- optimistic concurrency, served as the ETag
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
     CONSTRAINT check_end_time_after_start_time CHECK (end_time > start_time),
@@ -104,8 +120,78 @@ CREATE TABLE medical_records (
     diagnosis TEXT,
     prescription TEXT,
     notes TEXT,
+    current_version INT NOT NULL DEFAULT 1,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
-    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    search_vector TSVECTOR GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(diagnosis, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(prescription, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(notes, '')), 'C')
+    ) STORED
+);
+
+-- Create the medical_record_revisions table (append-only, reverse deltas)
+CREATE TABLE medical_record_revisions (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    record_id UUID NOT NULL REFERENCES medical_records(id) ON DELETE CASCADE,
+    version INT NOT NULL,
+    changed_fields TEXT[] NOT NULL,
+    delta JSONB NOT NULL,
+    author_id UUID REFERENCES users(id) ON DELETE SET NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    CONSTRAINT uq_medical_record_revisions_version UNIQUE (record_id, version)
+);
+
+-- Create the medical_record_attachments table (file contents live in the blob store)
+CREATE TABLE medical_record_attachments (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    record_id UUID NOT NULL REFERENCES medical_records(id) ON DELETE CASCADE,
+    filename VARCHAR(255) NOT NULL,
+    content_type VARCHAR(100) NOT NULL,
+    size BIGINT NOT NULL,
+    sha256 CHAR(64) NOT NULL,
+    uploaded_by UUID REFERENCES users(id) ON DELETE SET NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- Create the resources (rooms, equipment) and resource_bookings tables
+CREATE TABLE resources (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    name VARCHAR(255) UNIQUE NOT NULL,
+    kind VARCHAR(20) NOT NULL,
+    is_active BOOLEAN NOT NULL DEFAULT TRUE,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    CONSTRAINT check_resource_kind CHECK (kind IN ('room', 'equipment'))
+);
+
+CREATE TABLE resource_bookings (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    resource_id UUID NOT NULL REFERENCES resources(id) ON DELETE CASCADE,
+    appointment_id UUID NOT NULL REFERENCES appointments(id) ON DELETE CASCADE,
+    start_time TIMESTAMP WITH TIME ZONE NOT NULL,
+    end_time TIMESTAMP WITH TIME ZONE NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    CONSTRAINT check_resource_booking_times CHECK (end_time > start_time)
+);
+
+-- Create the waitlist_entries table
+CREATE TABLE waitlist_entries (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    doctor_id UUID NOT NULL REFERENCES doctors(id) ON DELETE CASCADE,
+    patient_id UUID NOT NULL REFERENCES patients(id) ON DELETE CASCADE,
+    earliest_start TIMESTAMP WITH TIME ZONE NOT NULL,
+    latest_end TIMESTAMP WITH TIME ZONE NOT NULL,
+    duration_minutes INT NOT NULL,
+    priority INT NOT NULL DEFAULT 0,
+    reason TEXT NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'waiting',
+    appointment_id UUID REFERENCES appointments(id) ON DELETE SET NULL,
+    requested_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    CONSTRAINT check_waitlist_window CHECK (latest_end > earliest_start),
+    CONSTRAINT check_waitlist_duration CHECK (duration_minutes > 0),
+    CONSTRAINT check_waitlist_status CHECK (status IN ('waiting', 'booked', 'cancelled'))
 );
 
 -- Create the notifications table
@@ -118,17 +204,62 @@ CREATE TABLE notifications (
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
--- Create the audit_logs table              
+-- Create the notification_counters table (unread badge, maintained alongside notifications)
+CREATE TABLE notification_counters (
+    user_id UUID PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
+    unread_count INT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    CONSTRAINT check_unread_count_non_negative CHECK (unread_count >= 0)
+);
+
+-- Create the idempotency_keys table (stored responses to POSTs retried with an Idempotency-Key)
+CREATE TABLE idempotency_keys (
+    owner VARCHAR(64) NOT NULL,
+    key VARCHAR(255) NOT NULL,
+    fingerprint VARCHAR(64) NOT NULL,
+    status_code SMALLINT,
+    headers JSONB,
+    body BYTEA,
+    locked_until TIMESTAMP WITH TIME ZONE,
+    expires_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    PRIMARY KEY (owner, key)
+);
+
+-- Create the audit_logs table, range-partitioned by month on created_at.
+-- Monthly partitions are created ahead of time by AuditLogService.ensure_partitions
+-- and old ones are detached and archived. Rows outside them land in audit_logs_default.
 CREATE TABLE audit_logs (
-    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    id UUID NOT NULL DEFAULT uuid_generate_v4(),
     user_id UUID REFERENCES users(id) ON DELETE SET NULL,
     action VARCHAR(50) NOT NULL,
     resource_type VARCHAR(50) NOT NULL,
     resource_id UUID,
     details JSONB,
     ip_address VARCHAR(45),
-    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
-);
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (id, created_at)
+) PARTITION BY RANGE (created_at);
+
+CREATE TABLE audit_logs_default PARTITION OF audit_logs DEFAULT;
+
+-- Create function to add the monthly audit_logs partition containing the given date
+CREATE OR REPLACE FUNCTION create_audit_log_partition(month_start DATE)
+RETURNS TEXT AS $$
+DECLARE
+    from_date DATE := date_trunc('month', month_start)::DATE;
+    to_date DATE := (date_trunc('month', month_start) + INTERVAL '1 month')::DATE;
+    partition_name TEXT := 'audit_logs_y' || to_char(from_date, 'YYYY') || 'm' || to_char(from_date, 'MM');
+BEGIN
+    EXECUTE format(
+        'CREATE TABLE IF NOT EXISTS %I PARTITION OF audit_logs FOR VALUES FROM (%L) TO (%L)',
+        partition_name, from_date, to_date
+    );
+    RETURN partition_name;
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT create_audit_log_partition((date_trunc('month', NOW()) + (n || ' months')::INTERVAL)::DATE)
+FROM generate_series(0, 3) AS n;
 
 -- Create the doctor_patient_assignments table
 CREATE TABLE doctor_patient_assignments (
@@ -146,18 +277,35 @@ CREATE TABLE doctor_patient_assignments (
 -- Create indexes for performance
 CREATE INDEX idx_users_email ON users(email);
 CREATE INDEX idx_patients_email ON patients(email);
+CREATE INDEX idx_patients_directory_trgm ON patients USING GIN ((lower(first_name || ' ' || last_name || ' ' || email || ' ' || phone)) gin_trgm_ops);
+CREATE INDEX idx_patients_created ON patients(created_at, id);
 CREATE INDEX idx_doctors_specialization ON doctors(specialization);
+CREATE INDEX idx_doctors_directory_trgm ON doctors USING GIN ((lower(first_name || ' ' || last_name || ' ' || specialization || ' ' || email || ' ' || phone || ' ' || license_number)) gin_trgm_ops);
 CREATE INDEX idx_appointments_patient_id ON appointments(patient_id);
-CREATE INDEX idx_appointments_doctor_id ON appointments(doctor_id);
+-- Covers doctor_id lookups too; calendar views are index-only scans on it
+CREATE INDEX idx_appointments_doctor_start ON appointments(doctor_id, start_time) INCLUDE (end_time, status);
 CREATE INDEX idx_appointments_start_time ON appointments(start_time);
 CREATE INDEX idx_appointments_status ON appointments(status);
-CREATE INDEX idx_medical_records_patient_id ON medical_records(patient_id);
+-- Partial index scanned by the reminder dispatcher; rows drop out once reminded
+CREATE INDEX idx_appointments_reminder_due ON appointments(start_time, id)
+    WHERE reminder_sent_at IS NULL AND status IN ('scheduled', 'confirmed');
+CREATE INDEX idx_medical_records_patient_created ON medical_records(patient_id, created_at DESC, id DESC) INCLUDE (doctor_id);
 CREATE INDEX idx_medical_records_appointment_id ON medical_records(appointment_id);
-CREATE INDEX idx_medical_records_doctor_id ON medical_records(doctor_id);
-CREATE INDEX idx_audit_logs_resource_type_id ON audit_logs(resource_type, resource_id);
-CREATE INDEX idx_audit_logs_user_id ON audit_logs(user_id);
-CREATE INDEX idx_notifications_user_id ON notifications(user_id);
-CREATE INDEX idx_notifications_is_read ON notifications(is_read);
+CREATE INDEX idx_medical_records_doctor_created ON medical_records(doctor_id, created_at DESC, id DESC);
+CREATE INDEX idx_medical_records_search ON medical_records USING GIN (search_vector);
+CREATE INDEX idx_medical_records_prescription_trgm ON medical_records USING GIN (prescription gin_trgm_ops);
+CREATE INDEX idx_medical_record_attachments_record ON medical_record_attachments(record_id, created_at);
+CREATE INDEX idx_medical_record_attachments_sha256 ON medical_record_attachments(sha256);
+CREATE INDEX idx_waitlist_entries_doctor_window ON waitlist_entries(doctor_id, earliest_start, latest_end)
+    WHERE status = 'waiting';
+CREATE INDEX idx_waitlist_entries_patient ON waitlist_entries(patient_id, status);
+CREATE INDEX idx_resource_bookings_resource_time ON resource_bookings(resource_id, start_time) INCLUDE (end_time, appointment_id);
+CREATE INDEX idx_resource_bookings_appointment ON resource_bookings(appointment_id);
+CREATE INDEX idx_idempotency_keys_expires_at ON idempotency_keys(expires_at);
+CREATE INDEX idx_audit_logs_resource_created ON audit_logs(resource_type, resource_id, created_at DESC);
+CREATE INDEX idx_audit_logs_user_created ON audit_logs(user_id, created_at DESC);
+CREATE INDEX idx_notifications_user_created ON notifications(user_id, created_at DESC, id DESC);
+CREATE INDEX idx_notifications_unread ON notifications(user_id, created_at DESC, id DESC) WHERE is_read = FALSE;
 CREATE INDEX idx_doctor_patient_assignments_doctor_id ON doctor_patient_assignments(doctor_id);
 CREATE INDEX idx_doctor_patient_assignments_patient_id ON doctor_patient_assignments(patient_id);
 CREATE INDEX idx_doctor_patient_assignments_is_active ON doctor_patient_assignments(is_active);
@@ -0,0 +1,99 @@
+"""
+Break down the import time of a module.
+
+    python scripts/profile_imports.py app.main
+    python scripts/profile_imports.py app.main --top 30 --budget-ms 2500
+
+Imports the module in a fresh interpreter under `python -X importtime`
+and lists the slowest imports by cumulative and by self time, then self
+time per top-level package. With --budget-ms the exit status is 1 when
+the whole import takes longer. Run it from the repository root.
+"""
+import argparse
+import subprocess
+import sys
+from typing import Dict, List, NamedTuple, Optional
+
+
+class ImportRecord(NamedTuple):
+    module: str
+    depth: int  # Nesting below the import that triggered it
+    self_us: int
+    cumulative_us: int
+
+
+def parse_importtime(output: str) -> List[ImportRecord]:
+    """Records from the `import time: self | cumulative | name` lines of -X importtime."""
+    records = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        if not self_us.strip().isdigit():
+            continue  # The header line
+        stripped = name.lstrip()
+        records.append(ImportRecord(
+            module=stripped.strip(),
+            depth=(len(name) - len(stripped) - 1) // 2,
+            self_us=int(self_us),
+            cumulative_us=int(cumulative_us),
+        ))
+    return records
+
+
+def profile(module: str, python: str = sys.executable) -> List[ImportRecord]:
+    result = subprocess.run(
+        [python, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+    return parse_importtime(result.stderr)
+
+
+def total_ms(records: List[ImportRecord], module: str) -> float:
+    return max(record.cumulative_us for record in records if record.module == module) / 1000
+
+
+def by_package(records: List[ImportRecord]) -> Dict[str, int]:
+    totals: Dict[str, int] = {}
+    for record in records:
+        package = record.module.split(".")[0]
+        totals[package] = totals.get(package, 0) + record.self_us
+    return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+
+def report(records: List[ImportRecord], module: str, top: int) -> str:
+    lines = [f"{module}: {total_ms(records, module):.0f} ms, {len(records)} modules", ""]
+    lines.append("Slowest by cumulative time (ms):")
+    for record in sorted(records, key=lambda r: r.cumulative_us, reverse=True)[:top]:
+        lines.append(f"  {record.cumulative_us / 1000:8.1f}  {record.module}")
+    lines.append("")
+    lines.append("Slowest by self time (ms):")
+    for record in sorted(records, key=lambda r: r.self_us, reverse=True)[:top]:
+        lines.append(f"  {record.self_us / 1000:8.1f}  {record.module}")
+    lines.append("")
+    lines.append("Self time by top-level package (ms):")
+    for package, self_us in list(by_package(records).items())[:top]:
+        lines.append(f"  {self_us / 1000:8.1f}  {package}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("module", nargs="?", default="app.main")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--budget-ms", type=float)
+    args = parser.parse_args(argv)
+
+    records = profile(args.module)
+    print(report(records, args.module, args.top))
+    elapsed = total_ms(records, args.module)
+    if args.budget_ms is not None and elapsed > args.budget_ms:
+        print(f"\n{args.module} took {elapsed:.0f} ms, over the {args.budget_ms:.0f} ms budget", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
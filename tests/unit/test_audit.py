@@ -0,0 +1,81 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+from uuid import uuid4
+
+from app.core import audit
+from app.core.audit import AuditLogger, AuditWriter
+
+class FakeSession:
+    """Records the batches the writer inserts instead of talking to the database"""
+    batches = []
+
+    def execute(self, statement, rows):
+        FakeSession.batches.append(list(rows))
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+def _entry():
+    return {"id": uuid4(), "action": "view", "resource_type": "medical_record", "resource_id": uuid4()}
+
+def test_audit_writer_flushes_in_batches():
+    """Test that queued entries are written as multi-row batches"""
+    FakeSession.batches = []
+    writer = AuditWriter(max_queue_size=100, batch_size=3, flush_interval=60, session_factory=FakeSession)
+
+    for _ in range(7):
+        writer._queue.put_nowait(_entry())
+    writer.flush()
+
+    assert [len(batch) for batch in FakeSession.batches] == [3, 3, 1]
+    assert writer.metrics()["written"] == 7
+    assert writer.metrics()["flushes"] == 3
+
+def test_audit_writer_drop_oldest_on_overflow():
+    """Test that a full buffer drops the oldest entry and counts it"""
+    FakeSession.batches = []
+    writer = AuditWriter(max_queue_size=2, batch_size=10, flush_interval=60,
+                         overflow_policy="drop_oldest", session_factory=FakeSession)
+    writer.start = lambda: None  # keep the background thread out of the test
+    entries = [_entry() for _ in range(3)]
+
+    for entry in entries:
+        writer.submit(entry)
+    writer.flush()
+
+    assert FakeSession.batches == [entries[1:]]
+    assert writer.metrics()["dropped"] == 1
+
+def test_audit_writer_write_through_on_overflow():
+    """Test that write_through never loses entries when the buffer is full"""
+    FakeSession.batches = []
+    writer = AuditWriter(max_queue_size=1, batch_size=10, flush_interval=60,
+                         overflow_policy="write_through", session_factory=FakeSession)
+    writer.start = lambda: None
+    first, second = _entry(), _entry()
+
+    writer.submit(first)
+    writer.submit(second)
+    writer.flush()
+
+    assert FakeSession.batches == [[second], [first]]
+    assert writer.metrics()["dropped"] == 0
+
+def test_audit_entries_are_stamped_in_utc(monkeypatch):
+    """Test buffered and durable entries carry an aware UTC created_at, so a non-UTC server does not shift them"""
+    writer = MagicMock()
+    monkeypatch.setattr(audit, "audit_writer", writer)
+    db = MagicMock()
+    user = SimpleNamespace(id=uuid4())
+
+    AuditLogger.log_action(db, user, "view", "medical_record", str(uuid4()))
+    AuditLogger.log_action(db, user, "update", "medical_record", str(uuid4()), durable=True)
+
+    assert writer.submit.call_args[0][0]["created_at"].utcoffset().total_seconds() == 0
+    assert db.add.call_args[0][0].created_at.utcoffset().total_seconds() == 0
@@ -0,0 +1,57 @@
+from datetime import datetime, timezone
+from unittest.mock import MagicMock
+
+from app.services.audit_log_service import AuditLogService, _add_months, _month_start
+
+CURRENT = _month_start(datetime.now(timezone.utc).date())
+
+def _partition(month):
+    return f"audit_logs_y{month:%Y}m{month:%m}"
+
+def _statements(db):
+    return [str(call[0][0]) for call in db.execute.call_args_list]
+
+def test_ensure_partitions_creates_missing_months_out_of_the_default_partition():
+    """Test only missing months are created, each taking its rows from the default partition before attaching"""
+    db = MagicMock()
+    service = AuditLogService(db)
+    service.list_partitions = lambda: ["audit_logs_default", _partition(CURRENT)]
+    next_month = _add_months(CURRENT, 1)
+
+    assert service.ensure_partitions(months_ahead=1) == [_partition(next_month)]
+    statements = _statements(db)
+    assert statements[0] == 'CREATE TABLE IF NOT EXISTS "audit_logs_default" PARTITION OF audit_logs DEFAULT'
+    assert statements[1] == 'LOCK TABLE "audit_logs_default" IN EXCLUSIVE MODE'
+    assert statements[2].startswith(f'CREATE TABLE "{_partition(next_month)}" (LIKE audit_logs')
+    assert statements[3].startswith('WITH moved AS (DELETE FROM "audit_logs_default"')
+    assert f"created_at >= '{next_month} 00:00:00+00'" in statements[3]
+    assert statements[4] == (
+        f"ALTER TABLE audit_logs ATTACH PARTITION \"{_partition(next_month)}\" "
+        f"FOR VALUES FROM ('{next_month} 00:00:00+00') TO ('{_add_months(next_month, 1)} 00:00:00+00')"
+    )
+    assert len(statements) == 5
+
+def test_archive_partitions_only_takes_months_past_retention(tmp_path):
+    """Test expired monthly partitions are detached, exported and dropped, and the default one is kept"""
+    db = MagicMock()
+    service = AuditLogService(db)
+    expired, kept = _add_months(CURRENT, -4), _add_months(CURRENT, -2)
+    service.list_partitions = lambda: ["audit_logs_default", _partition(expired), _partition(kept)]
+    service._export_partition = MagicMock(return_value=tmp_path / "archive.csv.gz")
+
+    assert service.archive_partitions(retention_months=3, archive_dir=str(tmp_path)) == [_partition(expired)]
+    assert _statements(db) == [
+        f'ALTER TABLE audit_logs DETACH PARTITION "{_partition(expired)}"',
+        f'DROP TABLE "{_partition(expired)}"',
+    ]
+    service._export_partition.assert_called_once_with(_partition(expired), tmp_path)
+
+def test_get_history_accepts_naive_bounds_as_utc():
+    """Test a naive start_date is compared and queried as UTC instead of failing against the aware default"""
+    db = MagicMock()
+    db.execute.return_value.scalars.return_value.all.return_value = []
+    result = AuditLogService(db).get_history(start_date=datetime(2024, 1, 1))
+    assert result == {"items": [], "next_cursor": None}
+    bounds = [value for value in db.execute.call_args[0][0].compile().params.values() if isinstance(value, datetime)]
+    assert datetime(2024, 1, 1, tzinfo=timezone.utc) in bounds
+    assert all(value.tzinfo is not None for value in bounds)
@@ -0,0 +1,103 @@
+import hashlib
+
+import pytest
+
+from app.core.blob_store import BlobStore, BlobTooLarge, parse_range
+
+def _upload(store, data, chunk=4):
+    writer = store.writer(max_bytes=1024)
+    for i in range(0, len(data), chunk):
+        writer.write(data[i:i + chunk])
+    return writer.commit(), writer.size
+
+def test_identical_uploads_are_stored_once(tmp_path):
+    """Test content addressing deduplicates identical files"""
+    store = BlobStore(root=str(tmp_path), chunk_size=3)
+    first, size = _upload(store, b"lab results")
+    second, _ = _upload(store, b"lab results")
+
+    assert first == second == hashlib.sha256(b"lab results").hexdigest()
+    assert size == 11
+    assert len([p for p in tmp_path.rglob("*") if p.is_file()]) == 1
+    assert b"".join(store.iter_range(first)) == b"lab results"
+    assert b"".join(store.iter_range(first, 4, 6)) == b"res"
+
+def test_oversized_upload_is_rejected_and_cleaned_up(tmp_path):
+    """Test the size limit is enforced while streaming"""
+    store = BlobStore(root=str(tmp_path))
+    writer = store.writer(max_bytes=5)
+    with pytest.raises(BlobTooLarge):
+        writer.write(b"123456")
+    writer.abort()
+    assert not [p for p in tmp_path.rglob("*") if p.is_file()]
+
+def test_parse_range():
+    """Test single byte-range parsing"""
+    assert parse_range(None, 100) is None
+    assert parse_range("bytes=0-9", 100) == (0, 9)
+    assert parse_range("bytes=90-", 100) == (90, 99)
+    assert parse_range("bytes=-10", 100) == (90, 99)
+    assert parse_range("bytes=50-500", 100) == (50, 99)
+    assert parse_range("bytes=0-1,5-6", 100) is None
+    with pytest.raises(ValueError):
+        parse_range("bytes=100-", 100)
+
+def _locked_digest(statement):
+    """The digest an advisory lock statement is for, or None for other statements."""
+    sql = str(statement)
+    if "pg_advisory_xact_lock" not in sql:
+        return None
+    return statement.compile().params["hashtext_1"]
+
+def test_release_locks_every_digest_before_checking_references(monkeypatch, tmp_path):
+    """Test unreferenced files are removed only after their digests are locked, in a fixed order"""
+    from unittest.mock import MagicMock
+    from app.services import medical_record_attachment_service as service
+
+    store = BlobStore(root=str(tmp_path))
+    kept, released = _upload(store, b"still attached")[0], _upload(store, b"orphaned")[0]
+    monkeypatch.setattr(service, "blob_store", store)
+    order = []
+
+    def execute(statement):
+        digest = _locked_digest(statement)
+        order.append(("lock", digest) if digest else ("references",))
+        result = MagicMock()
+        result.scalars.return_value = iter([kept])
+        return result
+
+    db = MagicMock()
+    db.execute.side_effect = execute
+    service.MedicalRecordAttachmentService.release_blobs(db, [released, kept])
+    assert order == [("lock", min(kept, released)), ("lock", max(kept, released)), ("references",)]
+    assert store.path(kept).exists() and not store.path(released).exists()
+    db.commit.assert_called_once()
+
+def test_upload_is_put_in_place_under_the_digest_lock(monkeypatch, tmp_path):
+    """Test the file only appears once its digest is locked, so a release waiting on the lock sees the new row"""
+    from types import SimpleNamespace
+    from unittest.mock import MagicMock
+    from app.services import medical_record_attachment_service as service
+
+    store = BlobStore(root=str(tmp_path))
+    writer = store.writer(max_bytes=1024)
+    writer.write(b"scan")
+    digest = hashlib.sha256(b"scan").hexdigest()
+    locked = []
+
+    def execute(statement):
+        if _locked_digest(statement):
+            locked.append(store.path(digest).exists())
+        return MagicMock()
+
+    db = MagicMock()
+    db.execute.side_effect = execute
+    attachments = service.MedicalRecordAttachmentService(db)
+    monkeypatch.setattr(attachments, "check_can_attach", lambda record_id, user: None)
+    monkeypatch.setattr(attachments, "_format_attachment", lambda attachment: {"sha256": attachment.sha256})
+    monkeypatch.setattr(service.AuditLogger, "log_action", MagicMock())
+
+    result = attachments.create("r1", "scan.png", "image/png", writer, SimpleNamespace(id="u1"))
+    assert result == {"sha256": digest}
+    assert locked == [False] and store.path(digest).exists()
+    db.commit.assert_called_once()
@@ -0,0 +1,55 @@
+from datetime import date, datetime, time, timezone
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+from uuid import uuid4
+
+from sqlalchemy.dialects import postgresql
+
+from app.services.appointment_service import AppointmentService
+
+def _schedule(day_of_week, opens, closes, time_zone, is_available=True):
+    return SimpleNamespace(kind="schedule", day_of_week=day_of_week, opens=opens, closes=closes,
+                           is_available=is_available, time_zone=time_zone)
+
+def _booking(start, end, status="scheduled"):
+    return SimpleNamespace(kind="booking", start_time=start, end_time=end, status=status)
+
+def _calendar(rows, start_date, days):
+    db = MagicMock()
+    db.execute.return_value.all.return_value = rows
+    calendar = AppointmentService(db, MagicMock()).get_doctor_calendar(str(uuid4()), start_date, days)
+    return calendar["days"], db
+
+def test_day_view_splits_working_hours_into_booked_and_free():
+    """Test free gaps are the working hours minus bookings, in the location's time zone"""
+    days, db = _calendar([
+        _schedule(0, time(9), time(17), "Africa/Nairobi"),
+        _booking(datetime(2030, 1, 7, 7, 0, tzinfo=timezone.utc), datetime(2030, 1, 7, 7, 30, tzinfo=timezone.utc)),
+        _booking(datetime(2030, 1, 8, 7, 0, tzinfo=timezone.utc), datetime(2030, 1, 8, 7, 30, tzinfo=timezone.utc)),
+    ], date(2030, 1, 7), 1)
+    assert db.execute.call_count == 1
+    [day] = days
+    assert day["working_hours"] == {"start_time": "2030-01-07T09:00:00+03:00", "end_time": "2030-01-07T17:00:00+03:00"}
+    assert [block["start_time"] for block in day["booked"]] == ["2030-01-07T10:00:00+03:00"]
+    assert day["free"] == [
+        {"start_time": "2030-01-07T09:00:00+03:00", "end_time": "2030-01-07T10:00:00+03:00"},
+        {"start_time": "2030-01-07T10:30:00+03:00", "end_time": "2030-01-07T17:00:00+03:00"},
+    ]
+
+def test_days_off_have_bookings_but_no_free_time():
+    """Test a day without an available schedule still shows what is booked on it"""
+    days, _ = _calendar([
+        _schedule(1, time(9), time(17), "UTC", is_available=False),
+        _booking(datetime(2030, 1, 8, 12, 0, tzinfo=timezone.utc), datetime(2030, 1, 8, 13, 0, tzinfo=timezone.utc)),
+    ], date(2030, 1, 7), 2)
+    assert [day["date"] for day in days] == ["2030-01-07", "2030-01-08"]
+    assert days[1]["working_hours"] is None and days[1]["free"] == []
+    assert len(days[1]["booked"]) == 1
+
+def test_bookings_are_read_from_the_covering_index_columns():
+    """Test the booking half of the query needs nothing outside idx_appointments_doctor_start"""
+    _, db = _calendar([], date(2030, 1, 7), 7)
+    sql = str(db.execute.call_args[0][0].compile(dialect=postgresql.dialect()))
+    bookings = sql.split("UNION ALL")[1]
+    columns = {part.split()[0].rstrip(",") for part in bookings.split("appointments.")[1:]}
+    assert columns <= {"doctor_id", "start_time", "end_time", "status"}
@@ -0,0 +1,67 @@
+from unittest.mock import MagicMock
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
+
+from app.core.concurrency import etag, parse_if_match, precondition_failed
+
+def test_if_match_round_trips_etag():
+    """Test the ETag we send is the version we get back"""
+    assert parse_if_match(etag(7)) == 7
+    assert parse_if_match(f" {etag(12)} ") == 12
+
+def test_if_match_absent_or_star_is_unconditional():
+    """Test writes without a precondition are not version checked"""
+    assert parse_if_match(None) is None
+    assert parse_if_match("*") is None
+
+@pytest.mark.parametrize("header", ['W/"3"', '"3", "4"', "3", '"abc"'])
+def test_if_match_that_cannot_match_fails_precondition(header):
+    """Test weak tags, lists and junk are a 412, never a silent overwrite"""
+    with pytest.raises(HTTPException) as error:
+        parse_if_match(header)
+    assert error.value.status_code == 412
+
+def test_precondition_failed_carries_current_etag():
+    """Test the 412 tells the client which version to reload"""
+    error = precondition_failed(5)
+    assert error.status_code == 412
+    assert error.headers == {"ETag": '"5"'}
+
+def test_appointment_swap_is_a_single_guarded_update():
+    """Test the write is UPDATE ... WHERE id AND version ... RETURNING"""
+    from app.services.appointment_service import AppointmentService
+    db = MagicMock()
+    AppointmentService(db, MagicMock())._swap(uuid4(), {"notes": "Bring scans"}, 3)
+    sql = str(db.execute.call_args[0][0].compile(dialect=postgresql.dialect()))
+    assert sql.startswith("UPDATE appointments SET")
+    assert "version=(appointments.version +" in sql
+    assert "appointments.version = " in sql
+    assert "RETURNING" in sql
+    assert db.execute.call_count == 1
+
+@pytest.mark.parametrize("constraint, code", [("uq_medical_record_revisions_version", 412), ("audit_logs_created_at_check", None)])
+def test_record_update_only_reports_revision_conflicts_as_stale(monkeypatch, constraint, code):
+    """Test a concurrent revision is a 412, and other integrity errors are not disguised as one"""
+    from types import SimpleNamespace
+    from sqlalchemy.exc import IntegrityError
+    from app.schemas.medical_record import MedicalRecordUpdate
+    from app.services import medical_record_service
+    monkeypatch.setattr(medical_record_service.MedicalRecordPermissions, "can_update_record", lambda user, record: True)
+    monkeypatch.setattr(medical_record_service.AuditLogger, "log_medical_record_access", MagicMock())
+    db = MagicMock()
+    db.query.return_value.filter.return_value.first.return_value = SimpleNamespace(
+        id=uuid4(), current_version=1, diagnosis="Flu", prescription=None, notes=None
+    )
+    error = IntegrityError("INSERT", {}, SimpleNamespace(diag=SimpleNamespace(constraint_name=constraint)))
+    db.commit.side_effect = error
+    service = medical_record_service.MedicalRecordService(db)
+    with pytest.raises((HTTPException, IntegrityError)) as raised:
+        service.update(str(uuid4()), MedicalRecordUpdate(diagnosis="Cold"), SimpleNamespace(id=uuid4()))
+    if code:
+        assert raised.value.status_code == code
+    else:
+        assert raised.value is error
+    db.rollback.assert_called_once()
@@ -0,0 +1,177 @@
+from unittest.mock import MagicMock
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
+
+from app.db.dml import update_returning
+from app.db.models.patient import Patient
+
+def _sql(db):
+    return str(db.execute.call_args[0][0].compile(dialect=postgresql.dialect()))
+
+def test_update_is_one_statement_returning_the_row():
+    """Test an update is a single UPDATE ... RETURNING, not SELECT then UPDATE"""
+    db = MagicMock()
+    update_returning(db, Patient, uuid4(), {"phone": "555-0100", "not_a_column": 1})
+    sql = _sql(db)
+    assert db.execute.call_count == 1
+    assert sql.startswith("UPDATE patients SET phone=")
+    assert "not_a_column" not in sql
+    assert "RETURNING patients.id" in sql
+
+def test_update_without_values_only_reads():
+    """Test an empty update does not write (or bump updated_at)"""
+    db = MagicMock()
+    update_returning(db, Patient, uuid4(), {})
+    assert _sql(db).startswith("SELECT")
+
+def test_schedule_update_returns_the_new_locations_time_zone():
+    """Test the response's time zone comes back in the same statement"""
+    from app.services.doctor_schedule_service import DoctorScheduleService
+    db = MagicMock()
+    db.execute.return_value.first.return_value = None
+    assert DoctorScheduleService(db).update(str(uuid4()), {"is_available": False}) is None
+    sql = _sql(db)
+    assert db.execute.call_count == 1
+    assert "(SELECT locations.time_zone" in sql and "AS location_time_zone" in sql
+
+@pytest.mark.parametrize("current, expected_version, code", [("completed", None, 409), ("scheduled", 2, 412)])
+def test_failed_transition_says_why(current, expected_version, code):
+    """Test a transition that matched nothing is a conflict or a stale version"""
+    from app.services.appointment_service import AppointmentService
+    db = MagicMock()
+    swap, explain = MagicMock(), MagicMock()
+    swap.first.return_value = None
+    explain.first.return_value = MagicMock(version=3, status=current)
+    db.execute.side_effect = [swap, explain]
+    with pytest.raises(HTTPException) as error:
+        AppointmentService(db, MagicMock()).transition(str(uuid4()), "confirmed", expected_version)
+    assert error.value.status_code == code
+    assert "appointments.status IN" in str(db.execute.call_args_list[0][0][0].compile(dialect=postgresql.dialect()))
+    db.commit.assert_not_called()
+
+def test_bulk_transition_is_one_update_and_reports_every_id():
+    """Test a bulk cancel is a single UPDATE and skipped ids say why"""
+    from app.services.appointment_service import AppointmentService
+    updated_id, conflict_id, missing_id = uuid4(), uuid4(), uuid4()
+    row = MagicMock(id=updated_id, status="completed", version=2)
+    db = MagicMock()
+    bulk_update, explain = MagicMock(), MagicMock()
+    bulk_update.all.return_value = [row]
+    explain.__iter__.return_value = iter([MagicMock(id=conflict_id, status="cancelled", version=4)])
+    db.execute.side_effect = [bulk_update, explain]
+    service = AppointmentService(db, MagicMock())
+    service._format_appointment = lambda row: {"doctor_id": "d", "patient_id": "p"}
+
+    results = service.bulk_transition("completed", appointment_ids=[updated_id, conflict_id, missing_id])
+
+    assert [result["outcome"] for result in results] == ["updated", "conflict", "not_found"]
+    assert results[1]["status"] == "cancelled"
+    sql = str(db.execute.call_args_list[0][0][0].compile(dialect=postgresql.dialect()))
+    assert sql.startswith("UPDATE appointments SET status=") and "appointments.status IN" in sql
+    db.commit.assert_called_once()
+
+@pytest.mark.parametrize("start, end", [
+    ("2026-03-02T09:00:00+00:00", "2026-03-03T09:00:00"),
+    ("2026-03-02T09:00:00", "2026-03-03T09:00:00Z"),
+])
+def test_bulk_selection_rejects_mixing_naive_and_aware_bounds(start, end):
+    """Test a naive bound next to an aware one is a validation error, not a TypeError when comparing them"""
+    from pydantic import ValidationError
+    from app.schemas.appointment import AppointmentBulkTransition
+    with pytest.raises(ValidationError, match="both include a timezone offset or both omit it"):
+        AppointmentBulkTransition(status="cancelled", doctor_id=uuid4(), start=start, end=end)
+    for bounds in (("2026-03-02T09:00:00+01:00", "2026-03-03T09:00:00Z"), ("2026-03-02T09:00:00", "2026-03-03T09:00:00")):
+        AppointmentBulkTransition(status="cancelled", doctor_id=uuid4(), start=bounds[0], end=bounds[1])
+
+def test_transition_limited_to_an_owner_treats_other_appointments_as_missing():
+    """Test the owner check is part of the guarded UPDATE, and a miss on someone else's appointment is a 404"""
+    from app.services.appointment_service import AppointmentService
+    doctor_id = uuid4()
+    db = MagicMock()
+    swap, explain = MagicMock(), MagicMock()
+    swap.first.return_value = None
+    explain.first.return_value = None
+    db.execute.side_effect = [swap, explain]
+    assert AppointmentService(db, MagicMock()).transition(str(uuid4()), "completed", only_doctor_id=doctor_id) is None
+    for call in db.execute.call_args_list:
+        assert "appointments.doctor_id = " in str(call[0][0].compile(dialect=postgresql.dialect()))
+
+@pytest.mark.parametrize("role, action, allowed, owner", [
+    ("patient", "complete", False, None),
+    ("patient", "confirm", False, None),
+    ("patient", "cancel", True, "only_patient_id"),
+    ("doctor", "complete", True, "only_doctor_id"),
+    ("staff", "cancel", True, None),
+])
+def test_single_transitions_apply_role_and_ownership_rules(monkeypatch, role, action, allowed, owner):
+    """Test patients may only cancel their own appointments and doctors only move their own"""
+    from types import SimpleNamespace
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from app.api import deps
+    from app.api.v1.endpoints import appointments
+
+    user = SimpleNamespace(id=uuid4(), role=role, doctor_id=uuid4() if role == "doctor" else None,
+                           patient_id=uuid4() if role == "patient" else None)
+    calls = []
+
+    def transition(self, appointment_id, new_status, expected_version=None, **kwargs):
+        calls.append(kwargs)
+        return None
+
+    monkeypatch.setattr(appointments.AppointmentService, "transition", transition)
+    app = FastAPI()
+    app.include_router(appointments.router, prefix="/appointments")
+    app.dependency_overrides[deps.get_db] = lambda: MagicMock()
+    app.dependency_overrides[deps.get_current_user] = lambda: user
+
+    response = TestClient(app).post(f"/appointments/{uuid4()}/{action}")
+    # 404 is the stubbed service finding nothing, i.e. the request got past the role check
+    assert response.status_code == (404 if allowed else 403)
+    if allowed:
+        assert calls == [{} if owner is None else {owner: getattr(user, owner.replace("only_", ""))}]
+    else:
+        assert calls == []
+
+def test_rescheduling_moves_the_resource_bookings_after_locking_and_checking_them():
+    """Test the bookings are locked in id order, checked against other appointments only, then moved"""
+    from datetime import datetime, timezone
+    from app.services.resource_service import ResourceService
+    appointment_id, room_id = uuid4(), uuid4()
+    start, end = datetime(2026, 3, 2, 9, tzinfo=timezone.utc), datetime(2026, 3, 2, 10, tzinfo=timezone.utc)
+    db = MagicMock()
+    held, locked, conflict, moved = MagicMock(), MagicMock(), MagicMock(), MagicMock()
+    held.scalars.return_value.all.return_value = [room_id]
+    locked.scalars.return_value.all.return_value = [MagicMock(id=room_id)]
+    conflict.first.return_value = None
+    db.execute.side_effect = [held, locked, conflict, moved]
+
+    ResourceService(db).move_bookings(appointment_id, start, end)
+
+    lock_sql, check_sql, move_sql = [
+        str(call[0][0].compile(dialect=postgresql.dialect())) for call in db.execute.call_args_list[1:]
+    ]
+    assert "ORDER BY resources.id" in lock_sql and lock_sql.endswith("FOR UPDATE")
+    assert "resource_bookings.appointment_id != " in check_sql and "appointments.status != " in check_sql
+    assert move_sql.startswith("UPDATE resource_bookings SET start_time=")
+
+def test_rescheduling_onto_a_booked_resource_fails_without_moving():
+    """Test a resource already held at the new time refuses the move"""
+    from datetime import datetime, timezone
+    from app.services.resource_service import ResourceService
+    room_id = uuid4()
+    start = datetime(2026, 3, 2, 9, tzinfo=timezone.utc)
+    db = MagicMock()
+    held, locked, conflict = MagicMock(), MagicMock(), MagicMock()
+    held.scalars.return_value.all.return_value = [room_id]
+    locked.scalars.return_value.all.return_value = [MagicMock(id=room_id)]
+    locked.scalars.return_value.all.return_value[0].name = "Room 1"
+    conflict.first.return_value = MagicMock(resource_id=room_id, start_time=start, end_time=start)
+    db.execute.side_effect = [held, locked, conflict]
+
+    with pytest.raises(ValueError, match="Room 1 is already booked"):
+        ResourceService(db).move_bookings(uuid4(), start, start)
+    assert db.execute.call_count == 3
@@ -0,0 +1,48 @@
+import pytest
+
+from app.core.events import EventHub, build_event
+
+@pytest.mark.asyncio
+async def test_event_hub_fans_out_by_channel():
+    """Test that events reach subscribers of any matching channel, once each"""
+    hub = EventHub(max_queue_size=10)
+    doctor_sub = hub.subscribe(["doctor:1"])
+    patient_sub = hub.subscribe(["patient:2", "doctor:1"])
+    other_sub = hub.subscribe(["doctor:3"])
+
+    delivered = hub.dispatch(build_event("appointment.created", ["doctor:1", "patient:2"], {"id": "a"}))
+
+    assert delivered == 2
+    assert (await doctor_sub.get(timeout=0.1))["type"] == "appointment.created"
+    assert (await patient_sub.get(timeout=0.1))["data"] == {"id": "a"}
+    assert patient_sub.queue.empty()
+    assert await other_sub.get(timeout=0.01) is None
+
+@pytest.mark.asyncio
+async def test_slow_subscriber_drops_oldest_and_is_marked_lagged():
+    """Test per-connection backpressure never blocks the publisher"""
+    hub = EventHub(max_queue_size=2)
+    subscription = hub.subscribe(["user:1"])
+
+    for i in range(5):
+        hub.dispatch(build_event("notification.created", ["user:1"], {"n": i}))
+
+    assert subscription.lagged is True
+    assert subscription.dropped == 3
+    assert (await subscription.get(timeout=0.1))["data"] == {"n": 3}
+    assert (await subscription.get(timeout=0.1))["data"] == {"n": 4}
+
+def test_unsubscribe_removes_empty_channels():
+    """Test that closed connections are released from the hub"""
+    hub = EventHub()
+    subscription = hub.subscribe(["user:1", "doctor:1"])
+    assert hub.connection_count == 1
+
+    hub.unsubscribe(subscription)
+
+    assert hub.connection_count == 0
+    assert hub.dispatch(build_event("notification.created", ["user:1"], {})) == 0
+
+def test_events_carry_an_explicit_utc_timestamp():
+    """Test sent_at is ISO 8601 with a UTC offset, so clients do not read it as local time"""
+    assert build_event("notification.created", ["user:1"], {})["sent_at"].endswith("+00:00")
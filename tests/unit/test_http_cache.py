@@ -0,0 +1,121 @@
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.events import publish_event
+from app.core.http_cache import (
+    SHORT_LIVED, ConditionalGet, HTTPCache, ResponseCache, if_none_match, response_cache, weak_etag
+)
+
+def _app(loads):
+    app = FastAPI()
+
+    @app.get("/doctors/{doctor_id}")
+    def read(doctor_id: str, conditional: ConditionalGet = Depends(HTTPCache(SHORT_LIVED))):
+        def load():
+            loads.append(doctor_id)
+            return {"id": doctor_id}, (doctor_id, "2030-01-07T09:00:00")
+        return conditional.respond("user:1", [f"doctor:{doctor_id}"], load)
+
+    return TestClient(app)
+
+def test_if_none_match_compares_weakly():
+    """Test a matching tag in a list, with or without W/, is a match"""
+    tag = weak_etag(1, "a")
+    assert if_none_match(tag, tag)
+    assert if_none_match(f'"other", {tag.removeprefix("W/")}', tag)
+    assert if_none_match("*", tag)
+    assert not if_none_match(None, tag)
+    assert not if_none_match(weak_etag(2, "a"), tag)
+
+def test_matching_etag_is_304_without_a_body():
+    """Test revalidation returns 304 and the same ETag and policy"""
+    client = _app([])
+    first = client.get("/doctors/d1")
+    assert first.status_code == 200
+    assert first.headers["Cache-Control"] == SHORT_LIVED
+    second = client.get("/doctors/d1", headers={"If-None-Match": first.headers["ETag"]})
+    assert second.status_code == 304
+    assert second.content == b""
+    assert second.headers["ETag"] == first.headers["ETag"]
+
+def test_response_cache_skips_the_load_until_invalidated(monkeypatch):
+    """Test cached data is served until an event on its channel is published"""
+    monkeypatch.setattr("app.core.http_cache.settings.RESPONSE_CACHE_ENABLED", True)
+    response_cache.clear()
+    loads = []
+    client = _app(loads)
+    client.get("/doctors/d1")
+    client.get("/doctors/d1")
+    client.get("/doctors/d2")
+    assert loads == ["d1", "d2"]
+
+    publish_event("appointment.updated", ["doctor:d1"], {})
+    client.get("/doctors/d1")
+    client.get("/doctors/d2")
+    assert loads == ["d1", "d2", "d1"]
+    response_cache.clear()
+
+def test_data_loaded_before_an_invalidation_is_not_cached(monkeypatch):
+    """Test a write invalidating the channel while a load runs keeps the stale data out of the cache"""
+    monkeypatch.setattr("app.core.http_cache.settings.RESPONSE_CACHE_ENABLED", True)
+    response_cache.clear()
+
+    class WriteDuringLoad(list):
+        def append(self, doctor_id):
+            super().append(doctor_id)
+            if len(self) == 1:
+                response_cache.invalidate([f"doctor:{doctor_id}"])
+
+    loads = WriteDuringLoad()
+    client = _app(loads)
+    client.get("/doctors/d1")
+    client.get("/doctors/d1")
+    client.get("/doctors/d1")
+    assert loads == ["d1", "d1"]
+    response_cache.clear()
+
+def test_response_cache_expires_and_stays_bounded():
+    """Test entries expire after the TTL and the oldest are evicted when full"""
+    cache = ResponseCache(ttl_seconds=0, max_entries=2)
+    cache.set(("a",), "t", 1, ["doctor:1"])
+    assert cache.get(("a",)) is None
+
+    cache = ResponseCache(ttl_seconds=60, max_entries=2)
+    for key in "abc":
+        cache.set((key,), "t", key, ["doctor:1"])
+    assert len(cache) == 2 and cache.get(("a",)) is None
+    cache.invalidate(["doctor:1"])
+    assert len(cache) == 0
+
+def test_doctor_profile_and_schedules_revalidate_through_the_app(monkeypatch):
+    """Test the mounted /profiles/doctor and /doctor-schedules/ routes answer 200 with an ETag, then 304"""
+    from types import SimpleNamespace
+    from unittest.mock import MagicMock
+    from uuid import uuid4
+    from app.api import deps
+    from app.main import app
+    from app.services.doctor_schedule_service import DoctorScheduleService
+    from app.services.doctor_service import DoctorService
+
+    doctor_id = str(uuid4())
+    doctor = {
+        "id": doctor_id, "first_name": "Ada", "last_name": "Lane", "specialization": "Cardiology",
+        "email": "ada@example.com", "phone": "555-0100", "license_number": "L-1",
+        "created_at": "2030-01-01T09:00:00+00:00", "updated_at": "2030-01-02T09:00:00+00:00"
+    }
+    schedule = {
+        "id": str(uuid4()), "doctor_id": doctor_id, "day_of_week": 0, "start_time": "09:00:00",
+        "end_time": "17:00:00", "is_available": True, "location_id": None, "time_zone": "UTC"
+    }
+    monkeypatch.setattr(DoctorService, "get_by_user_id", lambda self, user_id: doctor)
+    monkeypatch.setattr(DoctorScheduleService, "list_by_doctor", lambda self, doctor_id: [schedule])
+    user = SimpleNamespace(id=uuid4(), role="doctor", doctor_id=doctor_id, patient_id=None)
+    monkeypatch.setitem(app.dependency_overrides, deps.get_db, lambda: MagicMock())
+    monkeypatch.setitem(app.dependency_overrides, deps.get_current_user, lambda: user)
+
+    client = TestClient(app)
+    for path in ("/api/v1/profiles/doctor", "/api/v1/doctor-schedules/"):
+        first = client.get(path)
+        assert first.status_code == 200 and first.headers["ETag"].startswith('W/"')
+        second = client.get(path, headers={"If-None-Match": first.headers["ETag"]})
+        assert second.status_code == 304 and second.headers["ETag"] == first.headers["ETag"]
@@ -0,0 +1,156 @@
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.dialects import postgresql
+from starlette.responses import JSONResponse
+from unittest.mock import MagicMock
+
+from app.core.idempotency import IdempotencyMiddleware, IdempotencyStore, request_fingerprint
+from app.core.security import create_access_token
+
+class FakeStore:
+    """The idempotency_keys table as a dict, with the claim rules of IdempotencyStore."""
+
+    def __init__(self):
+        self.rows = {}
+
+    def claim(self, owner, key, fingerprint):
+        row = self.rows.get((owner, key))
+        if row is None:
+            self.rows[(owner, key)] = SimpleNamespace(fingerprint=fingerprint, status_code=None,
+                                                      headers=None, body=None)
+            return True, None
+        return False, row
+
+    def complete(self, owner, key, fingerprint, status_code, headers, body):
+        self.rows[(owner, key)] = SimpleNamespace(fingerprint=fingerprint, status_code=status_code,
+                                                  headers=headers, body=body)
+
+    def release(self, owner, key, fingerprint):
+        self.rows.pop((owner, key), None)
+
+    def purge_expired(self):
+        return 0
+
+def _app(store, calls, gate=None, wait_seconds=5):
+    app = FastAPI()
+
+    @app.post("/api/v1/appointments/")
+    async def create(payload: dict):
+        calls.append(payload)
+        if gate is not None:
+            await gate.wait()
+        if payload.get("fail"):
+            return JSONResponse({"detail": "boom"}, status_code=500)
+        response = JSONResponse({"id": len(calls), **payload}, status_code=201,
+                                headers={"ETag": f'"{len(calls)}"', "Location": f"/api/v1/appointments/{len(calls)}"})
+        response.set_cookie("db_lsn", "0/200")
+        return response
+
+    if store is not None:
+        app.add_middleware(IdempotencyMiddleware, store=store, wait_seconds=wait_seconds)
+    return app
+
+def test_retry_is_answered_from_the_stored_response():
+    """Test a repeated key replays the first response without running the endpoint again"""
+    calls = []
+    client = TestClient(_app(FakeStore(), calls))
+    headers = {"Idempotency-Key": "k1"}
+    first = client.post("/api/v1/appointments/", json={"slot": 1}, headers=headers)
+    second = client.post("/api/v1/appointments/", json={"slot": 1}, headers=headers)
+    assert len(calls) == 1
+    assert second.status_code == first.status_code == 201
+    assert second.json() == first.json() == {"id": 1, "slot": 1}
+    assert second.headers["Idempotent-Replayed"] == "true"
+    assert "Idempotent-Replayed" not in first.headers
+    for header in ("content-type", "content-length", "etag", "location", "set-cookie"):
+        assert second.headers[header] == first.headers[header]
+
+def test_key_reused_for_a_different_request_is_rejected():
+    """Test the same key with another body is a 422, and requests without a key are untouched"""
+    calls = []
+    client = TestClient(_app(FakeStore(), calls))
+    client.post("/api/v1/appointments/", json={"slot": 1}, headers={"Idempotency-Key": "k1"})
+    response = client.post("/api/v1/appointments/", json={"slot": 2}, headers={"Idempotency-Key": "k1"})
+    assert response.status_code == 422
+    client.post("/api/v1/appointments/", json={"slot": 1})
+    client.post("/api/v1/appointments/", json={"slot": 1})
+    assert len(calls) == 3
+
+def test_server_errors_are_not_stored():
+    """Test a retry after a 5xx runs the endpoint again"""
+    calls = []
+    store = FakeStore()
+    client = TestClient(_app(store, calls))
+    for _ in range(2):
+        response = client.post("/api/v1/appointments/", json={"fail": True}, headers={"Idempotency-Key": "k1"})
+        assert response.status_code == 500
+    assert len(calls) == 2 and store.rows == {}
+
+def test_concurrent_duplicate_waits_for_the_first_attempt():
+    """Test a duplicate arriving mid-flight gets the first attempt's response, not a second booking"""
+    async def scenario():
+        calls, gate = [], asyncio.Event()
+        transport = httpx.ASGITransport(app=_app(FakeStore(), calls, gate))
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            def post():
+                return client.post("/api/v1/appointments/", json={"slot": 1}, headers={"Idempotency-Key": "k1"})
+            first = asyncio.create_task(post())
+            await asyncio.sleep(0.05)
+            second = asyncio.create_task(post())
+            await asyncio.sleep(0.05)
+            gate.set()
+            return calls, await first, await second
+
+    calls, first, second = asyncio.run(scenario())
+    assert len(calls) == 1
+    assert first.json() == second.json()
+    assert second.headers["Idempotent-Replayed"] == "true"
+
+def test_unfinished_attempt_gives_409_after_the_wait():
+    """Test a duplicate gives up with 409 and Retry-After if the first attempt does not finish"""
+    body = b'{"slot": 1}'
+    store = FakeStore()
+    store.claim("user:p1", "k1", request_fingerprint("POST", "/api/v1/appointments/", b"", body))
+    client = TestClient(_app(store, [], wait_seconds=0))
+    headers = {"Idempotency-Key": "k1", "Authorization": f"Bearer {create_access_token('p1', 'patient')}"}
+    response = client.post("/api/v1/appointments/", content=body, headers=headers)
+    assert response.status_code == 409
+    assert response.headers["Retry-After"] == "1"
+
+def test_takeover_in_the_same_process_keeps_the_newer_attempt():
+    """Test an attempt finishing after another took its key over leaves the newer attempt's entry alone"""
+    class TakeoverStore(FakeStore):
+        def claim(self, owner, key, fingerprint):
+            # As if the first attempt's lock had gone stale
+            return True, None
+
+    async def scenario():
+        calls, gate = [], asyncio.Event()
+        middleware = IdempotencyMiddleware(_app(None, calls, gate), store=TakeoverStore())
+        transport = httpx.ASGITransport(app=middleware)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            def post():
+                return client.post("/api/v1/appointments/", json={"slot": 1}, headers={"Idempotency-Key": "k1"})
+            first = asyncio.create_task(post())
+            await asyncio.sleep(0.05)
+            second = asyncio.create_task(post())
+            await asyncio.sleep(0.05)
+            gate.set()
+            return middleware, await first, await second
+
+    middleware, first, second = asyncio.run(scenario())
+    assert first.status_code == second.status_code == 201
+    assert middleware._in_flight == {}
+
+def test_claim_only_takes_over_expired_or_abandoned_keys():
+    """Test the upsert's conflict clause is limited to expired rows and stale in-progress ones"""
+    db = MagicMock()
+    db.execute.return_value.first.return_value = ("k1",)
+    assert IdempotencyStore(session_factory=lambda: db).claim("user:1", "k1", "f") == (True, None)
+    sql = str(db.execute.call_args_list[0][0][0].compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT (owner, key) DO UPDATE" in sql
+    assert "WHERE idempotency_keys.expires_at < now() OR idempotency_keys.status_code IS NULL AND idempotency_keys.locked_until < now()" in sql
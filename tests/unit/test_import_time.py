@@ -0,0 +1,75 @@
+import importlib.util
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+SCRIPT = Path(__file__).resolve().parents[2] / "scripts" / "profile_imports.py"
+spec = importlib.util.spec_from_file_location("profile_imports", SCRIPT)
+profile_imports = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(profile_imports)
+
+# Cold import of app.main, with headroom for slower machines; it took
+# about 2 s with every router imported eagerly and 1.3 s without
+IMPORT_BUDGET_MS = 2500
+
+def test_parse_importtime_output():
+    """Test records are read from -X importtime lines, skipping the header"""
+    output = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |     app.core.config\n"
+        "import time:       300 |        420 |   app.main\n"
+    )
+    records = profile_imports.parse_importtime(output)
+    assert [(r.module, r.depth, r.self_us) for r in records] == [("app.core.config", 2, 120), ("app.main", 1, 300)]
+    assert profile_imports.total_ms(records, "app.main") == 0.42
+    assert profile_imports.by_package(records) == {"app": 420}
+
+def test_importing_the_app_loads_no_routers_or_database_driver():
+    """Test endpoint modules and the engine are left for first use"""
+    code = (
+        "import sys, app.main, app.db.session as session;"
+        "print(sorted(m for m in sys.modules if m.startswith('app.api.v1.endpoints.')));"
+        "print('psycopg2' in sys.modules, session._engine is None)"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.split("\n")[:2] == ["[]", "False True"]
+
+# A wall-clock check, so it only runs when asked for: IMPORT_TIME_BUDGET=1, or in CI
+# `python scripts/profile_imports.py app.main --budget-ms 2500` on a quiet runner
+@pytest.mark.skipif(not os.environ.get("IMPORT_TIME_BUDGET"), reason="timing check; set IMPORT_TIME_BUDGET=1 to run")
+def test_import_time_is_within_budget():
+    """Test a cold import of app.main takes less than IMPORT_BUDGET_MS"""
+    records = profile_imports.profile("app.main")
+    assert profile_imports.total_ms(records, "app.main") < IMPORT_BUDGET_MS
+
+def test_lazy_router_loads_on_first_request(tmp_path, monkeypatch):
+    """Test a lazily included module is imported on first use, with the app's dependency overrides"""
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from app.api.lazy import include_lazily, load_routers
+
+    (tmp_path / "lazy_ping.py").write_text(
+        "from fastapi import APIRouter, Depends\n"
+        "router = APIRouter()\n"
+        "def who(): return 'real'\n"
+        "@router.get('/{name}')\n"
+        "def ping(name: str, caller: str = Depends(who)): return {'name': name, 'caller': caller}\n"
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    app = FastAPI()
+    include_lazily(app, "/api", [("/ping", "lazy_ping", ["ping"])])
+    assert "lazy_ping" not in sys.modules
+
+    client = TestClient(app)
+    assert client.get("/api/ping/a").json() == {"name": "a", "caller": "real"}
+    app.dependency_overrides[sys.modules["lazy_ping"].who] = lambda: "override"
+    assert client.get("/api/ping/b").json() == {"name": "b", "caller": "override"}
+    assert client.post("/api/ping/b").status_code == 405
+    assert client.get("/api/other").status_code == 404
+
+    load_routers(app)
+    assert "/api/ping/{name}" in app.openapi()["paths"]
+    assert client.get("/api/ping/c").json()["name"] == "c"
@@ -0,0 +1,36 @@
+from datetime import datetime, timezone
+
+from app.core.intervals import (
+    complement, conflict_interval, intersect, intersect_all, merge, slot_starts, to_epoch
+)
+
+def test_merge_coalesces_overlapping_and_touching():
+    """Test busy intervals are sorted and merged"""
+    assert merge([(50, 60), (0, 10), (10, 20), (15, 30)]) == [(0, 30), (50, 60)]
+
+def test_complement_within_window():
+    """Test free time is the window minus busy time"""
+    assert complement([(0, 10), (20, 30), (90, 120)], (5, 100)) == [(10, 20), (30, 90)]
+    assert complement([], (0, 10)) == [(0, 10)]
+
+def test_intersect_sweeps_sorted_lists():
+    """Test free lists of several calendars intersect"""
+    doctor = [(0, 50), (60, 100)]
+    room = [(10, 70)]
+    scanner = [(0, 20), (40, 65)]
+    assert intersect(doctor, room) == [(10, 50), (60, 70)]
+    assert intersect_all([doctor, room, scanner]) == [(10, 20), (40, 50), (60, 65)]
+
+def test_conflict_interval_matches_inclusive_overlap():
+    """Test back-to-back bookings conflict, as in _check_availability"""
+    start = datetime(2030, 1, 7, 9, 0, tzinfo=timezone.utc)
+    end = datetime(2030, 1, 7, 10, 0, tzinfo=timezone.utc)
+    busy = merge([conflict_interval(start, end)])
+    free = complement(busy, (to_epoch(start) - 3600, to_epoch(end) + 3600))
+    # A 30-minute booking (1801 seconds occupied) cannot start exactly at 10:00
+    assert to_epoch(end) not in slot_starts(free, 1801, 900, origin=to_epoch(start))
+    assert to_epoch(end) + 900 in slot_starts(free, 1801, 900, origin=to_epoch(start))
+
+def test_slot_starts_follow_grid():
+    """Test slots are aligned to the step grid and fit inside free time"""
+    assert slot_starts([(5, 40)], 10, 10, origin=0) == [10, 20, 30]
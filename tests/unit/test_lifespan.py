@@ -0,0 +1,102 @@
+import asyncio
+import logging
+import os
+import signal
+from unittest.mock import AsyncMock, MagicMock
+
+from fastapi.testclient import TestClient
+
+from app.core import lifespan as lifespan_module
+from app.core.events import EventHub
+from app.core.lifespan import install_drain_on_sigterm, readiness
+from app.main import app
+
+def test_closing_the_hub_ends_open_and_new_streams():
+    """Test close() wakes a waiting stream and closes streams subscribed afterwards"""
+    async def scenario():
+        hub = EventHub(max_queue_size=2)
+        subscription = hub.subscribe(["user:1"])
+        waiting = asyncio.create_task(subscription.get(timeout=5))
+        await asyncio.sleep(0.01)
+        hub.close()
+        return await asyncio.wait_for(waiting, 1), subscription, hub.subscribe(["user:2"])
+
+    event, subscription, late = asyncio.run(scenario())
+    assert event is None and subscription.closed and late.closed
+
+def test_lifespan_reports_ready_then_drains_and_closes_resources(monkeypatch):
+    """Test /health/ready is 200 while serving, and shutdown drains before closing the broker and pool"""
+    rabbitmq = MagicMock(declare_topology=AsyncMock(), close=AsyncMock())
+    dispose_engine = MagicMock()
+    monkeypatch.setattr(lifespan_module, "RabbitMQ", rabbitmq)
+    monkeypatch.setattr(lifespan_module, "dispose_engine", dispose_engine)
+    monkeypatch.setattr(lifespan_module, "prewarm_database", MagicMock())
+    monkeypatch.setattr(lifespan_module, "consume_events", AsyncMock())
+    monkeypatch.setattr(lifespan_module, "audit_writer", MagicMock())
+    monkeypatch.setattr(lifespan_module.settings, "REMINDER_SCHEDULER_ENABLED", False)
+    monkeypatch.setattr(lifespan_module, "AuditMaintenanceScheduler", MagicMock(return_value=MagicMock(run_forever=AsyncMock())))
+
+    with TestClient(app) as client:
+        response = client.get("/health/ready")
+        assert response.status_code == 200 and response.json() == {"status": "ready"}
+        rabbitmq.declare_topology.assert_awaited_once_with(exchanges=["events"], queues=["notifications"])
+        readiness.start_draining()
+        assert client.get("/health/ready").status_code == 503
+        assert client.get("/health").status_code == 200
+    assert readiness.status == "draining"
+    rabbitmq.close.assert_awaited_once()
+    dispose_engine.assert_called_once()
+
+def test_sigterm_drains_before_the_loop_signal_handler_runs(monkeypatch):
+    """Test SIGTERM marks the app draining and passes to a handler on the loop after the grace period"""
+    monkeypatch.setattr(readiness, "draining", False)
+    calls = []
+
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        loop.add_signal_handler(signal.SIGTERM, calls.append, "exit")
+        try:
+            assert install_drain_on_sigterm(loop, grace_seconds=0.05)
+            loop._signal_handlers[signal.SIGTERM]._run()
+            assert readiness.draining and calls == []
+            await asyncio.sleep(0.1)
+        finally:
+            loop.remove_signal_handler(signal.SIGTERM)
+
+    asyncio.run(scenario())
+    assert calls == ["exit"]
+
+def test_sigterm_drains_before_a_signal_module_handler_runs(monkeypatch):
+    """Test a handler installed with signal.signal is wrapped the same way, and a real SIGTERM drains first"""
+    monkeypatch.setattr(readiness, "draining", False)
+    calls = []
+    original = signal.signal(signal.SIGTERM, lambda sig, frame: calls.append(sig))
+
+    async def scenario():
+        assert install_drain_on_sigterm(asyncio.get_running_loop(), grace_seconds=0.05)
+        os.kill(os.getpid(), signal.SIGTERM)
+        await asyncio.sleep(0.01)
+        assert readiness.draining and calls == []
+        await asyncio.sleep(0.1)
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        signal.signal(signal.SIGTERM, original)
+    assert calls == [signal.SIGTERM]
+
+def test_startup_warns_when_sigterm_cannot_be_wrapped(monkeypatch, caplog):
+    """Test the app still starts, and says so, when there is no server handler to wrap"""
+    monkeypatch.setattr(lifespan_module, "install_drain_on_sigterm", lambda loop: False)
+    monkeypatch.setattr(lifespan_module.settings, "PREWARM_ON_STARTUP", False)
+    monkeypatch.setattr(lifespan_module, "RabbitMQ", MagicMock(declare_topology=AsyncMock(), close=AsyncMock()))
+    monkeypatch.setattr(lifespan_module, "_start_background_tasks", lambda: {})
+    monkeypatch.setattr(lifespan_module, "_close_resources", AsyncMock())
+
+    async def scenario():
+        async with lifespan_module.lifespan(MagicMock()):
+            return readiness.status
+
+    with caplog.at_level(logging.WARNING, logger="app.core.lifespan"):
+        assert asyncio.run(scenario()) == "ready"
+    assert "Could not wrap the server's SIGTERM handler" in caplog.text
@@ -0,0 +1,45 @@
+from unittest.mock import MagicMock
+from uuid import uuid4
+
+from sqlalchemy.dialects import postgresql
+
+from app.services.notification_service import NotificationService
+
+def _sql(call):
+    return str(call[0][0].compile(dialect=postgresql.dialect()))
+
+def test_increment_is_one_upsert_adding_to_the_counter():
+    """Test new notifications for several users bump their counters in a single INSERT ... ON CONFLICT"""
+    db = MagicMock()
+    NotificationService.increment_unread_counts(db, {"u1": 2, "u2": 1, "u3": 0})
+    sql = _sql(db.execute.call_args)
+    assert db.execute.call_count == 1
+    assert sql.startswith("INSERT INTO notification_counters")
+    assert "ON CONFLICT (user_id) DO UPDATE SET unread_count = (notification_counters.unread_count + excluded.unread_count)" in sql
+    assert len(db.execute.call_args[0][0].compile(dialect=postgresql.dialect()).params) == 4
+
+def test_increment_without_counts_does_not_write():
+    """Test an empty batch issues no statement"""
+    db = MagicMock()
+    NotificationService.increment_unread_counts(db, {"u1": 0})
+    db.execute.assert_not_called()
+
+def test_decrement_subtracts_and_never_goes_below_zero():
+    """Test marking notifications read takes them off the counter, clamped at zero"""
+    db = MagicMock()
+    NotificationService.decrement_unread_count(db, "u1", 3)
+    sql = _sql(db.execute.call_args)
+    assert sql.startswith("UPDATE notification_counters SET unread_count=greatest(notification_counters.unread_count - ")
+    NotificationService.decrement_unread_count(db, "u1", 0)
+    assert db.execute.call_count == 1
+
+def test_mark_all_as_read_decrements_by_the_rows_it_updated():
+    """Test mark_all_as_read subtracts what it marked instead of resetting, so a concurrent new notification still counts"""
+    db = MagicMock()
+    db.execute.return_value.rowcount = 4
+    assert NotificationService(db).mark_all_as_read(str(uuid4())) == 4
+    mark, counter = [_sql(call) for call in db.execute.call_args_list]
+    assert mark.startswith("UPDATE notifications SET is_read=")
+    assert "unread_count=greatest(notification_counters.unread_count - " in counter
+    assert db.execute.call_args_list[1][0][0].compile().params["unread_count_1"] == 4
+    db.commit.assert_called_once()
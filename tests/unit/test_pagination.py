@@ -0,0 +1,22 @@
+import pytest
+from datetime import datetime, timezone
+from uuid import uuid4
+
+from app.core.pagination import encode_cursor, decode_cursor
+
+def test_cursor_round_trip():
+    """Test that a keyset cursor decodes back to its position"""
+    created_at = datetime(2024, 3, 1, 9, 30, tzinfo=timezone.utc)
+    id = str(uuid4())
+
+    assert decode_cursor(encode_cursor(created_at, id)) == (created_at, id)
+
+def test_empty_cursor():
+    """Test that a missing cursor means the first page"""
+    assert decode_cursor(None) is None
+    assert decode_cursor("") is None
+
+def test_invalid_cursor():
+    """Test that a tampered cursor is rejected"""
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
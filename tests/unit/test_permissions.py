@@ -0,0 +1,109 @@
+from types import SimpleNamespace
+
+from app.core.permissions import AssignmentCache, AuthorizationEngine
+
+class FakeAssignmentCache(AssignmentCache):
+    """Serves fixed assignment sets and counts how often they are loaded"""
+    def __init__(self, assignments):
+        super().__init__()
+        self.assignments = assignments
+        self.loads = 0
+
+    def get(self, db, doctor_id):
+        self.loads += 1
+        return frozenset(self.assignments.get(str(doctor_id), ()))
+
+def _user(role, doctor_id=None, patient_id=None):
+    return SimpleNamespace(role=role, doctor_id=doctor_id, patient_id=patient_id)
+
+def _record(doctor_id, patient_id):
+    return SimpleNamespace(doctor_id=doctor_id, patient_id=patient_id)
+
+def test_doctor_sees_own_and_assigned_records_with_one_lookup():
+    """Test batch filtering only loads the doctor's assignment set once"""
+    cache = FakeAssignmentCache({"d1": {"p2"}})
+    engine = AuthorizationEngine(assignments=cache)
+    doctor = _user("doctor", doctor_id="d1")
+    records = [_record("d1", "p1"), _record("d2", "p2"), _record("d2", "p3")] * 100
+
+    visible = engine.filter_records(None, doctor, records)
+
+    assert len(visible) == 200
+    assert all(record.patient_id in ("p1", "p2") for record in visible)
+    assert cache.loads == 1
+
+def test_doctor_can_only_create_for_assigned_patients():
+    """Test record creation requires an active assignment"""
+    engine = AuthorizationEngine(assignments=FakeAssignmentCache({"d1": {"p1"}}))
+    doctor = _user("doctor", doctor_id="d1")
+
+    assert engine.can(None, doctor, "medical_record", "create", "d1", "p1") is True
+    assert engine.can(None, doctor, "medical_record", "create", "d1", "p2") is False
+
+def test_role_rules():
+    """Test role-level rules for patients, staff and admins"""
+    engine = AuthorizationEngine(assignments=FakeAssignmentCache({}))
+    patient = _user("patient", patient_id="p1")
+
+    assert engine.can(None, patient, "medical_record", "view", "d1", "p1") is True
+    assert engine.can(None, patient, "medical_record", "view", "d1", "p2") is False
+    assert engine.has_role_access(patient, "medical_record", "create") is False
+    assert engine.can(None, _user("staff"), "medical_record", "view", "d1", "p2") is True
+    assert engine.can(None, _user("admin"), "medical_record", "delete", "d1", "p2") is True
+
+def test_record_filter_compiles_scopes_to_sql():
+    """Test list predicates mirror the in-memory rules"""
+    from sqlalchemy.dialects import postgresql
+    engine = AuthorizationEngine(assignments=FakeAssignmentCache({}))
+
+    def compiled(user):
+        return str(engine.record_filter(user).compile(dialect=postgresql.dialect()))
+
+    assert compiled(_user("admin")) == "true"
+    assert compiled(_user("receptionist")) == "false"
+    assert "medical_records.patient_id =" in compiled(_user("patient", patient_id="p1"))
+    doctor_sql = compiled(_user("doctor", doctor_id="d1"))
+    assert "medical_records.doctor_id =" in doctor_sql
+    assert "EXISTS" in doctor_sql and "doctor_patient_assignments.is_active" in doctor_sql
+
+class InvalidatingDb:
+    """Answers assignment queries with the rows read before a concurrent invalidate() lands"""
+    def __init__(self, cache, rows, invalidate_with):
+        self.cache, self.rows, self.invalidate_with, self.queries = cache, rows, invalidate_with, 0
+
+    def query(self, *columns):
+        return self
+
+    def filter(self, *criteria):
+        return self
+
+    def all(self):
+        self.queries += 1
+        if self.queries == 1:
+            self.cache.invalidate(*self.invalidate_with)
+        return self.rows
+
+    def __iter__(self):
+        return iter(self.all())
+
+def test_a_load_overtaken_by_invalidate_is_not_cached():
+    """Test a set read before a revoked assignment was invalidated is not stored, so the next check reloads"""
+    cache = AssignmentCache(ttl_seconds=60)
+    db = InvalidatingDb(cache, [SimpleNamespace(patient_id="p1")], ("d1",))
+
+    assert cache.get(db, "d1") == {"p1"}
+    db.rows = []
+    assert cache.get(db, "d1") == frozenset()
+    assert db.queries == 2
+    assert cache.get(db, "d1") == frozenset() and db.queries == 2
+
+def test_warm_keeps_invalidations_made_while_it_loads():
+    """Test warm() drops the sets of doctors invalidated during its query, and everything on a global invalidate"""
+    rows = [SimpleNamespace(doctor_id="d1", patient_id="p1"), SimpleNamespace(doctor_id="d2", patient_id="p2")]
+    cache = AssignmentCache(ttl_seconds=60)
+    assert cache.warm(InvalidatingDb(cache, rows, ("d1",))) == 1
+    assert "d1" not in cache._sets and "d2" in cache._sets
+
+    cache = AssignmentCache(ttl_seconds=60)
+    assert cache.warm(InvalidatingDb(cache, rows, ())) == 0
+    assert cache._sets == {}
@@ -0,0 +1,128 @@
+import asyncio
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.load_shedding import AdaptiveConcurrencyLimiter, LoadSheddingMiddleware
+from app.core.rate_limit import Limit, MemoryBackend, RateLimitMiddleware, RedisBackend, take_token
+from app.core.security import create_access_token
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+class FakeRedis:
+    """Stands in for redis.asyncio.Redis, running the bucket arithmetic the script does."""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.buckets = {}
+        self.calls = []
+
+    async def eval(self, script, numkeys, key, rate, capacity, cost):
+        self.calls.append((numkeys, key))
+        tokens, stamp = self.buckets.get(key, (capacity, self.clock()))
+        tokens, allowed, retry_after = take_token(tokens, self.clock() - stamp, Limit(rate, capacity), cost)
+        self.buckets[key] = (tokens, self.clock())
+        return [int(allowed), str(retry_after)]
+
+class DownRedis:
+    async def eval(self, *args):
+        raise ConnectionError("connection refused")
+
+def _client(backend, limits):
+    app = FastAPI()
+
+    @app.post("/api/v1/auth/login")
+    def login():
+        return {}
+
+    @app.get("/api/v1/appointments/check-availability/{doctor_id}")
+    def check_availability(doctor_id: str):
+        return {}
+
+    app.add_middleware(RateLimitMiddleware, backend=backend, limits=limits)
+    return TestClient(app)
+
+def test_bucket_refills_at_the_rate_up_to_capacity():
+    """Test a bucket allows a burst, then one token per 1/rate seconds"""
+    limit = Limit.per_minute(60)
+    assert take_token(0, 0.5, limit) == (0.5, False, 0.5)
+    assert take_token(0, 1, limit) == (0, True, 0)
+    assert take_token(59, 3600, limit) == (59, True, 0)
+
+def test_login_is_throttled_per_client_with_retry_after():
+    """Test the auth class returns 429 with Retry-After once its burst is spent"""
+    clock = FakeClock()
+    client = _client(MemoryBackend(clock=clock), {"auth": Limit.per_minute(2), "default": Limit.per_minute(100)})
+    assert [client.post("/api/v1/auth/login").status_code for _ in range(3)] == [200, 200, 429]
+    response = client.post("/api/v1/auth/login")
+    assert response.headers["Retry-After"] == "30"
+    clock.now += 30
+    assert client.post("/api/v1/auth/login").status_code == 200
+
+def test_authenticated_clients_behind_one_address_have_their_own_buckets():
+    """Test one kiosk exhausting its bucket leaves other users at the same IP unaffected"""
+    limits = {"availability": Limit.per_minute(1), "default": Limit.per_minute(100)}
+    client = _client(MemoryBackend(clock=FakeClock()), limits)
+    path = "/api/v1/appointments/check-availability/d1"
+    kiosk = {"Authorization": f"Bearer {create_access_token('kiosk', 'patient')}"}
+    desk = {"Authorization": f"Bearer {create_access_token('desk', 'staff')}"}
+    assert client.get(path, headers=kiosk).status_code == 200
+    assert client.get(path, headers=kiosk).status_code == 429
+    assert client.get(path, headers=desk).status_code == 200
+
+def test_shared_backend_keeps_state_outside_the_process():
+    """Test the Redis backend spends tokens through the client, and fails open when it is down"""
+    clock = FakeClock()
+    redis = FakeRedis(clock)
+    backend = RedisBackend(redis)
+    limit = Limit.per_minute(1)
+    assert asyncio.run(backend.take("auth:ip:1", limit)) == (True, 0.0)
+    assert asyncio.run(backend.take("auth:ip:1", limit)) == (False, 60.0)
+    assert redis.calls == [(1, "ratelimit:auth:ip:1")] * 2
+    assert asyncio.run(RedisBackend(DownRedis()).take("auth:ip:1", limit)) == (True, 0.0)
+
+def test_limit_backs_off_while_the_pool_is_slow_and_recovers():
+    """Test pool waits over the threshold cut the in-flight limit and fast ones raise it again"""
+    clock = FakeClock()
+    limiter = AdaptiveConcurrencyLimiter(max_limit=8, min_limit=2, pool_wait_threshold=0.1,
+                                         smoothing=1.0, clock=clock)
+    limiter.observe_pool_wait(0.5)
+    for _ in range(3):
+        assert limiter.try_acquire()
+        limiter.release()
+        clock.now += 1
+    assert limiter.limit == 3.375
+    limiter.observe_pool_wait(0.0)
+    for _ in range(40):
+        limiter.try_acquire()
+        limiter.release()
+    assert limiter.limit == 8
+
+def test_requests_over_the_limit_are_shed_with_503():
+    """Test 503 with Retry-After once the limit is in flight, while /health still answers"""
+    limiter = AdaptiveConcurrencyLimiter(max_limit=1, min_limit=1)
+    app = FastAPI()
+
+    @app.get("/api/v1/doctors")
+    def doctors():
+        return []
+
+    @app.get("/health")
+    def health():
+        return {"status": "healthy"}
+
+    app.add_middleware(LoadSheddingMiddleware, limiter=limiter, retry_after=2)
+    client = TestClient(app)
+    assert client.get("/api/v1/doctors").status_code == 200
+    assert limiter.in_flight == 0
+
+    limiter.try_acquire()
+    response = client.get("/api/v1/doctors")
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "2"
+    assert client.get("/health").status_code == 200
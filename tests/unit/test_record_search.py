@@ -0,0 +1,64 @@
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.services import medical_record_service
+from app.services.medical_record_service import MARK_START, MARK_STOP, MedicalRecordService, headline_html
+
+def _record():
+    now = datetime(2026, 3, 2, tzinfo=timezone.utc)
+    return SimpleNamespace(
+        id=uuid4(), patient_id=uuid4(), doctor_id=uuid4(), appointment_id=None, diagnosis="Type 2 diabetes",
+        prescription="Metformin", notes=None, current_version=1, created_at=now, updated_at=now
+    )
+
+def _search(monkeypatch, user, snippet="", **kwargs):
+    monkeypatch.setattr(medical_record_service.AuditLogger, "log_action", MagicMock())
+    db = MagicMock()
+    db.execute.return_value.all.return_value = [(_record(), 0.5, snippet)]
+    result = MedicalRecordService(db).search("metformin", user, **kwargs)
+    sql = str(db.execute.call_args[0][0].compile(dialect=postgresql.dialect()))
+    return result, sql
+
+def test_search_matches_and_ranks_on_the_search_vector(monkeypatch):
+    """Test the query uses websearch_to_tsquery against search_vector and orders by ts_rank_cd"""
+    patient = SimpleNamespace(role="patient", patient_id=uuid4(), doctor_id=None)
+    result, sql = _search(monkeypatch, patient)
+    assert "websearch_to_tsquery(" in sql and "medical_records.search_vector @@ " in sql
+    assert "ts_rank_cd(medical_records.search_vector" in sql and "ORDER BY anon_1.rank DESC" in sql
+    assert "%>" not in sql and "word_similarity" not in sql
+    assert result["items"][0]["rank"] == 0.5
+
+def test_search_only_returns_records_the_user_may_see(monkeypatch):
+    """Test a patient's search is limited to their own records in SQL"""
+    patient = SimpleNamespace(role="patient", patient_id=uuid4(), doctor_id=None)
+    _, sql = _search(monkeypatch, patient)
+    assert "medical_records.patient_id = " in sql
+
+def test_fuzzy_search_also_matches_prescriptions_by_word_similarity(monkeypatch):
+    """Test fuzzy=True adds the trigram %> match and ranks by the better of both scores"""
+    admin = SimpleNamespace(role="admin", patient_id=None, doctor_id=None)
+    _, sql = _search(monkeypatch, admin, fuzzy=True)
+    assert "medical_records.prescription %%> " in sql
+    assert "greatest(ts_rank_cd(" in sql and "word_similarity(" in sql
+
+def test_search_rejects_an_empty_query():
+    """Test a blank query is refused before touching the database"""
+    db = MagicMock()
+    with pytest.raises(ValueError):
+        MedicalRecordService(db).search("  ", SimpleNamespace(role="admin", patient_id=None, doctor_id=None))
+    db.execute.assert_not_called()
+
+def test_snippet_is_escaped_around_the_marks(monkeypatch):
+    """Test record text cannot inject HTML, and only the matches come back wrapped in <mark>"""
+    admin = SimpleNamespace(role="admin", patient_id=None, doctor_id=None)
+    snippet = f'<img src=x onerror="alert(1)"> take {MARK_START}metformin{MARK_STOP} & rest'
+    result, _ = _search(monkeypatch, admin, snippet=snippet)
+    assert result["items"][0]["snippet"] == (
+        "&lt;img src=x onerror=&quot;alert(1)&quot;&gt; take <mark>metformin</mark> &amp; rest"
+    )
+    assert headline_html(None) is None
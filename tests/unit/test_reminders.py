@@ -0,0 +1,81 @@
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+from sqlalchemy.dialects import postgresql
+
+from app.services import reminder_service
+from app.services.reminder_service import ReminderService
+
+WINDOW_START = datetime(2026, 3, 2, 9, tzinfo=timezone.utc)
+WINDOW_END = WINDOW_START + timedelta(hours=1)
+
+def _compiled(call):
+    return call[0][0].compile(dialect=postgresql.dialect())
+
+def _row(minutes, user_id="user"):
+    return MagicMock(
+        id=uuid4(), start_time=WINDOW_START + timedelta(minutes=minutes),
+        doctor_first_name="Ada", user_id=user_id
+    )
+
+def test_first_page_is_ordered_and_limited_by_the_keyset():
+    """Test a page is ordered by (start_time, id), limited to the batch size and skips reminded appointments"""
+    db = MagicMock()
+    ReminderService(db, batch_size=50)._fetch_page(WINDOW_START, WINDOW_END)
+    sql = str(_compiled(db.execute.call_args))
+    assert "appointments.reminder_sent_at IS NULL" in sql and "appointments.status IN" in sql
+    assert "ORDER BY appointments.start_time, appointments.id" in sql and "LIMIT" in sql
+    assert "(appointments.start_time, appointments.id) >" not in sql
+
+def test_next_page_starts_after_the_cursor():
+    """Test a cursor becomes a row comparison on (start_time, id), not an OFFSET"""
+    db = MagicMock()
+    cursor = (WINDOW_START, uuid4())
+    ReminderService(db, batch_size=50)._fetch_page(WINDOW_START, WINDOW_END, cursor)
+    compiled = _compiled(db.execute.call_args)
+    assert "(appointments.start_time, appointments.id) > (" in str(compiled)
+    assert "OFFSET" not in str(compiled)
+    assert all(value in compiled.params.values() for value in cursor)
+
+def test_claim_is_one_guarded_update_returning_the_winners():
+    """Test a claim only sets reminder_sent_at where it is still unset, and returns just the rows it updated"""
+    won = uuid4()
+    db = MagicMock()
+    db.execute.return_value = [MagicMock(id=won)]
+    assert ReminderService(db)._claim([won, uuid4()]) == {str(won)}
+    sql = str(_compiled(db.execute.call_args))
+    assert db.execute.call_count == 1
+    assert sql.startswith("UPDATE appointments SET reminder_sent_at=now()")
+    assert "appointments.reminder_sent_at IS NULL" in sql and sql.endswith("RETURNING appointments.id")
+
+def test_a_page_only_notifies_for_appointments_this_run_claimed():
+    """Test rows another run claimed first, and patients without a user, get no notification"""
+    claimed, lost, no_user = _row(0), _row(5), _row(10, user_id=None)
+    service = ReminderService(MagicMock(), batch_size=3)
+    service._fetch_page = MagicMock(return_value=[claimed, lost, no_user])
+    service._claim = MagicMock(return_value={str(claimed.id), str(no_user.id)})
+
+    scanned, cursor, messages = service.process_page(WINDOW_START, WINDOW_END)
+
+    assert scanned == 3 and cursor == (no_user.start_time, no_user.id)
+    assert [json.loads(message)["user_id"] for message in messages] == ["user"]
+    service.db.commit.assert_called_once()
+
+def test_dispatch_pages_until_a_short_page_and_publishes_each_batch(monkeypatch):
+    """Test dispatch follows the cursor, publishes after each commit and stops on a page smaller than the batch"""
+    first, second = [_row(0), _row(5)], [_row(10)]
+    service = ReminderService(MagicMock(), batch_size=2)
+    service._fetch_page = MagicMock(side_effect=[first, second])
+    service._claim = MagicMock(side_effect=lambda ids: {str(i) for i in ids})
+    rabbitmq, publish_event = MagicMock(publish_messages=AsyncMock()), MagicMock()
+    monkeypatch.setattr(reminder_service, "RabbitMQ", rabbitmq)
+    monkeypatch.setattr(reminder_service, "publish_event", publish_event)
+
+    assert asyncio.run(service.dispatch(WINDOW_START, WINDOW_END)) == 3
+
+    assert service._fetch_page.call_args_list[1][0][2] == (first[-1].start_time, first[-1].id)
+    assert rabbitmq.publish_messages.await_count == 2
+    assert publish_event.call_count == 3
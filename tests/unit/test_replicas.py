@@ -0,0 +1,84 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from fastapi import Depends, FastAPI, Request
+from fastapi.testclient import TestClient
+
+from app.api import deps
+from app.db.replicas import ReadYourWritesMiddleware, Replica, ReplicaRouter, parse_lsn
+
+def _router(selection="round_robin", count=2):
+    router = ReplicaRouter(urls=[f"postgresql://replica{i}/db" for i in range(count)], selection=selection,
+                           replica_factory=lambda url: Replica(url, engine_factory=lambda *args, **kwargs: MagicMock()))
+    for i, replica in enumerate(router.replicas):
+        replica.name = f"r{i}"
+        replica.sessionmaker = lambda name=replica.name: SimpleNamespace(name=name, close=lambda: None)
+    return router
+
+def test_parse_lsn():
+    """Test LSNs compare as integers across the segment boundary"""
+    assert parse_lsn("0/16B3748") == 0x16B3748
+    assert parse_lsn("1/0") > parse_lsn("0/FFFFFFFF")
+    assert parse_lsn("garbage") is None and parse_lsn(None) is None
+
+def test_round_robin_skips_unhealthy_replicas():
+    """Test reads alternate over healthy replicas and fall back to the primary when none is"""
+    router = _router()
+    assert [router.choose().name for _ in range(4)] == ["r0", "r1", "r0", "r1"]
+    router.replicas[0].healthy = False
+    assert {router.choose().name for _ in range(4)} == {"r1"}
+    router.replicas[1].healthy = False
+    assert router.choose() is None and router.session() is None
+
+def test_least_latency_picks_the_fastest_replica():
+    router = _router("least_latency")
+    router.replicas[0].latency, router.replicas[1].latency = 0.02, 0.005
+    assert router.choose().name == "r1"
+
+def test_reads_after_a_write_go_to_replicas_that_replayed_it():
+    """Test a client's LSN excludes replicas behind it, but not databases that are not standbys"""
+    router = _router()
+    router.replicas[0].replay_lsn = parse_lsn("0/200")
+    router.replicas[1].replay_lsn = parse_lsn("0/100")
+    assert {router.choose(parse_lsn("0/180")).name for _ in range(4)} == {"r0"}
+    assert router.choose(parse_lsn("0/300")) is None
+    router.replicas[1].in_recovery = False
+    assert router.choose(parse_lsn("0/300")).name == "r1"
+
+def test_health_check_records_position_and_failures():
+    replica = Replica("postgresql://replica/db", engine_factory=lambda *args, **kwargs: MagicMock())
+    connection = replica.engine.connect.return_value.__enter__.return_value
+    connection.execute.return_value.one.return_value = (True, "0/3000148")
+    replica.check()
+    assert replica.healthy and replica.replay_lsn == 0x3000148 and replica.latency is not None
+    replica.engine.connect.side_effect = OSError("connection refused")
+    replica.check()
+    assert not replica.healthy
+
+def test_read_dependency_and_cookie(monkeypatch):
+    """Test get_read_db honours the db_lsn cookie and a write sets it"""
+    router = _router(count=1)
+    router.replicas[0].replay_lsn = parse_lsn("0/100")
+    monkeypatch.setattr(deps, "replica_router", router)
+    app = FastAPI()
+
+    @app.get("/read")
+    def read(db=Depends(deps.get_read_db)):
+        return {"db": getattr(db, "name", "primary")}
+
+    @app.post("/write")
+    def write(request: Request):
+        request.state.write_lsn = "0/200"
+        return {}
+
+    def primary():
+        yield SimpleNamespace(name="primary")
+
+    app.dependency_overrides[deps.get_db] = primary
+    app.add_middleware(ReadYourWritesMiddleware, max_age=60)
+    client = TestClient(app)
+    assert client.get("/read").json() == {"db": "r0"}
+    response = client.post("/write")
+    assert "db_lsn=0/200; Max-Age=60" in response.headers["set-cookie"]
+    assert client.get("/read").json() == {"db": "primary"}
+    assert client.get("/read", cookies={"db_lsn": "0/80"}).json() == {"db": "r0"}
@@ -0,0 +1,64 @@
+import gzip
+import json
+from unittest.mock import MagicMock
+
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.core.compression import CompressionMiddleware
+from app.core.streaming import json_array_stream
+
+def _stream(items, items_per_chunk):
+    session = MagicMock()
+    chunks = list(json_array_stream(lambda db: iter(items), items_per_chunk, session_factory=lambda: session))
+    return chunks, session
+
+def test_stream_is_one_json_array_written_in_chunks():
+    """Test items arrive a chunk at a time and join up to valid JSON"""
+    items = [{"id": i} for i in range(5)]
+    chunks, session = _stream(items, 2)
+    assert len(chunks) == 5  # "[", three chunks of items, "]"
+    assert json.loads(b"".join(chunks)) == items
+    session.close.assert_called_once()
+
+def test_empty_stream_is_an_empty_array():
+    """Test no rows still make valid JSON"""
+    chunks, _ = _stream([], 500)
+    assert json.loads(b"".join(chunks)) == []
+
+def _client():
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=100, content_types=["application/json"])
+
+    @app.get("/list")
+    def json_list():
+        return StreamingResponse(json_array_stream(lambda db: ({"n": i} for i in range(1000)), 100,
+                                                   session_factory=MagicMock), media_type="application/json")
+
+    @app.get("/small")
+    def small():
+        return {"ok": True}
+
+    @app.get("/binary")
+    def binary():
+        return Response(b"x" * 5000, media_type="application/pdf")
+
+    @app.get("/events")
+    def events():
+        return PlainTextResponse("data: x\n\n" * 100, media_type="text/event-stream")
+
+    return TestClient(app)
+
+def test_only_allowed_content_types_over_the_threshold_are_compressed():
+    """Test JSON is gzipped, while small bodies, binaries and event streams are not"""
+    client = _client()
+    headers = {"Accept-Encoding": "gzip"}
+    with client.stream("GET", "/list", headers=headers) as streamed:
+        assert streamed.headers["Content-Encoding"] == "gzip"
+        compressed = b"".join(streamed.iter_raw())
+    body = gzip.decompress(compressed)
+    assert len(json.loads(body)) == 1000 and len(compressed) < len(body)
+    assert "Content-Encoding" not in client.get("/small", headers=headers).headers
+    assert "Content-Encoding" not in client.get("/binary", headers=headers).headers
+    assert "Content-Encoding" not in client.get("/events", headers=headers).headers
@@ -0,0 +1,34 @@
+import json
+
+import pytest
+
+from app.core.text_delta import apply, apply_field_delta, diff, field_delta
+
+def test_diff_round_trips_edits():
+    """Test applying a delta reproduces the target exactly"""
+    source = "Metformin 500mg once daily.\nReview in  3 months."
+    target = "Metformin 1000mg twice daily.\nReview in  3 months. Check HbA1c."
+    assert apply(source, diff(source, target)) == target
+    assert apply(target, diff(target, source)) == source
+
+def test_small_edit_to_large_text_stores_small_delta():
+    """Test delta size tracks the edit, not the text"""
+    source = " ".join(f"word{i}" for i in range(2000))
+    target = source.replace("word1000", "changed")
+    delta = field_delta(source, target)
+    assert "ops" in delta
+    assert len(json.dumps(delta)) < 100
+    assert apply_field_delta(source, delta) == target
+
+def test_field_delta_handles_nulls_and_short_values():
+    """Test NULLs and short rewrites are stored as plain values"""
+    assert field_delta(None, "notes") == {"value": "notes"}
+    assert field_delta("notes", None) == {"value": None}
+    assert field_delta("a", "b") == {"value": "b"}
+    assert apply_field_delta("anything", {"value": None}) is None
+
+def test_apply_rejects_mismatched_source():
+    """Test a delta cannot be applied to the wrong text"""
+    ops = diff("one two three", "one three")
+    with pytest.raises(ValueError):
+        apply("one", ops)
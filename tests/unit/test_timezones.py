@@ -0,0 +1,104 @@
+from datetime import date, datetime, time, timedelta
+
+import pytest
+from hypothesis import given, strategies as st
+
+from app.core.timezones import get_zone, local_to_epoch, schedule_window, to_local
+
+ZONES = ["America/New_York", "Europe/London", "Australia/Sydney", "Australia/Lord_Howe", "Africa/Nairobi"]
+
+def _transition_days(name, years=range(2024, 2031)):
+    """Local days on which the zone's UTC offset changes."""
+    zone = get_zone(name)
+    days = []
+    for year in years:
+        day = date(year, 1, 1)
+        while day.year == year:
+            following = day + timedelta(days=1)
+            if datetime.combine(day, time(0), zone).utcoffset() != datetime.combine(following, time(0), zone).utcoffset():
+                days.append((name, day))
+            day = following
+    return days
+
+TRANSITION_DAYS = [day for name in ZONES for day in _transition_days(name)]
+
+def _wall_time(epoch, zone):
+    return datetime.fromtimestamp(epoch, zone).replace(tzinfo=None)
+
+def _exists(naive, zone):
+    return _wall_time(naive.replace(tzinfo=zone).timestamp(), zone) == naive
+
+zone_days = st.one_of(
+    st.sampled_from(TRANSITION_DAYS),
+    st.tuples(st.sampled_from(ZONES), st.dates(min_value=date(2024, 1, 1), max_value=date(2030, 12, 31)))
+)
+
+@given(zone_days, st.times())
+def test_existing_wall_times_round_trip(zone_day, at):
+    """Test a wall time that happens converts to an instant showing that wall time"""
+    name, day = zone_day
+    zone = get_zone(name)
+    naive = datetime.combine(day, at.replace(microsecond=0))
+    epoch = local_to_epoch(day, naive.time(), zone)
+    if _exists(naive, zone):
+        assert _wall_time(epoch, zone) == naive
+    else:
+        # Skipped wall times land on the instant the clocks jump
+        assert naive < _wall_time(epoch, zone) <= naive + timedelta(hours=1)
+        assert _wall_time(epoch - 1, zone) < naive
+
+@given(zone_days, st.times(), st.times())
+def test_conversion_is_monotonic(zone_day, first, second):
+    """Test later wall times never map to earlier instants, even across a gap"""
+    name, day = zone_day
+    zone = get_zone(name)
+    first, second = sorted([first.replace(microsecond=0), second.replace(microsecond=0)])
+    assert local_to_epoch(day, first, zone) <= local_to_epoch(day, second, zone)
+
+@given(zone_days, st.times())
+def test_repeated_wall_times_resolve_to_first_occurrence(zone_day, at):
+    """Test an ambiguous time picks the earlier of its two instants"""
+    name, day = zone_day
+    zone = get_zone(name)
+    naive = datetime.combine(day, at.replace(microsecond=0))
+    if _exists(naive, zone):
+        assert local_to_epoch(day, naive.time(), zone) <= naive.replace(tzinfo=zone, fold=1).timestamp()
+
+@given(zone_days, st.times(), st.times())
+def test_window_length_follows_offset_change(zone_day, first, second):
+    """Test working hours last their wall-clock length adjusted by any DST shift inside them"""
+    name, day = zone_day
+    zone = get_zone(name)
+    start, end = sorted([first.replace(microsecond=0), second.replace(microsecond=0)])
+    window_start, window_end = schedule_window(day, start, end, zone)
+    assert window_start <= window_end
+    # Stored schedule times carry no fold, so measure against the first occurrence
+    naive_start, naive_end = datetime.combine(day, start.replace(fold=0)), datetime.combine(day, end.replace(fold=0))
+    if _exists(naive_start, zone) and _exists(naive_end, zone):
+        shift = naive_end.replace(tzinfo=zone).utcoffset() - naive_start.replace(tzinfo=zone).utcoffset()
+        assert window_end - window_start == ((naive_end - naive_start) - shift).total_seconds()
+
+def test_dst_days_in_new_york():
+    """Test a midnight-to-6am shift is 5 hours in March and 7 in November"""
+    zone = get_zone("America/New_York")
+    start, end = schedule_window(date(2024, 3, 10), time(0), time(6), zone)
+    assert end - start == 5 * 3600
+    start, end = schedule_window(date(2024, 11, 3), time(0), time(6), zone)
+    assert end - start == 7 * 3600
+
+def test_fold_of_the_input_is_ignored():
+    """Test fold=1 neither picks the second occurrence nor escapes a gap"""
+    zone = get_zone("America/New_York")
+    assert local_to_epoch(date(2024, 11, 3), time(1, 30, fold=1), zone) == local_to_epoch(date(2024, 11, 3), time(1, 30), zone)
+    assert local_to_epoch(date(2024, 3, 10), time(2, 30, fold=1), zone) == local_to_epoch(date(2024, 3, 10), time(3, 0), zone)
+
+def test_naive_datetimes_are_read_as_local_time():
+    """Test a naive booking time is wall-clock time at the clinic"""
+    nairobi = get_zone("Africa/Nairobi")
+    assert to_local(datetime(2030, 1, 7, 9, 0), nairobi).isoformat() == "2030-01-07T09:00:00+03:00"
+    assert to_local(datetime(2024, 3, 10, 2, 30), get_zone("America/New_York")).isoformat() == "2024-03-10T03:00:00-04:00"
+
+def test_unknown_zone_is_rejected():
+    """Test a bad IANA name is a ValueError"""
+    with pytest.raises(ValueError):
+        get_zone("Mars/Olympus_Mons")
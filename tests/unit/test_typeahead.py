@@ -0,0 +1,88 @@
+import threading
+
+from app.core.typeahead import PrefixTrie, TypeaheadCache, tokenize
+
+def _entry(id, name):
+    return {"id": id, "name": name}
+
+def test_tokenize_splits_names_emails_and_phones():
+    """Test every word of a field can be used as a prefix"""
+    tokens = tokenize("Jane Doe", "jane.doe@example.com", "+1 555-0100")
+    assert "jane doe" in tokens
+    assert "doe" in tokens
+    assert "example" in tokens
+    assert "555" in tokens
+
+def test_trie_returns_entries_in_insertion_order_up_to_limit():
+    """Test prefix lookups honour insertion order and limits"""
+    trie = PrefixTrie(max_per_node=3)
+    for i, name in enumerate(["Jane Doe", "Janet Roe", "John Smith", "Jan Novak"]):
+        trie.insert(str(i), tokenize(name), _entry(str(i), name))
+
+    assert [e["name"] for e in trie.search("jan")] == ["Jane Doe", "Janet Roe", "Jan Novak"]
+    assert [e["name"] for e in trie.search("JAN", limit=1)] == ["Jane Doe"]
+    assert [e["name"] for e in trie.search("smi")] == ["John Smith"]
+    assert [e["name"] for e in trie.search("j")] == ["Jane Doe", "Janet Roe", "John Smith"]
+    assert trie.search("x") == []
+
+def test_cache_rebuilds_after_invalidation():
+    """Test the trie is built once and rebuilt after invalidate"""
+    loads = []
+    def loader(db):
+        loads.append(1)
+        yield "1", tokenize("Jane Doe"), _entry("1", "Jane Doe")
+
+    cache = TypeaheadCache(ttl_seconds=60)
+    cache.register("patient", loader)
+    assert cache.search(None, "patient", "ja")[0]["id"] == "1"
+    cache.search(None, "patient", "do")
+    assert len(loads) == 1
+
+    cache.invalidate("patient")
+    cache.search(None, "patient", "ja")
+    assert len(loads) == 2
+
+def test_stale_trie_is_served_while_one_request_rebuilds():
+    """Test concurrent searches after an invalidation do not each rebuild, and keep the previous results"""
+    names = ["Jane Doe"]
+    started, release, loads = threading.Event(), threading.Event(), []
+    def loader(db):
+        loads.append(1)
+        if len(loads) > 1:
+            started.set()
+            release.wait(5)
+        for i, name in enumerate(list(names)):
+            yield str(i), tokenize(name), _entry(str(i), name)
+
+    cache = TypeaheadCache(ttl_seconds=60)
+    cache.register("patient", loader)
+    cache.search(None, "patient", "ja")
+    names.append("Janet Roe")
+    cache.invalidate("patient")
+
+    rebuild = threading.Thread(target=cache.search, args=(None, "patient", "ja"))
+    rebuild.start()
+    assert started.wait(5)
+    results = [cache.search(None, "patient", "ja") for _ in range(5)]
+    release.set()
+    rebuild.join(5)
+    assert len(loads) == 2
+    assert all([e["name"] for e in result] == ["Jane Doe"] for result in results)
+    assert [e["name"] for e in cache.search(None, "patient", "ja")] == ["Jane Doe", "Janet Roe"]
+
+def test_invalidation_during_a_build_is_not_lost():
+    """Test a trie built from data read before an invalidation is rebuilt on the next search"""
+    cache = TypeaheadCache(ttl_seconds=60)
+    names = ["Jane Doe"]
+    def loader(db):
+        snapshot = list(names)
+        if len(names) == 1:
+            # A write lands and invalidates while this build is running
+            names.append("Janet Roe")
+            cache.invalidate("patient")
+        for i, name in enumerate(snapshot):
+            yield str(i), tokenize(name), _entry(str(i), name)
+
+    cache.register("patient", loader)
+    assert len(cache.search(None, "patient", "ja")) == 1
+    assert len(cache.search(None, "patient", "ja")) == 2
@@ -0,0 +1,56 @@
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from app.services.waitlist_service import WaitlistQueue
+
+BASE = datetime(2030, 1, 7, 9, 0, tzinfo=timezone.utc)
+
+def _entry(id, priority=0, requested_minutes=0, duration=30, earliest=0, latest=480):
+    return SimpleNamespace(
+        id=id,
+        priority=priority,
+        requested_at=BASE - timedelta(days=1) + timedelta(minutes=requested_minutes),
+        duration_minutes=duration,
+        earliest_start=BASE + timedelta(minutes=earliest),
+        latest_end=BASE + timedelta(minutes=latest)
+    )
+
+def test_queue_serves_priority_then_request_time():
+    """Test heap order is priority first, then first come first served"""
+    queue = WaitlistQueue([_entry("late", requested_minutes=5), _entry("early"), _entry("urgent", priority=5, requested_minutes=10)])
+    assert [queue.pop().id for _ in range(3)] == ["urgent", "early", "late"]
+
+def test_fill_books_consecutive_slots_in_freed_interval():
+    """Test a freed hour is split between the entries that fit"""
+    queue = WaitlistQueue([_entry("a"), _entry("b", requested_minutes=1), _entry("c", requested_minutes=2)])
+    matches = queue.fill(BASE, BASE + timedelta(minutes=60))
+
+    assert [(entry.id, start, end) for entry, start, end in matches] == [
+        ("a", BASE, BASE + timedelta(minutes=30)),
+        ("b", BASE + timedelta(minutes=30), BASE + timedelta(minutes=60)),
+    ]
+
+def test_fill_respects_each_entry_window_and_duration():
+    """Test entries that cannot fit the freed interval are skipped"""
+    queue = WaitlistQueue([
+        _entry("too-long", priority=9, duration=90),
+        _entry("window-closes", priority=8, latest=20),
+        _entry("starts-later", priority=1, earliest=15, duration=45),
+    ])
+    matches = queue.fill(BASE, BASE + timedelta(minutes=60))
+
+    assert [(entry.id, start) for entry, start, _ in matches] == [("starts-later", BASE + timedelta(minutes=15))]
+
+def test_fill_gives_the_gap_before_a_later_slot_to_the_next_entry():
+    """Test a lower-priority entry takes the free time before a higher-priority entry's later slot"""
+    queue = WaitlistQueue([
+        _entry("urgent-at-ten", priority=5, earliest=60, duration=60),
+        _entry("at-nine", duration=60),
+        _entry("no-room-left", requested_minutes=1, duration=30),
+    ])
+    matches = queue.fill(BASE, BASE + timedelta(minutes=120))
+
+    assert [(entry.id, start, end) for entry, start, end in matches] == [
+        ("urgent-at-ten", BASE + timedelta(minutes=60), BASE + timedelta(minutes=120)),
+        ("at-nine", BASE, BASE + timedelta(minutes=60)),
+    ]